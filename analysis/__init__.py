@@ -0,0 +1,13 @@
+# analysis/__init__.py
+# Host-side analytics over recorded sled traces (NumPy)
+# Author: savant42
+#
+# Works on plain arrays, so flight recorder logs (tools/flight_log.py), .npz
+# exports and simulator traces all go through the same functions.
+#
+#   python3 -m analysis logs/ --workers 8 --out tuning.json
+
+from analysis.step import step_response, step_summary, find_steps
+from analysis.latency import change_latency, latency_summary
+from analysis.wheels import duty_speed_curve, stall_duty, wheel_mismatch
+from analysis.batch import load_trace, analyze_trace, analyze_file, analyze_dir
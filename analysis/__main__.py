@@ -0,0 +1,56 @@
+# analysis/__main__.py
+# python3 -m analysis <dir or file>... [--workers N] [--out results.json]
+# Author: savant42
+
+import argparse
+import json
+import os
+
+from analysis.batch import analyze_dir, analyze_file
+
+
+def _fmt(value, spec=".3f"):
+    return "--" if value is None else format(value, spec)
+
+
+def print_result(r):
+    if "error" in r:
+        print(f"❌ {r['path']}: {r['error']}")
+        return
+    print(f"📈 {r['path']}: {r['samples']} samples, {r['duration_s']:.1f}s")
+    for side in ("left", "right"):
+        s = r[side]
+        step = s["step"]
+        lat = s["latency"]
+        print(f"   {side:<5} steps={step['steps']} rise={_fmt(step['rise_s']['median'])}s "
+              f"over={_fmt(step['overshoot_pct']['max'], '.1f')}% settle={_fmt(step['settle_s']['median'])}s "
+              f"lat p50/p99={_fmt(lat.get('p50_ms'), '.1f')}/{_fmt(lat.get('p99_ms'), '.1f')}ms "
+              f"stall@{_fmt(s['stall_duty'], '.2f')}")
+    m = r["mismatch"]
+    if m["n"]:
+        print(f"   mismatch L-R {m['mean_pct']:+.1f}% (p5 {m['p5_pct']:+.1f}, p95 {m['p95_pct']:+.1f}) n={m['n']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Step response, latency and wheel analytics over sled traces")
+    ap.add_argument("paths", nargs="+", help="trace files (.bin flight logs, .npz) or directories")
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    ap.add_argument("--out", help="write all results as JSON")
+    args = ap.parse_args(argv)
+
+    results = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            results.extend(analyze_dir(path, args.workers))
+        else:
+            results.append(analyze_file(path))
+    for r in results:
+        print_result(r)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# analysis/batch.py
+# One-call analysis of a trace, and a process pool over a directory of runs
+# Author: savant42
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analysis.latency import change_latency, latency_summary
+from analysis.step import step_response, step_summary
+from analysis.wheels import duty_speed_curve, stall_duty, wheel_mismatch
+
+TRACE_PATTERNS = ("*.bin", "*.npz")
+
+
+def load_trace(path):
+    """Returns a dict of equal-length arrays: t, ch (N x 14), throttle, left/right duty (0..1) and pps.
+
+    .bin files are flight recorder logs; .npz files must already carry those keys.
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as z:
+            return {k: z[k] for k in z.files}
+    from tools.flight_log import load, wheel_columns
+    log = load(path)
+    cols = wheel_columns(log.control)
+    return {
+        "t": log.t,
+        "ch": log.control["ch"],
+        "throttle": log.control["throttle"],
+        "left_duty": cols["left_duty"],
+        "right_duty": cols["right_duty"],
+        "left_pps": cols["left_pps"],
+        "right_pps": cols["right_pps"],
+        "lost": log.lost,
+    }
+
+
+def _curve_rows(curve):
+    return [{name: (float(row[name]) if name != "n" else int(row[name])) for name in curve.dtype.names}
+            for row in curve]
+
+
+def analyze_trace(trace, stick_channel=2):
+    """All metrics for one trace as a JSON-ready dict."""
+    t = trace["t"]
+    result = {"samples": int(len(t)), "duration_s": float(t[-1] - t[0]) if len(t) else 0.0}
+    if "lost" in trace:
+        result["lost_records"] = int(trace["lost"])
+
+    stick = trace["ch"][:, stick_channel]
+    for side in ("left", "right"):
+        duty = trace[f"{side}_duty"]
+        pps = trace[f"{side}_pps"]
+        steps = step_response(t, duty, pps)
+        curve = duty_speed_curve(duty, pps)
+        result[side] = {
+            "step": step_summary(steps),
+            "latency": latency_summary(change_latency(t, stick, duty)),
+            "curve": _curve_rows(curve),
+            "stall_duty": stall_duty(curve),
+        }
+    mismatch = wheel_mismatch(trace["left_duty"], trace["right_duty"],
+                              trace["left_pps"], trace["right_pps"])
+    mismatch.pop("samples")
+    result["mismatch"] = mismatch
+    return result
+
+
+def analyze_file(path):
+    """Never raises: a failure comes back as {"error": ...} so one bad trace can't take down the pool."""
+    try:
+        result = analyze_trace(load_trace(path))
+    except (OSError, ValueError, KeyError) as e:
+        result = {"error": str(e)}
+    except Exception as e:  # an analysis bug on odd data; report it against this file
+        result = {"error": f"{type(e).__name__}: {e}"}
+    result["path"] = path
+    return result
+
+
+def analyze_dir(directory, workers=None):
+    """Analyzes every trace under directory in a process pool; results come back in name order."""
+    paths = sorted(p for pattern in TRACE_PATTERNS
+                   for p in glob.glob(os.path.join(directory, "**", pattern), recursive=True))
+    if not paths:
+        return []
+    if workers == 1 or len(paths) == 1:
+        return [analyze_file(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(analyze_file, paths, chunksize=max(1, len(paths) // 32)))
@@ -0,0 +1,38 @@
+# analysis/latency.py
+# Stick-to-duty latency: time from an input change to the first output change
+# Author: savant42
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+def change_latency(t, stimulus, output):
+    """Seconds from each stimulus change to the next output change.
+
+    A stimulus change whose output has not moved before the following
+    stimulus change is dropped (the command was superseded), so only
+    changes that actually propagated are timed.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    stim_idx = np.flatnonzero(np.diff(np.asarray(stimulus)) != 0) + 1
+    out_idx = np.flatnonzero(np.diff(np.asarray(output)) != 0) + 1
+    if not len(stim_idx) or not len(out_idx):
+        return np.empty(0)
+    nxt = np.searchsorted(out_idx, stim_idx)
+    valid = nxt < len(out_idx)
+    stim_idx, nxt = stim_idx[valid], nxt[valid]
+    resp_idx = out_idx[nxt]
+    following = np.append(stim_idx[1:], len(t))
+    keep = resp_idx < following
+    return t[resp_idx[keep]] - t[stim_idx[keep]]
+
+
+def latency_summary(latency_s):
+    if not len(latency_s):
+        return {"n": 0}
+    ms = latency_s * 1000.0
+    out = {"n": int(len(ms)), "mean_ms": float(ms.mean()), "max_ms": float(ms.max())}
+    for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        out[f"p{p}_ms"] = float(v)
+    return out
@@ -0,0 +1,84 @@
+# analysis/step.py
+# Step-response metrics: rise time, overshoot, settling time
+# Author: savant42
+
+import numpy as np
+
+
+def find_steps(command, min_delta):
+    """Indices where the command jumps by at least min_delta between consecutive samples."""
+    command = np.asarray(command, dtype=np.float64)
+    return np.flatnonzero(np.abs(np.diff(command)) >= min_delta) + 1
+
+
+def _first_crossing(values, level, rising):
+    hits = np.flatnonzero(values >= level) if rising else np.flatnonzero(values <= level)
+    return hits[0] if len(hits) else -1
+
+
+def step_response(t, command, response, min_delta=None, settle_band=0.05, tail=0.2, min_samples=10):
+    """Metrics for every command step, each measured up to the next step.
+
+    Returns a structured array with one row per step: t0, cmd_from, cmd_to,
+    y0 (response before the step), y_final (mean of the last `tail` of the
+    window), rise_s (10-90 % of the response change), overshoot_pct (beyond
+    y_final, relative to the change), settle_s (last exit from +/- settle_band
+    of the change around y_final). Undefined metrics are NaN.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    command = np.asarray(command, dtype=np.float64)
+    response = np.asarray(response, dtype=np.float64)
+    if min_delta is None:
+        span = np.ptp(command) if len(command) else 0.0
+        min_delta = max(span * 0.1, 1e-9)
+    steps = find_steps(command, min_delta)
+    bounds = np.append(steps, len(t))
+
+    out = np.full(len(steps), np.nan, dtype=[
+        ("t0", "f8"), ("cmd_from", "f8"), ("cmd_to", "f8"), ("y0", "f8"), ("y_final", "f8"),
+        ("rise_s", "f8"), ("overshoot_pct", "f8"), ("settle_s", "f8"),
+    ])
+    out["t0"] = t[steps]
+    out["cmd_from"] = command[steps - 1]
+    out["cmd_to"] = command[steps]
+    out["y0"] = response[steps - 1]
+    for n, i in enumerate(steps):
+        end = bounds[n + 1]
+        row = out[n]  # np.void view: field writes land in out
+        if end - i < min_samples:
+            continue
+        tw = t[i:end] - t[i]
+        yw = response[i:end]
+        k = max(1, int(len(yw) * tail))
+        y_final = yw[-k:].mean()
+        row["y_final"] = y_final
+        delta = y_final - response[i - 1]
+        if abs(delta) < 1e-9:
+            continue
+        rising = delta > 0
+        y0 = response[i - 1]
+        i10 = _first_crossing(yw, y0 + 0.1 * delta, rising)
+        i90 = _first_crossing(yw, y0 + 0.9 * delta, rising)
+        if i10 >= 0 and i90 >= 0:
+            row["rise_s"] = tw[i90] - tw[i10]
+        peak = yw.max() if rising else yw.min()
+        row["overshoot_pct"] = max(0.0, 100.0 * (peak - y_final) / delta)
+        outside = np.flatnonzero(np.abs(yw - y_final) > abs(delta) * settle_band)
+        if not len(outside):
+            row["settle_s"] = 0.0
+        elif outside[-1] + 1 < len(tw):
+            row["settle_s"] = tw[outside[-1] + 1]
+    return out
+
+
+def step_summary(steps):
+    """Median / worst of each metric over a step table, ignoring NaN."""
+    summary = {"steps": int(len(steps))}
+    for name in ("rise_s", "overshoot_pct", "settle_s"):
+        col = steps[name][~np.isnan(steps[name])] if len(steps) else np.empty(0)
+        summary[name] = {
+            "median": float(np.median(col)) if len(col) else None,
+            "max": float(col.max()) if len(col) else None,
+            "n": int(len(col)),
+        }
+    return summary
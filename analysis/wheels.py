@@ -0,0 +1,87 @@
+# analysis/wheels.py
+# Per-wheel duty->speed curves and left/right speed mismatch
+# Author: savant42
+
+import numpy as np
+
+CURVE_DTYPE = np.dtype([
+    ("duty_lo", "f8"), ("duty_hi", "f8"), ("n", "i8"),
+    ("pps_median", "f8"), ("pps_p10", "f8"), ("pps_p90", "f8"),
+])
+
+
+def steady_mask(duty, hold_samples):
+    """True where duty has not changed for at least hold_samples samples."""
+    duty = np.asarray(duty)
+    if not len(duty):
+        return np.zeros(0, dtype=bool)
+    change = np.flatnonzero(np.diff(duty) != 0) + 1
+    starts = np.zeros(len(duty), dtype=np.int64)
+    starts[change] = change
+    last_change = np.maximum.accumulate(starts)
+    return (np.arange(len(duty)) - last_change) >= hold_samples
+
+
+def duty_speed_curve(duty, pps, bins=20, hold_samples=30):
+    """Median pulses/sec per duty bin, using only settled, driven samples.
+
+    duty is a 0..1 fraction; duty 0 is coasting, not a steady state, and is
+    left out. Returns a structured array of (duty_lo, duty_hi, n, pps_median,
+    pps_p10, pps_p90); empty bins are dropped, and a trace that never holds a
+    driven duty (e.g. parked at neutral) gives an empty array.
+    """
+    duty = np.asarray(duty, dtype=np.float64)
+    pps = np.asarray(pps, dtype=np.float64)
+    mask = steady_mask(duty, hold_samples) & (duty > 0)
+    if not mask.any():
+        return np.zeros(0, dtype=CURVE_DTYPE)
+    d, s = duty[mask], pps[mask]
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(d, edges) - 1, 0, bins - 1)
+    order = np.argsort(which, kind="stable")
+    which, s = which[order], s[order]
+    present, first = np.unique(which, return_index=True)
+    groups = np.split(s, first[1:])
+    out = np.zeros(len(present), dtype=CURVE_DTYPE)
+    out["duty_lo"] = edges[present]
+    out["duty_hi"] = edges[present + 1]
+    for n, g in enumerate(groups):
+        out["n"][n] = len(g)
+        out["pps_median"][n] = np.median(g)
+        out["pps_p10"][n], out["pps_p90"][n] = np.percentile(g, (10, 90))
+    return out
+
+
+def stall_duty(curve, min_pps=5.0):
+    """Lowest duty bin whose median speed clears min_pps, or None."""
+    moving = curve[curve["pps_median"] >= min_pps]
+    return float(moving["duty_lo"].min()) if len(moving) else None
+
+
+def wheel_mismatch(left_duty, right_duty, left_pps, right_pps, hold_samples=30, min_pps=20.0,
+                   duty_tol=0.01):
+    """Relative speed difference (L-R)/mean while both wheels get the same settled duty.
+
+    Positive means the left wheel runs fast. Returns summary statistics and
+    the per-sample ratio array under "samples".
+    """
+    ld = np.asarray(left_duty, dtype=np.float64)
+    rd = np.asarray(right_duty, dtype=np.float64)
+    lp = np.asarray(left_pps, dtype=np.float64)
+    rp = np.asarray(right_pps, dtype=np.float64)
+    mean = (lp + rp) / 2.0
+    mask = (steady_mask(ld, hold_samples) & steady_mask(rd, hold_samples)
+            & (np.abs(ld - rd) <= duty_tol) & (ld > 0) & (mean >= min_pps))
+    rel = (lp[mask] - rp[mask]) / mean[mask]
+    if not len(rel):
+        return {"n": 0, "samples": rel}
+    p5, p50, p95 = np.percentile(rel, (5, 50, 95))
+    return {
+        "n": int(len(rel)),
+        "mean_pct": float(100 * rel.mean()),
+        "std_pct": float(100 * rel.std()),
+        "p5_pct": float(100 * p5),
+        "p50_pct": float(100 * p50),
+        "p95_pct": float(100 * p95),
+        "samples": rel,
+    }
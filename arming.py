@@ -0,0 +1,134 @@
+# /arming.py
+# Warm-up, arming (CH3 ghost-repeat + CH8), brake switch and throttle baseline
+# logic from ibusting-oled.py, with no pins and no prints
+# Author: savant42
+#
+# update() takes one frame of 0-based channels and returns a bitmask of events;
+# the caller owns the STOP/BRAKE/PWM pins and the console. The same object runs
+# on the sled and in tools/replay.py, so a radio capture replays through exactly
+# the logic that drove the wheels.
+#
+#   gate = ArmingGate(mixer)
+#   events = gate.update(channels)
+#   if events & EV_ARMED: stop pins HIGH
+#   if events & EV_DISARMED: stop pins LOW
+#   if events & EV_FAILSAFE: BRAKE HIGH, STOP LOW (mixer is zeroed and written)
+#   if gate.write: DIR/PWM from mixer.left_* / right_*
+
+from intent_mapper import proportional_channel, BRAKE_ON_ABOVE
+from ibus_receiver import FAILSAFE_CH4_VALUE
+
+WARMUP_COUNT = 2         # frames discarded after the link comes up
+MAX_GHOST_REPEAT = 30    # identical CH3 frames before the throttle baseline is trusted
+ARM_THROTTLE_MAX = 1200  # CH3 must be low to arm
+SWITCH_ON_ABOVE = 1500   # CH8 arm switch
+DIR_FWD_ABOVE = 1550     # CH2
+DIR_REV_BELOW = 1450
+
+# Event bits
+EV_READY = 0x01          # warm-up finished, frames now used
+EV_ARMED = 0x02          # throttle baseline captured, ESCs may be enabled
+EV_BRAKE_ON = 0x04
+EV_BRAKE_OFF = 0x08
+EV_NOT_ARMED = 0x10      # CH8 still off while waiting to arm (caller rate-limits the warning)
+EV_FAILSAFE = 0x20       # receiver failsafe value seen on CH4
+EV_FAILSAFE_CLEAR = 0x40
+EV_DISARMED = 0x80       # CH8 switched off while armed: ESCs off, baseline re-captured on re-arm
+
+
+class ArmingGate:
+    def __init__(self, mixer, warmup=WARMUP_COUNT, ghost_repeat=MAX_GHOST_REPEAT):
+        self.mixer = mixer
+        self.warmup = warmup
+        self.ghost_repeat = ghost_repeat
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.ready = False
+        self.armed = False
+        self.brakes = False
+        self.failsafe = False
+        self.prev_ch5 = 1500
+        self.ghost_val = None
+        self.ghost_count = 0
+        self.startup_throttle = None
+        self.direction = 0
+        self.duty_pct = 0
+        self.write = False  # True when this frame's mixer output should go to the pins
+        self.mixer.mix(0, 0, 0, 0)  # nothing left over from before a reset
+
+    def disarm(self):
+        """Back to waiting for CH8 and a low, steady throttle; the mixer output is zeroed."""
+        self.armed = False
+        self.startup_throttle = None
+        self.ghost_val = None
+        self.ghost_count = 0
+        self.duty_pct = 0
+        self.mixer.mix(0, 0, 0, 0)
+
+    def update(self, ch):
+        self.frames += 1
+        self.write = False
+        events = 0
+        if not self.ready:
+            if self.frames >= self.warmup:
+                self.ready = True
+                events |= EV_READY
+            return events
+
+        failsafe = ch[3] == FAILSAFE_CH4_VALUE
+        if failsafe != self.failsafe:
+            self.failsafe = failsafe
+            events |= EV_FAILSAFE if failsafe else EV_FAILSAFE_CLEAR
+        if failsafe:
+            # Receiver has lost the transmitter: command zero every frame, and
+            # keep these frames out of the brake, direction and arming baseline logic
+            self.duty_pct = 0
+            self.mixer.mix(0, 0, 0, 0)
+            self.write = True
+            return events
+
+        ch5 = ch[4]
+        if ch5 != self.prev_ch5:
+            self.prev_ch5 = ch5
+            brakes = ch5 > BRAKE_ON_ABOVE
+            if brakes != self.brakes:
+                self.brakes = brakes
+                events |= EV_BRAKE_ON if brakes else EV_BRAKE_OFF
+
+        ch2 = ch[1]
+        if ch2 > DIR_FWD_ABOVE:
+            self.direction = 1
+        elif ch2 < DIR_REV_BELOW:
+            self.direction = -1
+        else:
+            self.direction = 0
+
+        ch3 = ch[2]
+        if self.armed and ch[7] <= SWITCH_ON_ABOVE:
+            self.disarm()
+            self.write = True
+            events |= EV_DISARMED
+        if self.startup_throttle is None:
+            if self.ghost_val is None or ch3 != self.ghost_val:
+                self.ghost_val = ch3
+                self.ghost_count = 1
+            else:
+                self.ghost_count += 1
+            ch8_on = ch[7] > SWITCH_ON_ABOVE
+            if self.ghost_count >= self.ghost_repeat and ch3 < ARM_THROTTLE_MAX and ch8_on:
+                self.startup_throttle = ch3
+                self.armed = True
+                events |= EV_ARMED
+            elif not ch8_on:
+                events |= EV_NOT_ARMED
+            return events
+
+        duty = (ch3 - self.startup_throttle) // 10
+        self.duty_pct = 0 if duty < 0 else 100 if duty > 100 else duty
+        if self.armed and not self.brakes:
+            self.mixer.mix(self.direction, self.duty_pct,
+                           proportional_channel(ch[0]), proportional_channel(ch[3]))
+            self.write = True
+        return events
@@ -0,0 +1,167 @@
+# /bitmap_text.py
+# Fixed-width text drawn straight into one 1-bit displayio.Bitmap
+# Author: savant42
+#
+# Status pages are a grid of character cells. Glyph source offsets are looked up
+# once at init; after that write() compares each cell with what is already on
+# screen and blits only the cells that changed. No Labels, no per-update glyph
+# objects. Put .tilegrid in a Group (or OledCompositor.group) to show it.
+
+from array import array
+
+import bitmaptools
+import displayio
+import terminalio
+
+FIRST_CHAR = 32
+LAST_CHAR = 126
+_SPACE = 32
+
+
+class BitmapText:
+    def __init__(self, width=128, height=128, font=terminalio.FONT, x=0, y=0):
+        box = font.get_bounding_box()
+        self.cell_w = box[0]
+        self.cell_h = box[1]
+        descent = -box[3] if len(box) > 3 else 0
+        self._baseline = self.cell_h - descent
+        self.cols = width // self.cell_w
+        self.rows = height // self.cell_h
+
+        self.bitmap = displayio.Bitmap(width, height, 2)
+        self.palette = displayio.Palette(2)
+        self.palette[0] = 0x000000
+        self.palette[1] = 0xFFFFFF
+        self.tilegrid = displayio.TileGrid(self.bitmap, pixel_shader=self.palette, x=x, y=y)
+
+        self._cells = bytearray([_SPACE] * (self.cols * self.rows))
+        self.cells_drawn = 0
+        self.dirty = False
+        self._load_glyphs(font)
+
+    def _load_glyphs(self, font):
+        count = LAST_CHAR - FIRST_CHAR + 1
+        if hasattr(font, "load_glyphs"):
+            font.load_glyphs("".join(chr(c) for c in range(FIRST_CHAR, LAST_CHAR + 1)))
+        self._src = [None] * count
+        self._sx = array("H", [0] * count)
+        self._sy = array("H", [0] * count)
+        self._gw = array("B", [0] * count)
+        self._gh = array("B", [0] * count)
+        self._ox = array("b", [0] * count)  # glyph offset inside its cell
+        self._oy = array("b", [0] * count)
+        for i in range(count):
+            glyph = font.get_glyph(FIRST_CHAR + i)
+            if glyph is None:
+                continue
+            per_row = max(1, glyph.bitmap.width // glyph.width) if glyph.width else 1
+            self._src[i] = glyph.bitmap
+            self._sx[i] = (glyph.tile_index % per_row) * glyph.width
+            self._sy[i] = (glyph.tile_index // per_row) * glyph.height
+            self._gw[i] = min(glyph.width, self.cell_w)
+            self._gh[i] = min(glyph.height, self.cell_h)
+            self._ox[i] = max(0, glyph.dx)
+            self._oy[i] = max(0, self._baseline - glyph.height - glyph.dy)
+
+    def _draw_cell(self, index, code):
+        col = index % self.cols
+        row = index // self.cols
+        x = col * self.cell_w
+        y = row * self.cell_h
+        bitmaptools.fill_region(self.bitmap, x, y, x + self.cell_w, y + self.cell_h, 0)
+        g = code - FIRST_CHAR
+        if 0 <= g <= LAST_CHAR - FIRST_CHAR and self._src[g] is not None and code != _SPACE:
+            gx = x + self._ox[g]
+            gy = y + self._oy[g]
+            w = min(self._gw[g], x + self.cell_w - gx)
+            h = min(self._gh[g], y + self.cell_h - gy)
+            if w > 0 and h > 0:
+                sx = self._sx[g]
+                sy = self._sy[g]
+                bitmaptools.blit(self.bitmap, self._src[g], gx, gy,
+                                 x1=sx, y1=sy, x2=sx + w, y2=sy + h)
+        self._cells[index] = code
+        self.cells_drawn += 1
+        self.dirty = True
+
+    def _put(self, index, code):
+        if self._cells[index] != code:
+            self._draw_cell(index, code)
+            return 1
+        return 0
+
+    def write(self, row, col, text):
+        """Writes text starting at (row, col), clipped to the row. Returns cells changed."""
+        if row >= self.rows:
+            return 0
+        base = row * self.cols
+        changed = 0
+        for ch in text:
+            if col >= self.cols:
+                break
+            changed += self._put(base + col, ord(ch))
+            col += 1
+        return changed
+
+    def write_line(self, row, text):
+        """Writes text at the start of a row and blanks the rest of it."""
+        changed = self.write(row, 0, text)
+        base = row * self.cols
+        for col in range(len(text), self.cols):
+            changed += self._put(base + col, _SPACE)
+        return changed
+
+    def write_number(self, row, col, value, width):
+        """Right-aligns an integer in a width-cell field without building a string."""
+        if row >= self.rows:
+            return 0
+        base = row * self.cols
+        neg = value < 0
+        if neg:
+            value = -value
+        changed = 0
+        end = min(col + width, self.cols) - 1
+        i = end
+        while i >= col:
+            if value or i == end:
+                changed += self._put(base + i, 48 + value % 10)
+                value //= 10
+            elif neg:
+                changed += self._put(base + i, 45)  # '-'
+                neg = False
+            else:
+                changed += self._put(base + i, _SPACE)
+            i -= 1
+        return changed
+
+    def write_fixed(self, row, col, value, width, decimals):
+        """Right-aligns value / 10**decimals (value an int) with a decimal point, no string."""
+        if row >= self.rows:
+            return 0
+        base = row * self.cols
+        neg = value < 0
+        if neg:
+            value = -value
+        changed = 0
+        first_int = decimals + 1 if decimals else 0  # position of the ones digit from the right
+        pos = 0
+        i = min(col + width, self.cols) - 1
+        while i >= col:
+            if pos < decimals or pos == first_int or (value and pos > first_int):
+                code = 48 + value % 10
+                value //= 10
+            elif decimals and pos == decimals:
+                code = 46  # '.'
+            elif neg:
+                code = 45  # '-'
+                neg = False
+            else:
+                code = _SPACE
+            changed += self._put(base + i, code)
+            pos += 1
+            i -= 1
+        return changed
+
+    def clear(self):
+        for i in range(len(self._cells)):
+            self._put(i, _SPACE)
@@ -0,0 +1,187 @@
+# /boot_sequence.py
+# Motor-safe first, then staged bring-up with a per-stage boot timeline
+# Author: savant42
+#
+# code.py calls safe_motors() before anything else is imported: every STOP pin
+# is driven LOW (ESC disabled) and every BRAKE pin HIGH, so the ESCs never see
+# floating enables while fonts, displayio and drivers load. The shipped STOP/BRAKE
+# pins go safe by board name first; config (whose loader may parse
+# robot_config.txt) is imported only after that, and any remapped pins follow. The pins stay
+# claimed here; scripts that drive STOP/BRAKE themselves get the same objects
+# through take(), already in the safe state, instead of re-claiming the pins.
+#
+#   import boot_sequence
+#   boot = boot_sequence.timeline
+#   with boot.stage("uart"):
+#       decoder = IBusDecoder(open_uart())
+#   boot.mark("control")          # instantaneous event, e.g. control loop live
+#   boot.report()
+#
+# Stage times are ms since power-on (time.monotonic starts at reset), so the
+# first line also shows how long CircuitPython itself took to reach code.py.
+
+import time
+
+
+class BootTimeline:
+    def __init__(self):
+        self.names = []
+        self.start_ms = []
+        self.dur_us = []
+        self.ok = []
+        self._name = None
+        self._t0 = 0
+
+    def stage(self, name):
+        self._name = name
+        return self
+
+    def __enter__(self):
+        self._t0 = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._add(self._name, self._t0, (time.monotonic_ns() - self._t0) // 1000, exc_type is None)
+        return False
+
+    def _add(self, name, t0_ns, us, ok):
+        self.names.append(name)
+        self.start_ms.append(t0_ns // 1_000_000)
+        self.dur_us.append(us)
+        self.ok.append(ok)
+
+    def mark(self, name):
+        self._add(name, time.monotonic_ns(), 0, True)
+
+    def run(self, name, fn):
+        """Runs fn as a stage; returns its result, or None after printing the error."""
+        try:
+            with self.stage(name):
+                return fn()
+        except Exception as e:
+            print(f"⚠️ boot stage {name} failed:", e)
+            return None
+
+    def elapsed_ms(self, name):
+        """ms since power-on at the end of the named stage, or None."""
+        for i in range(len(self.names) - 1, -1, -1):
+            if self.names[i] == name:
+                return self.start_ms[i] + self.dur_us[i] // 1000
+        return None
+
+    def lines(self):
+        return [f"{'✅' if self.ok[i] else '❌'} {self.start_ms[i]:>6}ms {self.names[i]:<10} {self.dur_us[i]:>7}us"
+                for i in range(len(self.names))]
+
+    def report(self):
+        print("🥾 Boot timeline (ms since power-on, stage time):")
+        for line in self.lines():
+            print("  " + line)
+
+
+timeline = BootTimeline()
+
+# Safe-state outputs claimed at boot, keyed by pin. Entries stay after take() so a
+# crash can still drive them back to safe.
+_held = {}
+
+
+def _output(pin, value):
+    import digitalio
+    io = digitalio.DigitalInOut(pin)
+    io.switch_to_output(value=value)
+    return io
+
+
+def _live(io):
+    try:
+        io.value
+        return True
+    except (ValueError, AttributeError):  # deinit()ed by a script
+        return False
+
+
+# STOP/BRAKE as wired in the shipped robot_config.txt, by board name. Driven safe
+# before config is imported, so no config code runs while the enables float.
+SAFE_PINS = (("D10", False), ("D6", True),    # left STOP, BRAKE
+             ("D17", False), ("D15", True))   # right STOP, BRAKE
+
+
+def _hold(pin, value):
+    io = _held.get(pin)
+    if io is not None and _live(io):
+        io.value = value
+    else:
+        _held[pin] = _output(pin, value)
+
+
+def safe_motors(motor_config=None):
+    """STOP LOW, BRAKE HIGH on every wheel: the SAFE_PINS defaults first, then the
+    configured pins. Default pins the config maps elsewhere are released again.
+    Idempotent: pins already held are reused."""
+    with timeline.stage("safe"):
+        import board
+        defaults = [getattr(board, name) for name, _ in SAFE_PINS]
+        for pin, (_, value) in zip(defaults, SAFE_PINS):
+            try:
+                _hold(pin, value)
+            except ValueError:  # in use: a script has it for something else under its config
+                pass
+    with timeline.stage("config"):
+        if motor_config is None:
+            from config import MOTOR_CONFIG
+            motor_config = MOTOR_CONFIG
+        wanted = []
+        for device in motor_config.values():
+            for key, value in (('STOP', False), ('BRAKE', True)):
+                _hold(device[key], value)
+                wanted.append(device[key])
+        for pin in defaults:
+            io = _held.pop(pin, None) if pin not in wanted else None
+            if io is not None:
+                io.deinit()
+
+
+def take(pin, value):
+    """The output for pin, set to value. Scripts use this instead of
+    digitalio.DigitalInOut for STOP/BRAKE so the boot-held pin is reused; they may
+    deinit() it, and the next take() claims the pin again."""
+    io = _held.get(pin)
+    if io is None or not _live(io):
+        io = _output(pin, value)
+        _held[pin] = io
+    else:
+        io.value = value
+    return io
+
+
+def entry_module(script_path):
+    """'/robot-main.py' -> 'robot-main'."""
+    name = script_path.lstrip("/")
+    if name.endswith(".py") or name.endswith(".mpy"):
+        name = name[:name.rindex(".")]
+    return name.replace("/", ".")
+
+
+def run_entry(script_path):
+    """Imports the entry script as a module, so a frozen or .mpy build loads the same
+    way, and calls its main(). Entry scripts keep their loop in main() behind
+    `if __name__ == "__main__":`, so running them directly still works. Returns
+    False (motors back to safe) if it raised."""
+    import sys
+    name = entry_module(script_path)
+    timeline.mark("entry")
+    print(f"Running: {script_path}")
+    try:
+        __import__(name)
+        main = getattr(sys.modules[name], "main", None)
+        if main is not None:
+            main()
+        return True
+    except Exception as e:
+        print(f"Error running {script_path}:", e)
+        try:
+            safe_motors()
+        except Exception as e2:
+            print("❌ could not re-assert motor safe state:", e2)
+        return False
@@ -1,23 +1,22 @@
+# code.py
+# Motors to a safe state first, then import the script named in settings.toml and run its main()
+# Author: savant42
+import boot_sequence
+
+# STOP LOW / BRAKE HIGH before any heavy import (fonts, displayio, drivers)
+boot_sequence.safe_motors()
+
 import os
 
-# Read script path from settings.toml
+# Read script path from settings.toml. No existence check on the .py: the entry
+# may be a frozen module or an .mpy, and run_entry reports an import failure.
 script_to_run = os.getenv("SCRIPT_PATH")
 
-def run_script(script_path):
-    """Executes the script at the given path."""
-    try:
-        with open(script_path, "r") as script_file:
-            script_code = script_file.read()
-        print(f"Running: {script_path}")
-        exec(script_code)  # Dynamically execute the script
-    except Exception as e:
-        print(f"Error running {script_path}:", e)
-
-if script_to_run:
-    try:
-        with open(script_to_run, "r"):  # Check if file exists
-            run_script(script_to_run)
-    except OSError:
-        print("Script file not found! Check SCRIPT_PATH in settings.toml.")
-else:
+if not script_to_run:
     print("No SCRIPT_PATH found in settings.toml!")
+elif not boot_sequence.run_entry(script_to_run):
+    # Leaving code.py would release the pins; keep STOP/BRAKE held until reset
+    import time
+    print("🛑 Motors held safe. Ctrl-C for the REPL.")
+    while True:
+        time.sleep(1)
@@ -1,27 +1,91 @@
 # config.py
 # Pin configuration for ZS-X11H motor tester
 # Author: savant42
-import board
+#
+# Pins and pulses-per-rev come from robot_config.txt via config_loader (parsed
+# and validated once, then loaded from robot_config.json while the text is
+# unchanged). Edit pins there, not here.
+from config_loader import load_config
+
+_cfg = load_config()
+
 # Define the pin mappings for the motors
 MOTOR_CONFIG = {
     'LEFT': {
         'name': 'Left Wheel',
-        'PWM': board.D13,       # aka IO11
-        'DIR': board.D9,        # aka IO1
-        'STOP': board.D10,      # aka IO3
-        'BRAKE': board.D6,      # aka IO38
-        'PULSE': board.D12,     # aka IO10
+        'PWM': _cfg['MOTOR_LEFT_PWM_PIN'],        # D13 aka IO11
+        'DIR': _cfg['MOTOR_LEFT_DIR_PIN'],        # D9 aka IO1
+        'STOP': _cfg['MANUAL_STOP_LEFT_PIN'],     # D10 aka IO3
+        'BRAKE': _cfg['MOTOR_LEFT_BRAKE_PIN'],    # D6 aka IO38
+        'PULSE': _cfg['SPEED_PULSE_LEFT_PIN'],    # D12 aka IO10
         'FWD': True,
-        'DESIRED_DIR': 'FWD'
+        'DESIRED_DIR': 'FWD',
+        'PULSES_PER_REV': _cfg['PULSES_PER_REV_LEFT']
     },
     'RIGHT': {
         'name': 'Right Wheel',
-        'PWM': board.D19,       # aka IO5
-        'DIR': board.D16,       # aka IO14
-        'STOP': board.D17,      # aka IO12
-        'BRAKE': board.D15,     # aka IO18
-        'PULSE': board.D18,     # aka IO16
+        'PWM': _cfg['MOTOR_RIGHT_PWM_PIN'],       # D19 aka IO5
+        'DIR': _cfg['MOTOR_RIGHT_DIR_PIN'],       # D16 aka IO14
+        'STOP': _cfg['MANUAL_STOP_RIGHT_PIN'],    # D17 aka IO12
+        'BRAKE': _cfg['MOTOR_RIGHT_BRAKE_PIN'],   # D15 aka IO18
+        'PULSE': _cfg['SPEED_PULSE_RIGHT_PIN'],   # D14 aka IO6
         'FWD': False,
-        'DESIRED_DIR': 'FWD'
+        'DESIRED_DIR': 'FWD',
+        'PULSES_PER_REV': _cfg['PULSES_PER_REV_RIGHT']
     }
-}    
+}
+
+PWM_FREQUENCY = _cfg['TARGET_PWM_FREQUENCY']
+
+# PWM ramp for the bench testers: start above static friction, step to 100%
+RAMP_MIN_DUTY = 20   # %
+RAMP_STEP = 5        # %
+RAMP_DELAY = 0.5     # s per step
+
+# Control runtime task periods (ms). iBUS frames arrive every ~7 ms.
+TASK_PERIODS_MS = {
+    'ibus': 2,
+    'intent': 7,
+    'motor': 10,
+    'speed': 20,
+    'i2c': 10,
+    'gnss': 1000,
+    'display': 100,
+    'oled': 100,      # panel refresh: pushes the one status row display_task changed (~1-9 ms)
+    'boot': 20,
+    'flush': 250,
+    'log': 50,
+    'gc': 1000,
+}
+
+# No good iBUS frame for this long (or the receiver's failsafe CH4 value) counts
+# as a lost link: the motor task stops the wheels and drops the ESC enables.
+LINK_TIMEOUT_MS = 200
+
+# Flight recorder: 1024 x 64-byte records = 64 KB RAM, ~7 s at the iBUS frame rate
+RECORDER_RECORDS = 1024
+FLIGHT_LOG_DIR = "/logs"  # CIRCUITPY must be remounted writable in boot.py
+
+# Time budget for one pass of queued I2C work. Checked between transactions,
+# so one transaction is never cut short; long work (the OLED refresh) stays out.
+I2C_BUDGET_US = 4000
+
+# Closed-loop wheel speed (speed_pid.py). Mixer commands map to a target speed,
+# 100% = SPEED_MAX_PPS; runs at the 'speed' task period. Open loop if no speed inputs.
+SPEED_CLOSED_LOOP = True
+SPEED_MAX_PPS = 600       # hall pulses/sec at full command
+SPEED_FF_MIN_DUTY = 18    # % duty where the wheels just keep turning (below it they stall)
+SPEED_PID = {'Kp': 0.1, 'Ki': 0.5, 'Kd': 0.0}  # % duty per pps, per pps*s, per pps/s
+
+# Low-speed pulse-burst crawl (MotorController.crawl), per wheel. Targets under
+# HOLD_PPS (the steady speed at HOLD duty, just above stall) are driven as a
+# KICK burst above breakaway, then HOLD, then rest, once per PERIOD_MS. Take
+# stall/breakaway from the duty sweep (duty_speed.py) for each wheel.
+CRAWL_CONFIG = {
+    'LEFT': {'KICK': 28, 'KICK_MS': 30, 'HOLD': 20, 'HOLD_PPS': 14, 'PERIOD_MS': 400},
+    'RIGHT': {'KICK': 28, 'KICK_MS': 30, 'HOLD': 20, 'HOLD_PPS': 14, 'PERIOD_MS': 400},
+}
+
+# Drive mixer limits (% of full duty)
+MIXER_PIVOT_LIMIT = 60   # wheel duty at full pivot stick, in place
+MIXER_VEER_LIMIT = 100   # inner-wheel slowdown at full veer stick
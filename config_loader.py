@@ -0,0 +1,220 @@
+# /config_loader.py
+# Parses and validates robot_config.txt once, then boots from a cached snapshot
+# Author: savant42
+#
+# robot_config.txt is the one place pins and tunables are set. The first boot
+# after an edit parses every line, checks types, ranges and that each pin name
+# exists on this board and is used only once, then writes robot_config.json:
+#
+#   {"crc": <crc32 of robot_config.txt>, "version": 1, "values": {...}}
+#
+# Every later boot only reads the text file to hash it; if the crc matches the
+# snapshot, the already-validated values are used as-is and the only work left
+# is getattr(board, name) per pin. If flash is read-only (CIRCUITPY mounted for
+# USB), the snapshot is skipped and the text is parsed every boot.
+#
+#   from config_loader import load_config
+#   cfg = load_config()
+#   cfg["MOTOR_LEFT_PWM_PIN"]   # board.D13
+#   cfg["DEBUG_LEVEL"]          # 3
+
+import json
+from binascii import crc32
+
+SNAPSHOT_VERSION = 1
+
+# key -> (type, default, min, max). Keys ending in _PIN are board pin names.
+# A default of None means the key is required.
+SCHEMA = {
+    "MOTOR_LEFT_PWM_PIN": ("pin", None, None, None),
+    "SPEED_PULSE_LEFT_PIN": ("pin", None, None, None),
+    "MANUAL_STOP_LEFT_PIN": ("pin", None, None, None),
+    "MOTOR_LEFT_DIR_PIN": ("pin", None, None, None),
+    "MOTOR_LEFT_BRAKE_PIN": ("pin", None, None, None),
+    "MOTOR_RIGHT_PWM_PIN": ("pin", None, None, None),
+    "SPEED_PULSE_RIGHT_PIN": ("pin", None, None, None),
+    "MANUAL_STOP_RIGHT_PIN": ("pin", None, None, None),
+    "MOTOR_RIGHT_DIR_PIN": ("pin", None, None, None),
+    "MOTOR_RIGHT_BRAKE_PIN": ("pin", None, None, None),
+    "PULSES_PER_REV_LEFT": ("int", 90, 1, 10000),
+    "PULSES_PER_REV_RIGHT": ("int", 90, 1, 10000),
+    "DEBUG": ("bool", True, None, None),
+    "DEBUG_LEVEL": ("int", 3, 1, 4),
+    "TARGET_PWM_FREQUENCY": ("int", 2000, 100, 40000),
+}
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def _here():
+    try:
+        return __file__.rpartition("/")[0]
+    except NameError:
+        return ""
+
+
+def default_path():
+    """/robot_config.txt on the board, else the copy next to this module (desktop, sim)."""
+    for path in ("/robot_config.txt", _here() + "/robot_config.txt"):
+        try:
+            open(path).close()
+            return path
+        except OSError:
+            pass
+    raise ConfigError("robot_config.txt not found")
+
+
+def _convert(kind, key, text, lo, hi, board):
+    if kind == "pin":
+        if board is not None and not hasattr(board, text):
+            raise ConfigError(f"{key}: board has no pin {text}")
+        return text
+    if kind == "bool":
+        if text not in ("True", "False"):
+            raise ConfigError(f"{key}: expected True or False, got {text!r}")
+        return text == "True"
+    try:
+        value = int(text) if kind == "int" else float(text)
+    except ValueError:
+        raise ConfigError(f"{key}: expected {kind}, got {text!r}")
+    if (lo is not None and value < lo) or (hi is not None and value > hi):
+        raise ConfigError(f"{key}: {value} outside {lo}..{hi}")
+    return value
+
+
+def parse(text, board=None):
+    """Parses and validates config text. Returns (values, warnings); pins stay as names.
+
+    Raises ConfigError listing every problem found, not just the first.
+    """
+    values = {}
+    bad = set()
+    errors = []
+    warnings = []
+    for n, line in enumerate(text.splitlines(), 1):
+        line = line.split("#")[0].strip()
+        if not line:
+            continue
+        key, sep, value = line.partition("=")
+        key, value = key.strip(), value.strip()
+        if not sep or not key or not value:
+            errors.append(f"line {n}: expected KEY = VALUE")
+            continue
+        spec = SCHEMA.get(key)
+        if spec is None:
+            warnings.append(f"line {n}: unknown key {key}")
+            continue
+        if key in values:
+            errors.append(f"line {n}: {key} set twice")
+            continue
+        try:
+            values[key] = _convert(spec[0], key, value, spec[2], spec[3], board)
+        except ConfigError as e:
+            errors.append(f"line {n}: {e}")
+            bad.add(key)
+
+    pins = {}
+    for key, (kind, default, _, _) in SCHEMA.items():
+        if key not in values:
+            if default is None and key not in bad:
+                errors.append(f"{key} missing")
+            else:
+                values[key] = default
+        elif kind == "pin":
+            other = pins.get(values[key])
+            if other:
+                errors.append(f"{key}: {values[key]} already used by {other}")
+            pins[values[key]] = key
+    if errors:
+        raise ConfigError("robot_config.txt: " + "; ".join(errors))
+    return values, warnings
+
+
+def resolve_pins(values, board):
+    """Replaces pin names with board pin objects."""
+    out = dict(values)
+    for key, (kind, _, _, _) in SCHEMA.items():
+        if kind == "pin":
+            out[key] = getattr(board, values[key])
+    return out
+
+
+def _read_snapshot(path, crc):
+    try:
+        with open(path) as f:
+            snap = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snap.get("crc") != crc or snap.get("version") != SNAPSHOT_VERSION:
+        return None
+    values = snap.get("values")
+    # A schema change without a version bump still forces a re-parse
+    if not isinstance(values, dict) or set(values) != set(SCHEMA):
+        return None
+    return values
+
+
+def _write_snapshot(path, crc, values):
+    try:
+        with open(path, "w") as f:
+            json.dump({"crc": crc, "version": SNAPSHOT_VERSION, "values": values}, f)
+        return True
+    except OSError:  # read-only flash
+        return False
+
+
+_cached = None
+source = None  # "snapshot" or "parsed" for the last load
+
+
+def load_config(path=None, snapshot=None, use_snapshot=True):
+    """Returns the validated config dict with board pins resolved. Cached after the first call."""
+    global _cached, source
+    default = path is None and snapshot is None
+    if _cached is not None and default:
+        return _cached
+    import board
+
+    if path is None:
+        path = default_path()
+    if snapshot is None:
+        snapshot = path.rpartition(".")[0] + ".json"
+    with open(path, "rb") as f:
+        raw = f.read()
+    crc = crc32(raw) & 0xFFFFFFFF
+
+    cfg = None
+    values = _read_snapshot(snapshot, crc) if use_snapshot else None
+    if values is not None:
+        try:
+            cfg = resolve_pins(values, board)
+            source = "snapshot"
+        except AttributeError:  # snapshot from another board: parse and report properly
+            cfg = None
+    if cfg is None:
+        values, warnings = parse(raw.decode(), board)
+        for w in warnings:
+            print("⚠️ robot_config.txt", w)
+        if use_snapshot:
+            _write_snapshot(snapshot, crc, values)
+        cfg = resolve_pins(values, board)
+        source = "parsed"
+    if default:
+        _cached = cfg
+    return cfg
+
+
+def main():
+    import time
+    t0 = time.monotonic_ns()
+    cfg = load_config()
+    us = (time.monotonic_ns() - t0) // 1000
+    print(f"⚙️ robot_config.txt loaded from {source} in {us}us")
+    for key in SCHEMA:
+        print(f"  {key} = {cfg[key]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# /control_runtime.py
+# Cooperative asyncio runtime for the robot control loop
+# Author: savant42
+#
+# Each subsystem (iBUS ingest, intent, motor, speed, GNSS, display) is a plain
+# callable wrapped in a PeriodicTask with its own period. Tasks run in
+# registration order when several are due, so register control-path work first.
+# All tasks share one thread and nothing preempts a running tick: a slow display
+# or GNSS tick delays every task that falls due behind it, including the motor
+# task. That shows up as missed slots in the other tasks' counters and in the
+# "late" profiler section. So each non-control task gets a budget (kept under
+# the motor period) and is split into ticks that fit it; a tick over budget is
+# counted in that task's 'overb' so the offender is named, not just its victims.
+
+import time
+
+try:
+    import asyncio
+except ImportError:  # CircuitPython without the asyncio bundle
+    asyncio = None
+
+
+class PeriodicTask:
+    def __init__(self, name, period_ms, fn, budget_ms=None):
+        self.name = name
+        self.period_ns = int(period_ms * 1_000_000)
+        self.fn = fn
+        self.budget_ns = int(budget_ms * 1_000_000) if budget_ms else 0
+        self.over_budget = 0  # ticks longer than budget_ns
+        self.next_ns = 0
+        self.runs = 0
+        self.overruns = 0  # body took longer than one period
+        self.missed = 0    # whole slots skipped because we started late
+        self.last_us = 0
+        self.max_us = 0
+        self.section = None  # profiler sections, set by ControlRuntime(profile=True)
+        self.late = None
+
+    def run_due(self, now_ns):
+        """Runs the task if its slot has arrived. Returns ns until the next slot."""
+        if now_ns < self.next_ns:
+            return self.next_ns - now_ns
+        late_ns = now_ns - self.next_ns if self.next_ns else 0
+        if late_ns >= self.period_ns:
+            self.missed += late_ns // self.period_ns
+        self.fn()
+        end_ns = time.monotonic_ns()
+        elapsed = end_ns - now_ns
+        us = elapsed // 1000
+        self.last_us = us
+        if us > self.max_us:
+            self.max_us = us
+        if elapsed > self.period_ns:
+            self.overruns += 1
+        if self.budget_ns and elapsed > self.budget_ns:
+            self.over_budget += 1
+        self.runs += 1
+        if self.section is not None:
+            self.section.record_us(us)
+            self.late.record_us(late_ns // 1000)
+        # Keep the original phase when on time; re-anchor after falling behind
+        nxt = (self.next_ns or now_ns) + self.period_ns
+        if nxt <= end_ns:
+            nxt = end_ns + self.period_ns
+        self.next_ns = nxt
+        return nxt - end_ns
+
+    def reset_stats(self):
+        self.runs = 0
+        self.overruns = 0
+        self.missed = 0
+        self.over_budget = 0
+        self.last_us = 0
+        self.max_us = 0
+
+    def stats_line(self):
+        budget = f" overb={self.over_budget}/{self.budget_ns // 1000}us" if self.budget_ns else ""
+        return (f"{self.name:<8} runs={self.runs} over={self.overruns} "
+                f"miss={self.missed} last={self.last_us}us max={self.max_us}us{budget}")
+
+
+class ControlRuntime:
+    def __init__(self, profile=False):
+        self.tasks = []
+        self.profiler = None
+        if profile:
+            import profiler
+            self.profiler = profiler
+            self._late = profiler.section("late")
+
+    def add_task(self, name, period_ms, fn, budget_ms=None):
+        """budget_ms: longest tick this task should take; longer ones count in over_budget."""
+        task = PeriodicTask(name, period_ms, fn, budget_ms)
+        if self.profiler is not None:
+            task.section = self.profiler.section(name)
+            task.late = self._late
+        self.tasks.append(task)
+        return task
+
+    def task(self, name):
+        for t in self.tasks:
+            if t.name == name:
+                return t
+        return None
+
+    def step(self, now_ns=None):
+        """Runs every due task once, in order. Returns ns until the earliest next slot."""
+        wait = None
+        for t in self.tasks:
+            remaining = t.run_due(time.monotonic_ns() if now_ns is None else now_ns)
+            if wait is None or remaining < wait:
+                wait = remaining
+        return wait or 0
+
+    async def _task_loop(self, task):
+        while True:
+            remaining = task.run_due(time.monotonic_ns())
+            await asyncio.sleep(remaining / 1_000_000_000)
+
+    async def _main(self):
+        await asyncio.gather(*[self._task_loop(t) for t in self.tasks])
+
+    def run(self):
+        """Runs forever: one asyncio task per PeriodicTask, or a step loop without asyncio."""
+        if asyncio is not None:
+            asyncio.run(self._main())
+            return
+        while True:
+            wait = self.step()
+            time.sleep(wait / 1_000_000_000)
+
+    def missed_line(self):
+        """Every task that has missed slots, e.g. 'missed ibus=29 motor=3', or 'missed none'."""
+        parts = [f"{t.name}={t.missed}" for t in self.tasks if t.missed]
+        return "missed " + (" ".join(parts) if parts else "none")
+
+    def stats_lines(self):
+        lines = [t.stats_line() for t in self.tasks]
+        lines.append(self.missed_line())
+        return lines
@@ -0,0 +1,101 @@
+# /drive_mixer.py
+# Differential-drive mixer: throttle + veer + pivot -> per-wheel duty and DIR level
+# Author: savant42
+#
+# All math is integer. Internal wheel commands are signed and scaled so that
+# FULL (10000) is 100% duty forward. Veer slows the inner wheel in proportion
+# to the stick. Pivot adds equal and opposite commands to the two wheels, which
+# spins the sled in place when throttle is zero. Outputs are a 16-bit duty for
+# PWMOut plus the DIR pin level, with each wheel's FWD polarity applied.
+
+from intent_mapper import throttle_channel
+
+FULL = 10000
+DUTY_MAX = 65535
+
+
+class DriveMixer:
+    def __init__(self, left_fwd=True, right_fwd=False, pivot_limit=60, veer_limit=100):
+        self.left_fwd = left_fwd
+        self.right_fwd = right_fwd
+        self.pivot_limit = pivot_limit  # % duty at full pivot stick
+        self.veer_limit = veer_limit    # % inner-wheel slowdown at full veer stick
+
+        # Outputs, updated in place by mix()
+        self.left_cmd = 0    # signed, -FULL..FULL
+        self.right_cmd = 0
+        self.left_duty = 0   # 0..65535
+        self.right_duty = 0
+        self.left_dir = left_fwd
+        self.right_dir = right_fwd
+
+    def _signed(self, direction, throttle, veer, pivot):
+        """
+        Sets left_cmd/right_cmd for one frame.
+        direction: -1/0/1, throttle: 0–100, veer/pivot: -100..100 (right positive).
+        """
+        v = direction * throttle * 100  # -FULL..FULL
+        left = v
+        right = v
+        if veer > 0:
+            right = right * (FULL - self.veer_limit * veer) // FULL
+        elif veer < 0:
+            left = left * (FULL + self.veer_limit * veer) // FULL
+        p = pivot * self.pivot_limit
+        left += p
+        right -= p
+        if left > FULL:
+            left = FULL
+        elif left < -FULL:
+            left = -FULL
+        if right > FULL:
+            right = FULL
+        elif right < -FULL:
+            right = -FULL
+        self.left_cmd = left
+        self.right_cmd = right
+
+    def mix(self, direction, throttle, veer, pivot):
+        self._signed(direction, throttle, veer, pivot)
+        left = self.left_cmd
+        right = self.right_cmd
+        if left >= 0:
+            self.left_duty = left * DUTY_MAX // FULL
+            self.left_dir = self.left_fwd
+        else:
+            self.left_duty = -left * DUTY_MAX // FULL
+            self.left_dir = not self.left_fwd
+        if right >= 0:
+            self.right_duty = right * DUTY_MAX // FULL
+            self.right_dir = self.right_fwd
+        else:
+            self.right_duty = -right * DUTY_MAX // FULL
+            self.right_dir = not self.right_fwd
+
+    def mix_intent(self, intent):
+        """Mixes an IntentMapper Intent. Throttle is CH3 from the bottom of the stick
+        (throttle_channel), not intent.throttle, which is distance from centre."""
+        raw = intent.raw
+        throttle = throttle_channel(raw[2]) if raw is not None else 0
+        self.mix(intent.direction, throttle, intent.veer_amt, intent.pivot_amt)
+
+    def mix_batch(self, direction, throttle, veer, pivot, out_left, out_right):
+        """
+        Mixes recorded frame arrays (lists, array.array or NumPy), writing signed
+        -FULL..FULL commands into out_left/out_right. For offline checks.
+        """
+        for i in range(len(direction)):
+            self._signed(int(direction[i]), int(throttle[i]), int(veer[i]), int(pivot[i]))
+            out_left[i] = self.left_cmd
+            out_right[i] = self.right_cmd
+        return out_left, out_right
+
+
+def from_config():
+    from config import MOTOR_CONFIG, MIXER_PIVOT_LIMIT, MIXER_VEER_LIMIT
+    return DriveMixer(
+        left_fwd=MOTOR_CONFIG['LEFT']['FWD'],
+        right_fwd=MOTOR_CONFIG['RIGHT']['FWD'],
+        pivot_limit=MIXER_PIVOT_LIMIT,
+        veer_limit=MIXER_VEER_LIMIT,
+    )
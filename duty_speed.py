@@ -0,0 +1,203 @@
+# /duty_speed.py
+# Measured duty->speed tables: bench sweep, flash persistence, O(1) feedforward lookup
+# Author: savant42
+#
+# sweep() drives both wheels through the duty range (WheelRig, one time base),
+# up then down in each direction, and records steady-state pulse rate per step.
+# Going up finds breakaway (the deadband is everything below it); coming down
+# finds the stall duty, where a turning wheel stops. The descending branch is
+# the moving steady state, so it is inverted into a fixed number of evenly
+# spaced speed bins -> 16-bit duty and written to /duty_speed_table.py.
+#
+# On the sled, MotorController loads its two tables (fwd/rev) at setup and
+# duty_for() is one multiply, one divide and an interpolation: no search.
+#
+#   bench (wheels off the ground): harness main menu, or duty_speed.main() at the REPL
+#   table = duty_speed.load('LEFT', True)
+#   table.duty_for(1200)    # duty for 120.0 pps forward
+
+from array import array
+
+BINS = 33                 # speed bins, 0..max_pps inclusive
+TABLE_PATH = "/duty_speed_table.py"
+MIN_MOVING_PPS = 5.0      # below this a wheel counts as stopped (~3 RPM at 90 pulses/rev)
+DECAY_RATIO = 0.7         # second-half / first-half rate below this = still coasting to a stop
+
+
+class DutySpeedTable:
+    __slots__ = ("max_x10", "stall", "breakaway", "bins")
+
+    def __init__(self, max_x10, stall, breakaway, bins):
+        self.max_x10 = max_x10      # fastest measured speed, pps x10
+        self.stall = stall          # % duty: lowest that keeps a turning wheel turning
+        self.breakaway = breakaway  # % duty: lowest that starts a stopped wheel (deadband top)
+        self.bins = bins            # array('H'): duty for speed i * max / (BINS - 1)
+
+    def duty_for(self, pps_x10):
+        """16-bit duty for a steady speed; 0 for 0, full-table duty beyond the measured max."""
+        if pps_x10 <= 0:
+            return 0
+        bins = self.bins
+        top = self.max_x10
+        if pps_x10 >= top:
+            return bins[len(bins) - 1]
+        pos = pps_x10 * (len(bins) - 1)
+        i = pos // top
+        frac = pos - i * top
+        lo = bins[i]
+        return lo + (bins[i + 1] - lo) * frac // top
+
+
+_tables = None
+
+
+def load(name, forward=True):
+    """The saved table for wheel `name` ('LEFT'/'RIGHT') and direction, or None."""
+    global _tables
+    if _tables is None:
+        try:
+            from duty_speed_table import TABLES
+            _tables = TABLES
+        except ImportError:
+            _tables = {}
+    entry = _tables.get((name, bool(forward)))
+    if entry is None or entry[0] <= 0:
+        return None  # never measured moving: let the caller fall back to linear duty
+    return DutySpeedTable(*entry)
+
+
+# === Building tables (host or bench) ===
+def invert(points, bins=BINS):
+    """points: [(duty %, pps)] of the moving branch. Returns (max_x10, array('H') duty per speed bin)."""
+    pts = sorted(p for p in points if p[1] >= MIN_MOVING_PPS)
+    if len(pts) < 2:
+        return 0, array("H", [0] * bins)
+    # Speed must rise with duty; flatten noise so the inverse is single-valued
+    mono = []
+    top = 0.0
+    for duty, pps in pts:
+        if pps > top:
+            top = pps
+            mono.append((duty, pps))
+    if len(mono) < 2:
+        return 0, array("H", [0] * bins)
+    out = array("H", [0] * bins)
+    j = 0
+    for i in range(bins):
+        s = top * i / (bins - 1)
+        while j < len(mono) - 2 and mono[j + 1][1] < s:
+            j += 1
+        (d0, s0), (d1, s1) = mono[j], mono[j + 1]
+        duty = d0 if s <= s0 else d0 + (d1 - d0) * (s - s0) / (s1 - s0)
+        out[i] = int(max(0.0, min(100.0, duty)) * 655.35)
+    return int(top * 10), out
+
+
+def analyze(up, down):
+    """up/down: [(duty %, pps)] for one wheel and direction. Returns (stall, breakaway, max_x10, bins)."""
+    breakaway = next((d for d, p in sorted(up) if p >= MIN_MOVING_PPS), 100)
+    moving = [d for d, p in down if p >= MIN_MOVING_PPS]
+    stall = min(moving) if moving else breakaway
+    max_x10, bins = invert(down or up)
+    return stall, breakaway, max_x10, bins
+
+
+def _steady_pps(run, w):
+    """Mean pps over the settled window; 0 if the wheel is still slowing (coasting through a stall)."""
+    a = max(0, run.settle)
+    end = run.n - 1
+    if end - a < 4:
+        return 0.0
+    mid = (a + end) // 2
+    c, t = run.counts[w], run.t_us
+    first = (c[mid] - c[a]) / max(1, t[mid] - t[a])
+    second = (c[end] - c[mid]) / max(1, t[end] - t[mid])
+    if second * 1_000_000 < MIN_MOVING_PPS or second < DECAY_RATIO * first:
+        return 0.0
+    return run.mean_pps(w)
+
+
+def sweep(rig, names, step_pct=5, settle_s=0.8, hold_s=1.2, log=print):
+    """Runs the sweep on every rig wheel, both directions. Returns {(name, forward): (up, down)}."""
+    import time
+    results = {}
+    run = None
+    for forward in (True, False):
+        rig.safe()
+        time.sleep(1.0)  # let the wheels stop before reversing
+        rig.set_forward(forward)
+        ups = [[] for _ in names]
+        downs = [[] for _ in names]
+        duties = list(range(0, 101, step_pct))
+        for branch, seq in ((ups, duties), (downs, duties[::-1])):
+            for duty in seq:
+                run = rig.run([duty] * len(names), settle_s + hold_s, settle_s=settle_s, run=run)
+                line = []
+                for w in range(len(names)):
+                    pps = _steady_pps(run, w)
+                    branch[w].append((duty, pps))
+                    line.append(f"{pps:6.1f}")
+                log(f" {'FWD' if forward else 'REV'} {'↑' if branch is ups else '↓'} {duty:3}%  pps " + " ".join(line))
+        for w, name in enumerate(names):
+            results[(name, forward)] = (ups[w], downs[w])
+    rig.safe()
+    return results
+
+
+def table_source(results, when="", log=print):
+    """Python source for duty_speed_table.py. Wheels that never moved are left out, with a warning."""
+    lines = [
+        "# duty_speed_table.py",
+        f"# Generated by duty_speed.sweep(){' on ' + when if when else ''}; re-run the sweep instead of editing",
+        "# (name, forward): (max_pps_x10, stall %, breakaway %, duty per speed bin)",
+        "from array import array",
+        "",
+        "TABLES = {",
+    ]
+    for (name, forward), (up, down) in sorted(results.items()):
+        stall, breakaway, max_x10, bins = analyze(up, down)
+        if max_x10 <= 0:
+            log(f"⚠️ {name} {'FWD' if forward else 'REV'} never moved; no table saved (check wiring/STOP)")
+            continue
+        lines.append(f"    ({name!r}, {forward}): ({max_x10}, {stall}, {breakaway},")
+        lines.append(f"        array('H', {list(bins)})),")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def save(results, path=TABLE_PATH, when=""):
+    """Writes the table module; prints it instead if flash is read-only."""
+    src = table_source(results, when)
+    try:
+        with open(path, "w") as f:
+            f.write(src)
+        print(f"💾 saved {path}")
+        return True
+    except OSError as e:
+        print(f"⚠️ could not write {path} ({e}); copy this to the board:\n")
+        print(src)
+        return False
+
+
+def summary(results):
+    for (name, forward), (up, down) in sorted(results.items()):
+        stall, breakaway, max_x10, _ = analyze(up, down)
+        print(f" {name:<5} {'FWD' if forward else 'REV'}: deadband 0-{breakaway}% "
+              f"(breakaway {breakaway}%), stall below {stall}%, max {max_x10 / 10:.1f}pps")
+
+
+def main(step_pct=5):
+    """Bench entry: sweeps both wheels from config and saves the table."""
+    from config import MOTOR_CONFIG
+    from wheel_rig import WheelRig
+    names = list(MOTOR_CONFIG)
+    steps = 2 * 2 * (100 // step_pct + 1)
+    print(f"\n📈 Duty sweep {', '.join(names)}: 0-100% by {step_pct}%, both directions (~{steps * 2}s)")
+    rig = WheelRig([MOTOR_CONFIG[n] for n in names])
+    try:
+        results = sweep(rig, names, step_pct)
+    finally:
+        rig.deinit()
+    summary(results)
+    save(results)
+    return results
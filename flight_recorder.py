@@ -0,0 +1,207 @@
+# /flight_recorder.py
+# In-RAM ring of fixed 64-byte binary records, flushed to flash in whole blocks
+# Author: savant42
+#
+# One record per control tick: timestamp, the 14 raw iBUS channels, the mapped
+# intent with the commanded throttle (what the wheels are driven with, not the
+# stick), per-wheel duty/dir and measured pulse rates. Records are packed in
+# place into one preallocated bytearray; record() builds no per-record objects.
+#
+# Flash writes happen only from service(idle=True) (sled stopped) or flush(),
+# and always as whole FLUSH_BLOCK-byte blocks so file offsets stay block aligned.
+# A forced flush pads the last block with empty (kind 0) records. If the ring
+# fills before anything is flushed the oldest records are overwritten and
+# counted; the ring then always holds the last few seconds for save().
+#
+# File layout: one REC_HEADER record, then records back to back. The host
+# decoder is tools/flight_log.py. CIRCUITPY must be writable from code
+# (storage.remount in boot.py) for flushes; otherwise the recorder stays RAM-only.
+
+import os
+import struct
+import time
+
+REC_SIZE = 64
+FLUSH_BLOCK = 4096  # bytes per flash write, 64 records
+FORMAT_VERSION = 1
+
+REC_EMPTY = 0
+REC_CONTROL = 1
+REC_MARK = 2
+REC_HEADER = 0xF0
+
+# flags bits
+FLAG_BRAKE = 0x01      # intent.brake
+FLAG_LEFT_DIR = 0x02   # DIR pin level written to the left controller
+FLAG_RIGHT_DIR = 0x04
+FLAG_LINK = 0x08       # link_ok(): fresh iBUS frame, not the receiver failsafe
+FLAG_STOPPED = 0x10    # motors commanded to stop (brake / no link)
+
+# t_ms, seq, kind, mode, then direction, throttle, veer, veer_amt, pivot,
+# pivot_amt, flags, left_duty, right_duty, left_pps_x10, right_pps_x10, changed.
+# The 14 channels sit between mode and direction (bytes 8..35) and are copied
+# in a loop so the hot path never builds an argument tuple.
+_HEAD_FMT = "<IHBB"
+_TAIL_FMT = "<bBbbbbBHHHHB"  # veer_amt / pivot_amt are signed (-100..100)
+_CH_OFFSET = 8
+_TAIL_OFFSET = _CH_OFFSET + 28
+_HEADER_FMT = "<IHBB4sHHI"  # t_ms, seq, kind, mode, magic, version, rec_size, capacity
+MAGIC = b"RSFR"
+
+
+class FlightRecorder:
+    def __init__(self, records=1024, directory="/logs"):
+        if (records * REC_SIZE) % FLUSH_BLOCK:
+            raise ValueError("records must fill whole flush blocks")
+        self.capacity = records
+        self._buf = bytearray(records * REC_SIZE)
+        self._mv = memoryview(self._buf)
+        self.directory = directory
+        self.head = 0        # records written (monotonic)
+        self.flushed = 0     # records handed to flash (monotonic)
+        self.seq = 0
+        self.overwritten = 0
+        self.blocks_written = 0
+        self.flush_errors = 0
+        self.flush_us_max = 0
+        self.path = None
+        self._file = None
+        self.enabled = True
+        self.flash_ok = True
+
+    # === Hot path ===
+    def record(self, channels, intent, throttle, left_duty, left_dir, right_duty, right_dir,
+               left_pps=0, right_pps=0, flags=0, changed=0, kind=REC_CONTROL):
+        """throttle: commanded 0..100 % (ArmingGate.duty_pct, 0 while stopped)."""
+        if not self.enabled:
+            return
+        if self.head - self.flushed >= self.capacity:
+            self.flushed += 1  # drop the oldest unflushed record
+            self.overwritten += 1
+        off = (self.head % self.capacity) * REC_SIZE
+        buf = self._buf
+        struct.pack_into(_HEAD_FMT, buf, off, time.monotonic_ns() // 1_000_000 & 0xFFFFFFFF,
+                         self.seq & 0xFFFF, kind, intent.mode)
+        o = off + _CH_OFFSET
+        for i in range(14):
+            v = channels[i]
+            buf[o] = v & 0xFF
+            buf[o + 1] = (v >> 8) & 0xFF
+            o += 2
+        if intent.brake:
+            flags |= FLAG_BRAKE
+        if left_dir:
+            flags |= FLAG_LEFT_DIR
+        if right_dir:
+            flags |= FLAG_RIGHT_DIR
+        struct.pack_into(_TAIL_FMT, buf, off + _TAIL_OFFSET,
+                         intent.direction, throttle, intent.veer, intent.veer_amt,
+                         intent.pivot, intent.pivot_amt, flags, left_duty, right_duty,
+                         min(int(left_pps * 10), 0xFFFF), min(int(right_pps * 10), 0xFFFF),
+                         changed & 0xFF)
+        self.head += 1
+        self.seq += 1
+
+    def pending(self):
+        return self.head - self.flushed
+
+    # === Flash ===
+    def _open(self):
+        try:
+            os.mkdir(self.directory)
+        except OSError:
+            pass  # already there
+        n = 0
+        names = os.listdir(self.directory)
+        while "flight_%03d.bin" % n in names:
+            n += 1
+        self.path = "%s/flight_%03d.bin" % (self.directory, n)
+        self._file = open(self.path, "wb")
+        header = bytearray(FLUSH_BLOCK)
+        struct.pack_into(_HEADER_FMT, header, 0, time.monotonic_ns() // 1_000_000 & 0xFFFFFFFF,
+                         0, REC_HEADER, 0, MAGIC, FORMAT_VERSION, REC_SIZE, self.capacity)
+        # Header block: one header record followed by empty records keeps data blocks aligned
+        self._file.write(header)
+
+    def _write_blocks(self, count):
+        per_block = FLUSH_BLOCK // REC_SIZE
+        for _ in range(count):
+            start = (self.flushed % self.capacity) * REC_SIZE
+            self._file.write(self._mv[start:start + FLUSH_BLOCK])
+            self.flushed += per_block
+            self.blocks_written += 1
+
+    def service(self, idle):
+        """Low-priority task: writes whole blocks, but only while the sled is idle."""
+        if not idle or not self.flash_ok or self.pending() < FLUSH_BLOCK // REC_SIZE:
+            return 0
+        return self.flush(force=False)
+
+    def flush(self, force=True):
+        """Writes every full block; force also pads and writes the partial tail. Returns blocks written."""
+        if not self.flash_ok:
+            return 0
+        per_block = FLUSH_BLOCK // REC_SIZE
+        # Blocks are aligned to the ring, so realign after an overwrite skipped records
+        skew = self.flushed % per_block
+        if skew:
+            self.flushed += per_block - skew
+            if self.flushed > self.head:
+                self.head = self.flushed
+        full = self.pending() // per_block
+        if force and self.pending() % per_block:
+            pad_from = self.head
+            self.head += per_block - self.pending() % per_block
+            for n in range(pad_from, self.head):
+                off = (n % self.capacity) * REC_SIZE
+                for i in range(off, off + REC_SIZE):
+                    self._buf[i] = 0
+            full += 1
+        if not full:
+            return 0
+        t0 = time.monotonic_ns()
+        try:
+            if self._file is None:
+                self._open()
+            self._write_blocks(full)
+            self._file.flush()
+        except OSError:
+            # Read-only CIRCUITPY or full flash: stay RAM-only, keep the ring for save()
+            self.flush_errors += 1
+            self.flash_ok = False
+            return 0
+        us = (time.monotonic_ns() - t0) // 1000
+        if us > self.flush_us_max:
+            self.flush_us_max = us
+        return full
+
+    def mark(self, intent, code=0):
+        """Drops a REC_MARK record (e.g. arming, fault) into the stream; code goes in the changed byte."""
+        self.record(_ZERO_CHANNELS, intent, 0, 0, 0, 0, 0, changed=code, kind=REC_MARK)
+
+    def save(self, path):
+        """Writes whatever the ring still holds, oldest first, to path (REPL / post-incident)."""
+        count = min(self.head, self.capacity)
+        first = self.head - count
+        with open(path, "wb") as f:
+            header = bytearray(REC_SIZE)
+            struct.pack_into(_HEADER_FMT, header, 0, time.monotonic_ns() // 1_000_000 & 0xFFFFFFFF,
+                             0, REC_HEADER, 0, MAGIC, FORMAT_VERSION, REC_SIZE, self.capacity)
+            f.write(header)
+            for n in range(first, self.head):
+                off = (n % self.capacity) * REC_SIZE
+                f.write(self._mv[off:off + REC_SIZE])
+        return count
+
+    def close(self):
+        self.flush(force=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats_line(self):
+        return (f"rec head={self.head} pending={self.pending()} blocks={self.blocks_written} "
+                f"over={self.overwritten} err={self.flush_errors} flush_max={self.flush_us_max}us")
+
+
+_ZERO_CHANNELS = bytes(14)
@@ -0,0 +1,73 @@
+# /glyph_atlas.py
+# Loads a glyph atlas made by tools/font_atlas.py as a BitmapText-compatible font
+# Author: savant42
+#
+# The whole atlas is one 1-bit displayio.Bitmap, filled by a single
+# bitmaptools.readinto() straight from the file; glyphs are fixed cells in that
+# bitmap, so there is nothing to parse and no per-glyph bitmap allocations.
+# Drop-in for bitmap_font.load_font() wherever BitmapText takes a font:
+#
+#   import glyph_atlas
+#   font = glyph_atlas.load("/DroidobeshDepot-12.atlas")
+#   text = BitmapText(font=font)
+
+import struct
+
+import displayio
+from fontio import Glyph
+
+MAGIC = b"RSGA"
+VERSION = 1
+HEADER_FMT = "<4sBBBbBHHH"
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+
+
+class GlyphAtlas:
+    def __init__(self, f):
+        magic, version, cell_w, cell_h, descent, per_row, count, width, height = struct.unpack(
+            HEADER_FMT, f.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a glyph atlas (or wrong version)")
+        self.cell_w = cell_w
+        self.cell_h = cell_h
+        self.descent = descent
+        self.per_row = per_row
+        # code -> tile + 1 (0 = not in the atlas)
+        self._tiles = bytearray(256)
+        for tile, code in enumerate(f.read(count)):
+            self._tiles[code] = tile + 1
+        self.bitmap = displayio.Bitmap(width, height, 2)
+        _read_pixels(self.bitmap, f, width, height)
+
+    def get_bounding_box(self):
+        return (self.cell_w, self.cell_h, 0, -self.descent)
+
+    def get_glyph(self, code):
+        tile = self._tiles[code] if 0 <= code < 256 else 0
+        if not tile:
+            return None
+        # Offsets are baked into the cell: dy = -descent puts the cell top on the row top
+        return Glyph(bitmap=self.bitmap, tile_index=tile - 1, width=self.cell_w, height=self.cell_h,
+                     dx=0, dy=-self.descent, shift_x=self.cell_w, shift_y=0)
+
+
+def _read_pixels(bitmap, f, width, height):
+    try:
+        from bitmaptools import readinto
+    except ImportError:
+        readinto = None
+    if readinto is not None:
+        readinto(bitmap, f, bits_per_pixel=1, element_size=1, reverse_pixels_in_element=True)
+        return
+    # Firmware without bitmaptools.readinto: one row buffer, unpacked in Python
+    row = bytearray((width + 7) // 8)
+    for y in range(height):
+        f.readinto(row)
+        for x in range(width):
+            if row[x >> 3] & (0x80 >> (x & 7)):
+                bitmap[x, y] = 1
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return GlyphAtlas(f)
@@ -1,73 +1,134 @@
 # /gnss_dfrobot.py
-# DFRobot GNSS module parser over I2C (proprietary format)
+# DFRobot GNSS module over I2C — single-burst register read with a cached fix
 # Author: savant42
-
+#
+# The whole telemetry block (registers 0..28: UTC, lat, lon, sats, alt, SOG,
+# COG) is read in one write-then-read into a preallocated buffer and decoded
+# with struct.unpack_from. Reads go through the shared I2CBusManager queue at
+# sensor priority; callers only ever look at the cached fix and its age, so
+# nothing outside the bus task waits on the GNSS.
+
+import struct
 import time
 
+from i2c_device_loader import Transaction, TXN_WRITE_READ, PRIO_SENSOR
+
 GNSS_I2C_ADDR = 0x20
-GNSS_REG_LAT = 0x10
-GNSS_REG_LON = 0x18
-GNSS_REG_ALT = 0x20
-GNSS_REG_SPD = 0x28
-GNSS_REG_CRS = 0x2C
-GNSS_REG_SATS = 0x30
-GNSS_REG_TIME = 0x00
-
-from struct import unpack
-
-class GNSS:
-    def __init__(self, i2c, address=GNSS_I2C_ADDR):
-        self.i2c = i2c
-        self.addr = address
 
-    def _read_bytes(self, reg, length):
-        buf = bytearray(length)
-        with self.i2c_device() as i2c:
-            i2c.writeto_then_readfrom(self.addr, bytes([reg]), buf)
-        return buf
-
-    def i2c_device(self):
-        from adafruit_bus_device.i2c_device import I2CDevice
-        return I2CDevice(self.i2c, self.addr)
-
-    def get_gnss_data(self):
-        data = {}
-
-        # Time
-        t = self._read_bytes(GNSS_REG_TIME, 7)
-        data['utc'] = f"20{t[0]:02d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}:{t[5]:02d}Z"
-
-        # Latitude
-        lat_buf = self._read_bytes(GNSS_REG_LAT, 8)
-        lat_deg, lat_min_whole, lat_min_frac, lat_dir = lat_buf[0], lat_buf[1], (lat_buf[2] << 8) + lat_buf[3], chr(lat_buf[7])
-        data['lat'] = self._convert_degmin(lat_deg, lat_min_whole, lat_min_frac, lat_dir)
-
-        # Longitude
-        lon_buf = self._read_bytes(GNSS_REG_LON, 8)
-        lon_deg, lon_min_whole, lon_min_frac, lon_dir = lon_buf[0], lon_buf[1], (lon_buf[2] << 8) + lon_buf[3], chr(lon_buf[7])
-        data['lon'] = self._convert_degmin(lon_deg, lon_min_whole, lon_min_frac, lon_dir)
-
-        # Altitude
-        alt_buf = self._read_bytes(GNSS_REG_ALT, 4)
-        data['alt'] = unpack('<f', alt_buf)[0]
-
-        # Speed (m/s)
-        spd_buf = self._read_bytes(GNSS_REG_SPD, 4)
-        data['speed_mps'] = unpack('<f', spd_buf)[0]
-
-        # Course (degrees)
-        crs_buf = self._read_bytes(GNSS_REG_CRS, 4)
-        data['course'] = unpack('<f', crs_buf)[0]
-
-        # Satellites
-        sats_buf = self._read_bytes(GNSS_REG_SATS, 1)
-        data['sats'] = sats_buf[0]
-
-        return data
-
-    def _convert_degmin(self, deg, min_whole, min_frac, direction):
-        minutes = min_whole + (min_frac / 10000.0)
-        decimal = deg + (minutes / 60.0)
-        if direction in ['S', 'W']:
-            decimal *= -1
-        return decimal
+# Register map (DFRobot_GNSS)
+I2C_YEAR_H = 0
+I2C_LAT_1 = 7
+I2C_LON_1 = 13
+I2C_SAT_COUNT = 19
+I2C_ALT_H = 20
+I2C_SOG_H = 23
+I2C_COG_H = 26
+I2C_MODE = 0x01
+ENABLE_POWER = 0
+
+BLOCK_START = I2C_YEAR_H
+BLOCK_LEN = 29  # registers 0..28
+
+# year, month, day, hour, minute, second,
+# lat deg, min, frac_hi, frac_lo, dir, lon deg, min, frac_hi, frac_lo, dir,
+# sats, alt int, alt frac, sog int, sog frac, cog int, cog frac
+_BLOCK_FMT = ">HBBBBBBBBHBBBBHBBHBHBHB"
+
+
+class GnssFix:
+    __slots__ = ("year", "month", "day", "hour", "minute", "second",
+                 "lat", "lon", "alt", "sog", "cog", "sats", "stamp")
+
+    def __init__(self):
+        self.year = 0
+        self.month = 0
+        self.day = 0
+        self.hour = 0
+        self.minute = 0
+        self.second = 0
+        self.lat = None
+        self.lon = None
+        self.alt = None
+        self.sog = None   # knots
+        self.cog = None   # degrees
+        self.sats = 0
+        self.stamp = None  # time.monotonic() of the last new fix
+
+    def utc(self):
+        return "%04d-%02d-%02dT%02d:%02d:%02dZ" % (
+            self.year, self.month, self.day, self.hour, self.minute, self.second)
+
+
+def _degmin(deg, min_whole, frac_hi, frac_lo, direction, negative):
+    minutes = min_whole + (((frac_hi << 16) | frac_lo) / 100000.0)
+    value = deg + minutes / 60.0
+    return -value if direction == negative else value
+
+
+class GnssService:
+    def __init__(self, bus, address=GNSS_I2C_ADDR):
+        self.bus = bus
+        self.addr = address
+        self._raw = bytearray(BLOCK_LEN)
+        self._reg = bytes([BLOCK_START])
+        self.txn = Transaction(TXN_WRITE_READ, address, self._reg, self._raw,
+                               priority=PRIO_SENSOR, callback=self._on_read)
+        self.fix = GnssFix()
+        self.reads = 0
+        self.errors = 0
+        self.stale_reads = 0  # reads where the module had not produced a new fix yet
+        self._dict = {
+            "lat": None, "lon": None, "alt": None, "sog": None, "cog": None,
+            "sats": None, "fix": 3, "utc": None, "age": None,
+        }
+        self._utc = None  # fix.utc() for the current fix, formatted on first as_dict()
+
+    def enable(self):
+        """Puts the module in I2C mode. Blocking; call once at boot."""
+        self.bus.write(self.addr, bytes([I2C_MODE, ENABLE_POWER]))
+
+    def poll(self):
+        """Queues one burst read on the bus. Never blocks; safe to call every tick."""
+        return self.bus.submit(self.txn)
+
+    def _on_read(self, txn):
+        self.reads += 1
+        if not txn.ok:
+            self.errors += 1
+            return
+        v = struct.unpack_from(_BLOCK_FMT, self._raw, 0)
+        fix = self.fix
+        if fix.stamp is not None and v[5] == fix.second and v[4] == fix.minute:
+            self.stale_reads += 1
+            return
+        fix.year, fix.month, fix.day, fix.hour, fix.minute, fix.second = v[0], v[1], v[2], v[3], v[4], v[5]
+        fix.lat = _degmin(v[6], v[7], v[8], v[9], v[10], ord("S"))
+        fix.lon = _degmin(v[11], v[12], v[13], v[14], v[15], ord("W"))
+        fix.sats = v[16]
+        fix.alt = v[17] + v[18] / 100.0
+        fix.sog = v[19] + v[20] / 100.0
+        fix.cog = v[21] + v[22] / 100.0
+        fix.stamp = time.monotonic()
+        self._utc = None
+
+    def age(self):
+        """Seconds since the last new fix, or None if there has never been one."""
+        if self.fix.stamp is None:
+            return None
+        return time.monotonic() - self.fix.stamp
+
+    def as_dict(self):
+        """Fills and returns one reused dict in the shape gps.get_gnss_data() always returned."""
+        fix = self.fix
+        d = self._dict
+        d["lat"] = fix.lat
+        d["lon"] = fix.lon
+        d["alt"] = fix.alt
+        d["sog"] = fix.sog
+        d["cog"] = fix.cog
+        d["sats"] = fix.sats
+        if self._utc is None and fix.stamp is not None:
+            self._utc = fix.utc()  # once per fix, not on every call
+        d["utc"] = self._utc
+        d["age"] = self.age()
+        return d
@@ -0,0 +1,243 @@
+# /i2c_device_loader.py
+# Shared I2C bus owner: init with retries, cached device handles, and a
+# priority-ordered transaction queue
+# Author: savant42
+#
+# Every device on the sled (OLED 0x3D, GNSS 0x20, NeoKey 0x30, Twist 0x3F,
+# LIS3DH 0x18) sits on one bus. Instead of each module locking it on its own,
+# callers own reusable Transaction objects and submit() them; run_pending()
+# executes everything queued in priority order under a single bus lock.
+# The time budget is checked only between transactions: whatever starts runs to
+# completion, so a TXN_CALL costs its full length whatever the budget says. Keep
+# long blocking work (a ~47 ms displayio refresh) out of budgeted passes.
+
+import time
+from array import array
+
+PRIO_CONTROL = 0
+PRIO_SENSOR = 1
+PRIO_DISPLAY = 2
+_PRIO_LEVELS = 3
+_QUEUE_DEPTH = 8
+
+# Transaction kinds
+TXN_WRITE = 0
+TXN_READ = 1
+TXN_WRITE_READ = 2
+TXN_CALL = 3  # callable that manages the bus itself; runs to completion
+
+BOOT_RETRIES = 5
+
+
+class Transaction:
+    __slots__ = ("kind", "addr", "out_buf", "in_buf", "fn", "priority",
+                 "callback", "section", "pending", "ok", "error")
+
+    def __init__(self, kind, addr=None, out_buf=None, in_buf=None, fn=None,
+                 priority=PRIO_SENSOR, callback=None):
+        self.kind = kind
+        self.addr = addr
+        self.out_buf = out_buf
+        self.in_buf = in_buf
+        self.fn = fn
+        self.priority = priority
+        self.callback = callback  # called with the transaction once it completes
+        self.section = None       # profiler section that gets the execution time, if set
+        self.pending = False
+        self.ok = False
+        self.error = None
+
+
+class I2CBusManager:
+    def __init__(self, i2c):
+        self.i2c = i2c
+        self._devices = {}
+        self._queues = [[None] * _QUEUE_DEPTH for _ in range(_PRIO_LEVELS)]
+        self._counts = array("B", [0] * _PRIO_LEVELS)
+
+        # Per-address stats (7-bit addresses)
+        self.txn_count = array("L", [0] * 128)
+        self.errors = array("L", [0] * 128)
+        self.last_us = array("L", [0] * 128)
+        self.max_us = array("L", [0] * 128)
+        self.total_us = array("L", [0] * 128)
+        self.dropped = 0    # submits rejected because a queue was full
+        self.deferred = 0   # passes that left work queued for lack of budget
+        self.call_us_max = 0
+
+    # === Boot ===
+    def scan(self, retries=BOOT_RETRIES):
+        """Scans the bus, retrying the lock (clears the FeatherS3 'SCL in use' state)."""
+        for _ in range(retries):
+            if self.i2c.try_lock():
+                try:
+                    return self.i2c.scan()
+                finally:
+                    self.i2c.unlock()
+            time.sleep(0.01)
+        return []
+
+    def device(self, addr):
+        """Cached adafruit_bus_device I2CDevice for drivers that want one."""
+        dev = self._devices.get(addr)
+        if dev is None:
+            from adafruit_bus_device.i2c_device import I2CDevice
+            dev = I2CDevice(self.i2c, addr)
+            self._devices[addr] = dev
+        return dev
+
+    # === Queue ===
+    def submit(self, txn):
+        """Queues a transaction. Returns False if it is already pending or the queue is full."""
+        if txn.pending:
+            return False
+        p = txn.priority
+        n = self._counts[p]
+        if n >= _QUEUE_DEPTH:
+            self.dropped += 1
+            return False
+        self._queues[p][n] = txn
+        self._counts[p] = n + 1
+        txn.pending = True
+        return True
+
+    def pending(self):
+        return sum(self._counts)
+
+    def run_pending(self, budget_us=None):
+        """Runs queued transactions in priority order. Returns the number completed."""
+        start = time.monotonic_ns()
+        done = 0
+        for p in range(_PRIO_LEVELS):
+            n = self._counts[p]
+            if not n:
+                continue
+            q = self._queues[p]
+            i = 0
+            while i < n:
+                if budget_us is not None and done and (time.monotonic_ns() - start) // 1000 >= budget_us:
+                    self._compact(p, i)
+                    self.deferred += 1
+                    return done
+                # Batch consecutive bus transactions under one lock
+                j = i
+                while j < n and q[j].kind != TXN_CALL:
+                    j += 1
+                if j > i:
+                    done += self._run_locked(q, i, j)
+                    i = j
+                else:
+                    self._run_call(q[i])
+                    done += 1
+                    i += 1
+            # Drop the n that ran; anything resubmitted while they ran sits after them
+            self._compact(p, n)
+        return done
+
+    def _compact(self, p, first):
+        # Live count, not a snapshot: submits from fn/callbacks during the pass are kept
+        q = self._queues[p]
+        n = self._counts[p]
+        for k in range(first, n):
+            q[k - first] = q[k]
+        for k in range(n - first, n):
+            q[k] = None
+        self._counts[p] = n - first
+
+    def _run_locked(self, q, first, end):
+        i2c = self.i2c
+        tries = 0
+        while not i2c.try_lock():
+            tries += 1
+            if tries > 100:
+                for k in range(first, end):
+                    self._finish(q[k], False, "bus busy", 0)
+                return end - first
+        try:
+            for k in range(first, end):
+                txn = q[k]
+                t0 = time.monotonic_ns()
+                try:
+                    if txn.kind == TXN_WRITE_READ:
+                        i2c.writeto_then_readfrom(txn.addr, txn.out_buf, txn.in_buf)
+                    elif txn.kind == TXN_WRITE:
+                        i2c.writeto(txn.addr, txn.out_buf)
+                    else:
+                        i2c.readfrom_into(txn.addr, txn.in_buf)
+                    ok, err = True, None
+                except OSError as e:
+                    ok, err = False, e
+                self._finish(txn, ok, err, (time.monotonic_ns() - t0) // 1000)
+        finally:
+            i2c.unlock()
+        return end - first
+
+    def _run_call(self, txn):
+        t0 = time.monotonic_ns()
+        try:
+            txn.fn()
+            ok, err = True, None
+        except (OSError, RuntimeError) as e:
+            ok, err = False, e
+        us = (time.monotonic_ns() - t0) // 1000
+        if us > self.call_us_max:
+            self.call_us_max = us
+        self._finish(txn, ok, err, us)
+
+    def _finish(self, txn, ok, err, us):
+        a = txn.addr
+        if a is not None:
+            self.txn_count[a] += 1
+            self.last_us[a] = us
+            self.total_us[a] += us
+            if us > self.max_us[a]:
+                self.max_us[a] = us
+            if not ok:
+                self.errors[a] += 1
+        if txn.section is not None:
+            txn.section.record_us(us)
+        txn.pending = False
+        txn.ok = ok
+        txn.error = err
+        if txn.callback is not None:
+            txn.callback(txn)
+
+    # === Blocking helpers for boot-time / non-loop code ===
+    def write_then_read(self, addr, out_buf, in_buf):
+        txn = Transaction(TXN_WRITE_READ, addr, out_buf, in_buf, priority=PRIO_CONTROL)
+        self._run_locked([txn], 0, 1)
+        if not txn.ok:
+            raise OSError(txn.error)
+        return in_buf
+
+    def write(self, addr, out_buf):
+        txn = Transaction(TXN_WRITE, addr, out_buf, priority=PRIO_CONTROL)
+        self._run_locked([txn], 0, 1)
+        if not txn.ok:
+            raise OSError(txn.error)
+
+    def stats_lines(self):
+        lines = []
+        for a in range(128):
+            if self.txn_count[a]:
+                avg = self.total_us[a] // self.txn_count[a]
+                lines.append(f"0x{a:02X} n={self.txn_count[a]} err={self.errors[a]} "
+                             f"avg={avg}us max={self.max_us[a]}us")
+        lines.append(f"dropped={self.dropped} deferred={self.deferred} call_max={self.call_us_max}us")
+        return lines
+
+
+def init_bus(scl=None, sda=None, retries=BOOT_RETRIES):
+    """Creates the shared bus, retrying construction while SCL is held after a soft reboot."""
+    import board
+    import busio
+    scl = scl or board.SCL
+    sda = sda or board.SDA
+    last_error = None
+    for _ in range(retries):
+        try:
+            return I2CBusManager(busio.I2C(scl=scl, sda=sda))
+        except (RuntimeError, ValueError) as e:
+            last_error = e
+            time.sleep(0.05)
+    raise RuntimeError(f"I2C init failed after {retries} tries: {last_error}")
@@ -1,108 +1,257 @@
-# ibus_receiver_debug.py
-# Reads FlySky IBUS packets from UART and prints CH1–CH14 with CRC verification and raw scaling
-# hardcoded uart pins, not ready for modular
-# bugs: only shows 1-4 instead of 1-14
+# /ibus_receiver.py
+# FlySky iBUS frame decoder for CH1–CH14 with CRC verification
+# Author: savant42
+#
+# UART bytes land in a fixed ring buffer and are walked one at a time through a
+# sync state machine (length → command → payload → checksum). Completed frames
+# are unpacked in one struct.unpack_from over a memoryview into a reusable
+# channel array, so steady-state decoding does not grow the heap.
+#
+# The checksum is summed as bytes arrive. A candidate that fails it is dropped
+# and the decoder rewinds to the byte after its false header, so a real frame
+# hiding behind noise is still found. Nothing on this path prints; sync health
+# lives in counters (see stats_line()).
+#
+# bytes_dropped counts each byte once, when it is finally given up on: a byte
+# skipped while hunting for a header, or the header byte of a candidate that
+# fails. Bytes after a failed header are rescanned, not counted, so every byte
+# fed in ends up either in a frame or in bytes_dropped.
 
+import struct
 import time
-import board
-import busio
-
-# === CONFIGURATION ===
-IBUS_UART = busio.UART(
-    tx=board.IO43,    # Change this to your RX pin if different
-    rx=board.IO44,    # Change this to your RX pin if different
-    baudrate=115200,
-    bits=8,            # 8N2
-    parity=None,       # 8N2 
-    stop=2,            # 8N2
-    timeout=0.01,
-    receiver_buffer_size=512
-)
+from array import array
 
 IBUS_CHANNEL_COUNT = 14
 IBUS_PACKET_SIZE = 32
 IBUS_HEADER = b"\x20\x40"
+IBUS_LENGTH = IBUS_HEADER[0]
+IBUS_COMMAND = IBUS_HEADER[1]
 FAILSAFE_CH4_VALUE = 50661
-print("🎮 CH1–CH14 monitor with CRC debug and raw 16-bit scaling...")
-
-last_values = [None] * 4  # For CH1 to CH4
-buffer = bytearray()
-
-# Track min/max for each channel
-channel_ranges = [
-    [None, None],           # CH1
-    [None, None],           # CH2
-    [None, None],           # CH3
-    [0, 65535]              # CH4 (fixed 16-bit range)
-]
-
-def validate_crc(packet):
-    raw_sum = sum(packet[0:30])
-    calc_crc = 0xFFFF - raw_sum
-    packet_crc = packet[30] | (packet[31] << 8)
-
-    if calc_crc != packet_crc:
-        print("❌ CRC mismatch:")
-        print(f"   → Raw sum   : {raw_sum} (0x{raw_sum:04X})")
-        print(f"   → Computed  : 0x{calc_crc:04X}")
-        print(f"   → Received  : 0x{packet_crc:04X}")
-        print(f"   → Packet    : {[hex(b) for b in packet]}")
-        return False
-    return True
-
-def map_range(val, min_val, max_val, is_throttle=False):
-    if min_val is None or max_val is None or min_val == max_val:
-        return 0
-    if is_throttle:
-        return round((val / 65535) * 100)
-    else:
-        return round(((val - min_val) / (max_val - min_val)) * 200 - 100)
-
-while True:
-    data = IBUS_UART.read(64)
-    if data:
-        buffer.extend(data)
-        if len(buffer) > 256:
-            buffer = buffer[-256:]  # prevent runaway growth
-
-        for i in range(len(buffer) - IBUS_PACKET_SIZE + 1):
-            if buffer[i:i+2] == IBUS_HEADER:
-                packet = buffer[i:i + IBUS_PACKET_SIZE]
-                if len(packet) == IBUS_PACKET_SIZE and validate_crc(packet):
-                    for ch in range(4):
-                        lo = packet[2 + ch * 2]
-                        hi = packet[3 + ch * 2]
-                        val = (hi << 8) | lo
-
-                        # Update range only for CH1–CH3
-                        if ch < 3:
-                            ch_min, ch_max = channel_ranges[ch]
-                            if ch_min is None or val < ch_min:
-                                channel_ranges[ch][0] = val
-                            if ch_max is None or val > ch_max:
-                                channel_ranges[ch][1] = val
-
-                        if val != last_values[ch]:
-                            last_values[ch] = val
-
-                            if ch == 3 and val == FAILSAFE_CH4_VALUE:
-                                print("🚨 CH4 appears to be in failsafe state!")
-
-                            # Always scale CH4 as a percentage of 65535
-                            if ch == 3:
-                                scaled = round((val / 65535) * 100)
-                                min_disp = 0
-                                max_disp = 65535
-                            else:
-                                scaled = map_range(val, channel_ranges[ch][0], channel_ranges[ch][1])
-                                min_disp = channel_ranges[ch][0]
-                                max_disp = channel_ranges[ch][1]
-
-                            units = "%" if ch == 3 else "±%"
-                            label = "Throttle" if ch == 3 else f"CH{ch+1}"
-                            print(f"✅ {label}: {val} → {scaled}{units}  [Min: {min_disp}, Max: {max_disp}]")
-
-                    buffer = buffer[i + IBUS_PACKET_SIZE:]
-                    break
-
-    time.sleep(0.01)
+
+RING_SIZE = 256  # power of two, holds ~8 frames of backlog
+_RING_MASK = RING_SIZE - 1
+_CHANNEL_FMT = "<%dH" % IBUS_CHANNEL_COUNT
+_PAYLOAD_END = 2 + IBUS_CHANNEL_COUNT * 2  # checksum starts at byte 30
+
+# Sync state machine
+_S_LENGTH = 0
+_S_COMMAND = 1
+_S_PAYLOAD = 2
+_S_CRC_LO = 3
+_S_CRC_HI = 4
+
+
+class IBusDecoder:
+    def __init__(self, uart=None):
+        self.uart = uart
+        self._ring = bytearray(RING_SIZE)
+        self._ring_mv = memoryview(self._ring)
+        self._head = 0   # next write position
+        self._tail = 0   # next byte to decode
+        self._start = 0  # ring index of the current candidate's header byte
+
+        self._frame = bytearray(IBUS_PACKET_SIZE)
+        self._frame_mv = memoryview(self._frame)
+        self._state = _S_LENGTH
+        self._pos = 0
+        self._sum = 0
+
+        self.channels = array("H", [0] * IBUS_CHANNEL_COUNT)
+        self.frame_count = 0
+        self.last_frame_time = None
+
+        # Sync health counters
+        self.crc_failures = 0
+        self.false_syncs = 0
+        self.bytes_dropped = 0
+        self.resync_ms_last = 0
+        self.resync_ms_max = 0
+        self._lost_at = None
+
+    def _keep_from(self):
+        # Bytes of an in-flight candidate must survive until its checksum is known
+        return self._tail if self._state == _S_LENGTH else self._start
+
+    def poll(self):
+        """Reads whatever the UART has buffered and decodes it. Returns new frame count."""
+        uart = self.uart
+        if uart is None:
+            return 0
+        frames = 0
+        while True:
+            free = RING_SIZE - (self._head - self._keep_from())
+            if free <= 0:
+                frames += self._drain()
+                continue
+            start = self._head & _RING_MASK
+            span = min(free, RING_SIZE - start)
+            n = uart.readinto(self._ring_mv[start:start + span])
+            if not n:
+                break
+            self._head += n
+            if n < span:
+                break
+        return frames + self._drain()
+
+    def feed(self, data):
+        """Pushes raw bytes (e.g. a capture or sim stream) through the ring. Returns new frame count."""
+        frames = 0
+        ring = self._ring
+        for b in data:
+            if self._head - self._keep_from() >= RING_SIZE:
+                frames += self._drain()
+            ring[self._head & _RING_MASK] = b
+            self._head += 1
+        return frames + self._drain()
+
+    def _drain(self):
+        ring = self._ring
+        frame = self._frame
+        state = self._state
+        pos = self._pos
+        csum = self._sum
+        start = self._start
+        frames = 0
+        tail = self._tail
+        head = self._head
+        while tail != head:
+            b = ring[tail & _RING_MASK]
+            tail += 1
+            if state == _S_LENGTH:
+                if b == IBUS_LENGTH:
+                    start = tail - 1
+                    csum = b
+                    state = _S_COMMAND
+                else:
+                    self.bytes_dropped += 1
+                    if self._lost_at is None and self.frame_count:
+                        self._lost_at = time.monotonic()
+            elif state == _S_COMMAND:
+                if b == IBUS_COMMAND:
+                    csum += b
+                    pos = 2
+                    state = _S_PAYLOAD
+                else:
+                    # Same as a checksum failure: drop the header byte, rescan this one
+                    self.false_syncs += 1
+                    self.bytes_dropped += 1
+                    tail = start + 1
+                    state = _S_LENGTH
+            elif state == _S_PAYLOAD:
+                frame[pos] = b
+                csum += b
+                pos += 1
+                if pos == _PAYLOAD_END:
+                    state = _S_CRC_LO
+            elif state == _S_CRC_LO:
+                if b == (0xFFFF - csum) & 0xFF:
+                    state = _S_CRC_HI
+                else:
+                    tail = self._reject(start)
+                    state = _S_LENGTH
+            else:
+                state = _S_LENGTH
+                if b == (0xFFFF - csum) >> 8:
+                    self._unpack()
+                    frames += 1
+                else:
+                    tail = self._reject(start)
+        # Wrap the counters so they stay small ints on CircuitPython
+        keep = tail if state == _S_LENGTH else start
+        wrap = keep - (keep & _RING_MASK)
+        self._tail = tail - wrap
+        self._head = head - wrap
+        self._start = start - wrap
+        self._state = state
+        self._pos = pos
+        self._sum = csum
+        return frames
+
+    def _reject(self, start):
+        # Drop only the false header byte; everything after it is rescanned and counted there
+        self.crc_failures += 1
+        self.false_syncs += 1
+        self.bytes_dropped += 1
+        if self._lost_at is None:
+            self._lost_at = time.monotonic()
+        return start + 1
+
+    def _unpack(self):
+        values = struct.unpack_from(_CHANNEL_FMT, self._frame_mv, 2)
+        channels = self.channels
+        for i in range(IBUS_CHANNEL_COUNT):
+            channels[i] = values[i]
+        self.frame_count += 1
+        now = time.monotonic()
+        self.last_frame_time = now
+        if self._lost_at is not None:
+            ms = int((now - self._lost_at) * 1000)
+            self._lost_at = None
+            self.resync_ms_last = ms
+            if ms > self.resync_ms_max:
+                self.resync_ms_max = ms
+
+    def reset_stats(self):
+        self.crc_failures = 0
+        self.false_syncs = 0
+        self.bytes_dropped = 0
+        self.resync_ms_last = 0
+        self.resync_ms_max = 0
+
+    def stats_line(self):
+        """One-line sync summary for the console or OLED; call off the hot path."""
+        return (f"frames={self.frame_count} crc={self.crc_failures} false={self.false_syncs} "
+                f"drop={self.bytes_dropped} resync={self.resync_ms_last}/{self.resync_ms_max}ms")
+
+
+def open_uart():
+    import board
+    import busio
+    return busio.UART(
+        tx=board.IO43,
+        rx=board.IO44,
+        baudrate=115200,
+        bits=8,            # 8N2
+        parity=None,       # 8N2
+        stop=2,            # 8N2
+        timeout=0,
+        receiver_buffer_size=512
+    )
+
+
+_decoder = None
+
+def get_latest_packet():
+    """Polls the shared decoder; returns its channel array, or None before the first valid frame."""
+    global _decoder
+    if _decoder is None:
+        _decoder = IBusDecoder(open_uart())
+    _decoder.poll()
+    if _decoder.frame_count == 0:
+        return None
+    return _decoder.channels
+
+
+def main():
+    print("🎮 CH1–CH14 monitor with CRC debug...")
+    decoder = IBusDecoder(open_uart())
+    last_values = array("H", [0] * IBUS_CHANNEL_COUNT)
+    last_stats = time.monotonic()
+    while True:
+        if decoder.poll():
+            channels = decoder.channels
+            for ch in range(IBUS_CHANNEL_COUNT):
+                val = channels[ch]
+                if val != last_values[ch]:
+                    last_values[ch] = val
+                    if ch == 3 and val == FAILSAFE_CH4_VALUE:
+                        print("🚨 CH4 appears to be in failsafe state!")
+                    print(f"✅ CH{ch+1}: {val}")
+        if time.monotonic() - last_stats > 5:
+            last_stats = time.monotonic()
+            print("📶", decoder.stats_line())
+        time.sleep(0.005)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,14 @@ import time
 import displayio
 import terminalio
 import digitalio
-from adafruit_display_text import label
 from adafruit_displayio_sh1107 import SH1107
-from ibus import IBUS
+from oled_compositor import OledCompositor
+from ibus_receiver import IBusDecoder
+import drive_mixer
+from arming import ArmingGate, EV_READY, EV_ARMED, EV_NOT_ARMED, EV_BRAKE_ON, EV_BRAKE_OFF
+from arming import EV_FAILSAFE, EV_FAILSAFE_CLEAR, EV_DISARMED
+import log_sink
+import boot_sequence
 
 # === Pin Mappings ===
 # Motor ESCs and Control Pins
@@ -41,7 +46,7 @@ uart = busio.UART(
     bits=8,
     parity=None,
     stop=2,
-    timeout=0.01,
+    timeout=0,  # poll() must not wait for bytes
     receiver_buffer_size=512
 )
 uart.reset_input_buffer()
@@ -52,70 +57,42 @@ displayio.release_displays()
 i2c = board.I2C()
 display_bus = displayio.I2CDisplay(i2c, device_address=OLED_I2C_ADDR)
 display = SH1107(display_bus, width=128, height=128, rotation=90)
-splash = displayio.Group()
-display.root_group = splash
+# All screen writes go through the compositor: unchanged writes are dropped
+# and real changes are pushed at most 10x per second, never per packet.
+oled = OledCompositor(display, max_hz=10)
 
 # OLED layout for CH1–CH4 + switches + DIR + INTENT
 labels = []
 prev_channels = [0] * 10
 for i in range(4):
-    x = 0
-    y = i * 10
-    lbl = label.Label(terminalio.FONT, text="", x=x, y=y, color=0xFFFFFF)
-    splash.append(lbl)
-    labels.append(lbl)
+    labels.append(oled.add_line(0, i * 10))
 
 # CH5-8 (Brakes + Switches)
-switch_label = label.Label(terminalio.FONT, text="", x=0, y=40, color=0xFFFFFF)
-splash.append(switch_label)
+switch_label = oled.add_line(0, 40)
 
 # Directional intent and brake status labels
-intent_label = label.Label(terminalio.FONT, text="", x=0, y=60, color=0xFFFFFF)
-dir_label_left = label.Label(terminalio.FONT, text="", x=0, y=70, color=0xFFFFFF)
-dir_label_right = label.Label(terminalio.FONT, text="", x=0, y=80, color=0xFFFFFF)
-
-splash.append(intent_label)
-splash.append(dir_label_left)
-splash.append(dir_label_right)
-
-# Warmup packet discard logic
-WARMUP_COUNT = 2
-warmup_packets_seen = 0
-ib_ready = False
-
-# Brake pin definitions
-def get_brake_status():
-    return brakes_engaged
-
-MOTORS_ARMED = False
-last_arm_warning = 0
-last_throttle_print = 0
-
-stop_left = digitalio.DigitalInOut(STOP_LEFT_PIN)
-stop_left.direction = digitalio.Direction.OUTPUT
-stop_left.value = False
-
-stop_right = digitalio.DigitalInOut(STOP_RIGHT_PIN)
-stop_right.direction = digitalio.Direction.OUTPUT
-stop_right.value = False
-
-brake_left = digitalio.DigitalInOut(BRAKE_PIN_LEFT)
-brake_left.direction = digitalio.Direction.OUTPUT
-brake_left.value = False
-
-brake_right = digitalio.DigitalInOut(BRAKE_PIN_RIGHT)
-brake_right.direction = digitalio.Direction.OUTPUT
-brake_right.value = False
-
-brakes_engaged = False
-prev_ch5 = 1500
-
-# Scale CH3 (throttle) to 0–100% based on initial value at startup
-last_ghost_warning = 0
-ghost_ch3_val = None
-ghost_repeat_count = 0
-MAX_GHOST_REPEAT = 30
-startup_throttle = None
+intent_label = oled.add_line(0, 60)
+dir_label_left = oled.add_line(0, 70)
+dir_label_right = oled.add_line(0, 80)
+
+# Warm-up, arming, brake switch and throttle baseline live in arming.py so
+# tools/replay.py can run radio captures through the exact same logic
+
+# Console output goes through log_sink: queued per packet, printed a couple of
+# lines at a time after the motor writes, with chatty tags rate-limited
+log_link = log_sink.tag("link")
+log_brake = log_sink.tag("brake")
+log_arm = log_sink.tag("arm", rate_ms=5000)
+log_thr = log_sink.tag("thr", rate_ms=200)
+log_dir = log_sink.tag("dir", rate_ms=100)
+log_ch = log_sink.tag("ch", rate_ms=100)
+
+# STOP/BRAKE are held safe (STOP LOW, BRAKE HIGH) by code.py from reset;
+# take them over from boot_sequence instead of claiming the pins again
+stop_left = boot_sequence.take(STOP_LEFT_PIN, False)
+stop_right = boot_sequence.take(STOP_RIGHT_PIN, False)
+brake_left = boot_sequence.take(BRAKE_PIN_LEFT, False)
+brake_right = boot_sequence.take(BRAKE_PIN_RIGHT, False)
 
 # PWM initialization
 import pwmio
@@ -128,54 +105,49 @@ DIR_LEFT.direction = digitalio.Direction.OUTPUT
 DIR_RIGHT = digitalio.DigitalInOut(DIR_RIGHT_PIN)
 DIR_RIGHT.direction = digitalio.Direction.OUTPUT
 
+# Differential mixer: CH2 direction, CH3 throttle, CH1 veer, CH4 pivot
+mixer = drive_mixer.from_config()
+gate = ArmingGate(mixer)
+
 # Track direction state for change detection
 last_direction_str = ""
 last_dir_left = None
 last_dir_right = None
 
-# Motor arming function
-def maybe_activate_motors():
-    if not MOTORS_ARMED:
-        return
-    stop_left.value = True
-    stop_right.value = True
-    print("🟢 ESC ENABLED — STOP pins HIGH")
-    print(f"    🚦 stop_left = {stop_left.value}")
-    print(f"    🚦 stop_right = {stop_right.value}")
-
-# Callback once iBUS packet is received
+# Handles one decoded iBUS frame (from the main loop below)
 def on_servo(ch_data):
-    global last_ghost_warning
-    global warmup_packets_seen, ib_ready
-    global brakes_engaged, prev_ch5, startup_throttle
     global last_direction_str, last_dir_left, last_dir_right
-    global MOTORS_ARMED, last_arm_warning, last_throttle_print
 
-    if not ib_ready:
-        warmup_packets_seen += 1
-        if warmup_packets_seen >= WARMUP_COUNT:
-            ib_ready = True
-            print(f"⚠️ Discarded first {WARMUP_COUNT} packets. iBUS now live.")
-        else:
-            print(f"⏳ Warming up... (packet {warmup_packets_seen})")
+    events = gate.update(ch_data)
+    if not gate.ready:
+        log_link.info("⏳ Warming up... (packet %d)", gate.frames)
+        log_sink.drain(1)
+        return
+    if events & EV_READY:
+        log_link.info("⚠️ Discarded first %d packets. iBUS now live.", gate.warmup)
+        log_sink.drain(1)
         return
 
-    if MOTORS_ARMED:
-        maybe_activate_motors()
-
-    ch5_val = ch_data[4] if len(ch_data) > 4 else 1500
-    if ch5_val != prev_ch5:
-        prev_ch5 = ch5_val
-        if ch5_val < 1200:
-            brakes_engaged = True
-            brake_left.value = True
-            brake_right.value = True
-            print("🛑 BRAKES ENGAGED")
-        else:
-            brakes_engaged = False
-            brake_left.value = False
-            brake_right.value = False
-            print("✅ BRAKES RELEASED")
+    if events & EV_BRAKE_ON:
+        brake_left.value = True
+        brake_right.value = True
+        log_brake.warn("🛑 BRAKES ENGAGED")
+    elif events & EV_BRAKE_OFF:
+        brake_left.value = False
+        brake_right.value = False
+        log_brake.info("✅ BRAKES RELEASED")
+    if events & EV_FAILSAFE:
+        brake_left.value = True
+        brake_right.value = True
+        stop_left.value = False
+        stop_right.value = False
+        log_link.error("🚨 CH4 failsafe value — motors stopped, brakes on")
+    elif events & EV_FAILSAFE_CLEAR:
+        brake_left.value = gate.brakes
+        brake_right.value = gate.brakes
+        stop_left.value = gate.armed
+        stop_right.value = gate.armed
+        log_link.warn("✅ CH4 failsafe cleared")
 
     if len(ch_data) >= 2:
         ch1_val = ch_data[0]
@@ -208,61 +180,37 @@ def on_servo(ch_data):
                 left_forward != last_dir_left or
                 right_forward != last_dir_right):
 
-                print(f"🧡 Intent: {direction_str}")
-                print(f"🔁 LEFT DIR: {'FORWARD' if left_forward else 'REVERSE'}")
-                print(f"🔁 RIGHT DIR: {'FORWARD' if right_forward else 'REVERSE'}")
+                log_dir.info("🧡 Intent: %s  L:%s R:%s", direction_str,
+                             "FWD" if left_forward else "REV", "FWD" if right_forward else "REV")
 
-                intent_label.text = f"INTENT: {direction_str}"
-                dir_label_left.text = f"DIR_L: {'FWD' if left_forward else 'REV'}"
-                dir_label_right.text = f"DIR_R: {'FWD' if right_forward else 'REV'}"
+                oled.set_text(intent_label, f"INTENT: {direction_str}")
+                oled.set_text(dir_label_left, f"DIR_L: {'FWD' if left_forward else 'REV'}")
+                oled.set_text(dir_label_right, f"DIR_R: {'FWD' if right_forward else 'REV'}")
 
                 last_direction_str = direction_str
                 last_dir_left = left_forward
                 last_dir_right = right_forward
 
-            DIR_LEFT.value = not left_forward
-            DIR_RIGHT.value = not right_forward
-        else:
-            DIR_LEFT.value = False
-            DIR_RIGHT.value = False
+    if events & EV_ARMED:
+        stop_left.value = True
+        stop_right.value = True
+        log_link.warn("🟢 ESC ENABLED — STOP pins HIGH, throttle baseline %d", gate.startup_throttle)
+    elif events & EV_DISARMED:
+        stop_left.value = False
+        stop_right.value = False
+        log_link.warn("🔴 ESC DISABLED — CH8 switched off, STOP pins LOW")
+    elif events & EV_NOT_ARMED:
+        log_arm.warn("⚠️ Motors not armed — toggle CH8 switch to DOWN to enable throttle.")
+
+    if gate.armed:
+        log_thr.debug("🚀 Throttle raw=%d, mapped=%d%%", ch_data[2], gate.duty_pct)
+
+    if gate.write:
+        DIR_LEFT.value = mixer.left_dir
+        DIR_RIGHT.value = mixer.right_dir
+        LEFT_PWM.duty_cycle = mixer.left_duty
+        RIGHT_PWM.duty_cycle = mixer.right_duty
 
-    if len(ch_data) >= 8:
-        ch3_val = ch_data[2]
-        ch8_val = ch_data[7]
-        global ghost_ch3_val, ghost_repeat_count
-
-        if startup_throttle is None:
-            if ghost_ch3_val is None:
-                ghost_ch3_val = ch3_val
-                ghost_repeat_count = 1
-            elif ch3_val == ghost_ch3_val:
-                ghost_repeat_count += 1
-            else:
-                ghost_repeat_count = 1
-                ghost_ch3_val = ch3_val
-
-            if ghost_repeat_count >= MAX_GHOST_REPEAT and ch3_val < 1200 and ch8_val > 1500:
-                startup_throttle = ch3_val
-                MOTORS_ARMED = True
-                maybe_activate_motors()
-                print(f"🧪 Startup throttle set baseline: {startup_throttle}")
-            elif ch8_val <= 1500 and time.monotonic() - last_arm_warning > 5:
-                print("⚠️ Motors not armed — toggle CH8 switch to DOWN to enable throttle.")
-                last_arm_warning = time.monotonic()
-        else:
-            duty_pct = (ch3_val - startup_throttle) / 10
-            duty_pct = max(0, min(100, duty_pct))
-            if time.monotonic() - last_throttle_print > 0.2:
-                print(f"🚀 Throttle raw={ch3_val}, mapped={duty_pct:.1f}%")
-                last_throttle_print = time.monotonic()
-
-            if MOTORS_ARMED and not brakes_engaged:
-                duty = int((duty_pct / 100) * 65535)
-                if last_dir_left is not None and last_dir_right is not None:
-                    LEFT_PWM.duty_cycle = duty if last_dir_left else duty
-                    RIGHT_PWM.duty_cycle = duty if last_dir_right else duty
-
-    any_change = False
     for i in range(4):
         if i >= len(ch_data):
             continue
@@ -270,23 +218,31 @@ def on_servo(ch_data):
         changed = val != prev_channels[i]
         if changed:
             prev_channels[i] = val
-            labels[i].text = f"CH{i+1}:{val}"
-            labels[i].color = 0xFFFF00
-            print(f"🎮 CH{i+1}: {val}")
-            any_change = True
+            oled.set_text(labels[i], f"CH{i+1}:{val}")
+            oled.set_color(labels[i], 0xFFFF00)
+            log_ch.debug("🎮 CH%d: %d", i + 1, val)
         else:
-            labels[i].color = 0x888888
+            oled.set_color(labels[i], 0x888888)
 
     if len(ch_data) >= 8:
         ch6 = "UP" if ch_data[5] > 1500 else "DN"
         ch7 = "UP" if ch_data[6] > 1500 else "DN"
         ch8 = "UP" if ch_data[7] > 1500 else "DN"
-        switch_label.text = f"BRK:{'ON' if brakes_engaged else 'OFF'}  6:{ch6} 7:{ch7} 8:{ch8}"
-
-    if any_change:
-        print("-" * 30)
+        oled.set_text(switch_label, f"BRK:{'ON' if gate.brakes else 'OFF'}  6:{ch6} 7:{ch7} 8:{ch8}")
+
+# Main loop: packets and motor writes first; the OLED refresh (a blocking
+# ~47 ms I2C push, rate-limited to max_hz) only runs between packets.
+def main():
+    decoder = IBusDecoder(uart)
+    print("🔧 ibusted-oled.py running. Waiting for iBUS packets...")
+    while True:
+        if decoder.poll():
+            on_servo(decoder.channels)
+        else:
+            oled.tick()
+            log_sink.drain(2)
+            time.sleep(0.001)
 
-ibus = IBUS(uart, sensor_types=[], servo_cb=on_servo)
-ibus.start_loop()
 
-print("🔧 ibusted-oled.py running. Waiting for iBUS packets...")
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,215 @@
 # intent_mapper.py
 # Author: savant42
+#
+# Maps raw iBUS channels onto one reused Intent object. All per-value math
+# (normalization, deadzone, mode detection) is precomputed into lookup tables at
+# import, so update() is a handful of array reads per frame. update() returns a
+# bitmask of the fields that changed so consumers can skip unchanged work.
+
+from array import array
+
+import log_sink
 
 MID = 1500
 DEADZONE = 50
+CH_MIN = 1000
+CH_MAX = 2000
+BRAKE_ON_ABOVE = MID  # CH5 (SWA) up = brake, per the README channel map; arming.py uses the same rule
 
 MODE_THRESHOLDS = {
     "attract": 50652,
     "dev": 50140,
     "stealth": 0
 }
+MODE_TOLERANCE = 20
+
+# Field codes
+MODE_STEALTH = 0
+MODE_DEV = 1
+MODE_ATTRACT = 2
+MODE_NAMES = ("stealth", "dev", "attract")
+
+LEFT = -1
+RIGHT = 1
+REVERSE = -1
+FORWARD = 1
+NEUTRAL = 0
+
+# Change bitmask
+CHG_DIRECTION = 0x01
+CHG_THROTTLE = 0x02
+CHG_VEER = 0x04
+CHG_PIVOT = 0x08
+CHG_BRAKE = 0x10
+CHG_MODE = 0x20
+CHG_SWB = 0x40
+
+# === Precomputed channel tables over CH_MIN..CH_MAX ===
+_NORM = array("b", [int((v - MID) / 5) for v in range(CH_MIN, CH_MAX + 1)])
+_SIDE = array("b", [-1 if n < -DEADZONE else 1 if n > DEADZONE else 0 for n in _NORM])
+_ABS = bytes([abs(n) for n in _NORM])
+# Signed stick deflection beyond the deadzone, rescaled to -100..100
+_PROP = array("b", [0 if abs(n) <= DEADZONE else (n - DEADZONE if n > 0 else n + DEADZONE) * 100 // (100 - DEADZONE)
+                    for n in _NORM])
+# CH3 as a one-sided throttle stick: 0 at the bottom (CH_MIN), 100 at the top
+_LIFT = bytes([(v - CH_MIN) // 10 for v in range(CH_MIN, CH_MAX + 1)])
+
+_MODE_TABLE = {}
+for _value in range(MODE_THRESHOLDS["dev"] - MODE_TOLERANCE + 1, MODE_THRESHOLDS["dev"] + MODE_TOLERANCE):
+    _MODE_TABLE[_value] = MODE_DEV
+for _value in range(MODE_THRESHOLDS["attract"] - MODE_TOLERANCE + 1, MODE_THRESHOLDS["attract"] + MODE_TOLERANCE):
+    _MODE_TABLE[_value] = MODE_ATTRACT
 
-_last_intent = None
 
 def normalize_channel(value):
-    if value < 1000 or value > 2000:
+    if value < CH_MIN or value > CH_MAX:
         return 0
-    return int((value - 1500) / 5)
+    return _NORM[value - CH_MIN]
+
+
+def proportional_channel(value):
+    if value < CH_MIN or value > CH_MAX:
+        return 0
+    return _PROP[value - CH_MIN]
+
+
+def throttle_channel(value):
+    """CH3 to 0–100 from stick bottom to top. Intent.throttle is the legacy |deflection| from centre."""
+    if value < CH_MIN or value > CH_MAX:
+        return 0
+    return _LIFT[value - CH_MIN]
+
+
+class Intent:
+    __slots__ = ("direction", "throttle", "veer", "pivot", "veer_amt", "pivot_amt",
+                 "brake", "swb", "mode", "raw")
+
+    def __init__(self):
+        self.direction = NEUTRAL  # REVERSE / NEUTRAL / FORWARD
+        self.throttle = 0         # 0–100
+        self.veer = NEUTRAL       # LEFT / NEUTRAL / RIGHT
+        self.pivot = NEUTRAL      # LEFT / NEUTRAL / RIGHT
+        self.veer_amt = 0         # -100 (full left) .. 100 (full right), 0 inside deadzone
+        self.pivot_amt = 0        # same scale as veer_amt
+        self.brake = False
+        self.swb = 0
+        self.mode = MODE_STEALTH
+        self.raw = None           # channel array the intent was mapped from
+
+    def __repr__(self):
+        return (f"Intent(direction={self.direction}, throttle={self.throttle}, "
+                f"veer={self.veer}/{self.veer_amt}, pivot={self.pivot}/{self.pivot_amt}, "
+                f"brake={self.brake}, mode={MODE_NAMES[self.mode]}, swb={self.swb})")
 
-def map_ibus_to_intent(ch_data, verbose=False):
-    global _last_intent
 
-    intent = {}
+class IntentMapper:
+    def __init__(self):
+        self.intent = Intent()
+        self.changed = 0
 
-    intent["throttle"] = abs(normalize_channel(ch_data.get(3, 1500)))
+    def update(self, channels):
+        """Maps a 0-based channel sequence (CH1 = index 0) into self.intent. Returns the change mask."""
+        it = self.intent
+        it.raw = channels
+        changed = 0
 
-    x = normalize_channel(ch_data.get(4, 1500))
-    intent["pivot"] = "left" if x < -DEADZONE else "right" if x > DEADZONE else None
+        v = channels[2]
+        throttle = _ABS[v - CH_MIN] if CH_MIN <= v <= CH_MAX else 0
+        if throttle != it.throttle:
+            it.throttle = throttle
+            changed |= CHG_THROTTLE
 
-    steer = normalize_channel(ch_data.get(1, 1500))
-    intent["veer"] = "left" if steer < -DEADZONE else "right" if steer > DEADZONE else None
+        v = channels[3]
+        if CH_MIN <= v <= CH_MAX:
+            side, amt = _SIDE[v - CH_MIN], _PROP[v - CH_MIN]
+        else:
+            side, amt = 0, 0
+        if amt != it.pivot_amt:
+            it.pivot = side
+            it.pivot_amt = amt
+            changed |= CHG_PIVOT
 
-    direction = normalize_channel(ch_data.get(2, 1500))
-    intent["direction"] = "reverse" if direction < -DEADZONE else "forward" if direction > DEADZONE else None
+        v = channels[0]
+        if CH_MIN <= v <= CH_MAX:
+            side, amt = _SIDE[v - CH_MIN], _PROP[v - CH_MIN]
+        else:
+            side, amt = 0, 0
+        if amt != it.veer_amt:
+            it.veer = side
+            it.veer_amt = amt
+            changed |= CHG_VEER
 
-    intent["brake"] = ch_data.get(5, 0) > 1500
-    intent["swb"] = ch_data.get(6, 0)
+        v = channels[1]
+        side = _SIDE[v - CH_MIN] if CH_MIN <= v <= CH_MAX else 0
+        if side != it.direction:
+            it.direction = side
+            changed |= CHG_DIRECTION
 
-    ch7 = ch_data.get(7, 0)
-    if abs(ch7 - MODE_THRESHOLDS["attract"]) < 20:
-        intent["mode"] = "attract"
-    elif abs(ch7 - MODE_THRESHOLDS["dev"]) < 20:
-        intent["mode"] = "dev"
-    else:
-        intent["mode"] = "stealth"
+        brake = channels[4] > BRAKE_ON_ABOVE
+        if brake != it.brake:
+            it.brake = brake
+            changed |= CHG_BRAKE
 
-    if verbose or intent["mode"] == "dev":
-        for ch in range(8, 17):
-            intent[f"ch{ch}"] = ch_data.get(ch, 0)
+        v = channels[5]
+        if v != it.swb:
+            it.swb = v
+            changed |= CHG_SWB
 
-    if verbose or intent["mode"] == "dev" or intent != _last_intent:
-        print("\n🎮 Interpreted Robot Intent:")
-        for key in ["direction", "throttle", "veer", "pivot", "brake", "mode", "swb"]:
-            print(f"{key:>10}: {intent.get(key)}")
-        if verbose or intent["mode"] == "dev":
-            for ch in range(8, 17):
-                key = f"ch{ch}"
-                if key in intent:
-                    print(f"{key:>10}: {intent[key]}")
-        _last_intent = intent.copy()
+        mode = _MODE_TABLE.get(channels[6], MODE_STEALTH)
+        if mode != it.mode:
+            it.mode = mode
+            changed |= CHG_MODE
 
-    return intent
+        self.changed = changed
+        return changed
+
+
+def print_intent(intent):
+    print("\n🎮 Interpreted Robot Intent:")
+    print(f"{'direction':>10}: {intent.direction}")
+    print(f"{'throttle':>10}: {intent.throttle}")
+    print(f"{'veer':>10}: {intent.veer} ({intent.veer_amt})")
+    print(f"{'pivot':>10}: {intent.pivot} ({intent.pivot_amt})")
+    print(f"{'brake':>10}: {intent.brake}")
+    print(f"{'mode':>10}: {MODE_NAMES[intent.mode]}")
+    print(f"{'swb':>10}: {intent.swb}")
+    if intent.mode == MODE_DEV and intent.raw is not None:
+        for ch in range(7, len(intent.raw)):
+            print(f"{'ch' + str(ch + 1):>10}: {intent.raw[ch]}")
+
+
+# Compatibility wrapper: the old {channel_number: value} dict in, the old intent
+# dict out (strings / None, ch8-ch16 in dev mode). New code uses IntentMapper.
+_mapper = IntentMapper()
+_log = log_sink.tag("intent", rate_ms=200)
+_scratch = array("H", [0] * 14)
+_SIDE_NAMES = {LEFT: "left", NEUTRAL: None, RIGHT: "right"}
+_DIRECTION_NAMES = {REVERSE: "reverse", NEUTRAL: None, FORWARD: "forward"}
+_legacy = {}
+
+def map_ibus_to_intent(ch_data, verbose=False):
+    """Returns the old intent dict; reused between calls, copy it to keep one."""
+    if isinstance(ch_data, dict):
+        for i in range(len(_scratch)):
+            _scratch[i] = ch_data.get(i + 1, MID if i < 4 else 0)
+        ch_data = _scratch
+    if _mapper.update(ch_data) and verbose:
+        it = _mapper.intent
+        _log.info("dir=%d thr=%d mode=%s", it.direction, it.throttle, MODE_NAMES[it.mode])
+    it = _mapper.intent
+    d = _legacy
+    d["throttle"] = it.throttle
+    d["pivot"] = _SIDE_NAMES[it.pivot]
+    d["veer"] = _SIDE_NAMES[it.veer]
+    d["direction"] = _DIRECTION_NAMES[it.direction]
+    d["brake"] = it.brake
+    d["swb"] = it.swb
+    d["mode"] = MODE_NAMES[it.mode]
+    extra = verbose or it.mode == MODE_DEV
+    for ch in range(8, 17):
+        key = "ch%d" % ch
+        if extra:
+            d[key] = ch_data[ch - 1] if ch <= len(ch_data) else 0
+        elif key in d:
+            del d[key]
+    return d
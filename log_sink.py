@@ -0,0 +1,194 @@
+# /log_sink.py
+# Leveled, per-tag rate-limited logging into a preallocated ring
+# Author: savant42
+#
+# A log call on the control path only checks the level and the tag's rate
+# limit and stores references (format string, up to three args, tag, level,
+# tick, and how many of the tag's messages were rate-limited just before it)
+# into preallocated slots. Formatting and the USB CDC write happen later in
+# drain(), called from a low-priority task, a few lines at a time, so a host
+# that stops reading the console can't stall a control tick.
+#
+#   import log_sink
+#   log = log_sink.tag("ibus", rate_ms=500)
+#   log.warn("CRC failures: %d", decoder.crc_failures)
+#   ...
+#   log_sink.drain()       # from the 'log' task
+#
+# DEBUG / DEBUG_LEVEL come from robot_config.txt: DEBUG = False keeps only
+# errors; DEBUG_LEVEL 1..4 = error, warn, info, debug. The config is read on
+# the first tag(), not at import, so importing log_sink never pulls in
+# config_loader (or parses the config) on its own; set_level() skips it.
+
+try:
+    from supervisor import ticks_ms
+    import supervisor
+except ImportError:  # desktop tools without the sim shims
+    import time
+    supervisor = None
+
+    def ticks_ms():
+        return (time.monotonic_ns() // 1_000_000) & _TICKS_MASK
+
+ERROR = 1
+WARN = 2
+INFO = 3
+DEBUG = 4
+LEVEL_NAMES = ("", "E", "W", "I", "D")
+
+RING_SLOTS = 64
+DRAIN_LINES = 4
+_TICKS_MASK = 0x1FFFFFFF  # supervisor.ticks_ms wraps at 2**29
+_NO_ARG = object()
+
+# Preallocated ring: parallel lists of references, written in place
+_fmt = [None] * RING_SLOTS
+_a = [None] * RING_SLOTS
+_b = [None] * RING_SLOTS
+_c = [None] * RING_SLOTS
+_tag = [None] * RING_SLOTS
+_lvl = bytearray(RING_SLOTS)
+_tick = [0] * RING_SLOTS
+_skipped = [0] * RING_SLOTS  # the tag's messages rate-limited since its previous one
+_head = 0  # next slot to write (monotonic count)
+_tail = 0  # next slot to drain
+
+level = None    # from robot_config.txt on the first tag(); set_level() overrides
+dropped = 0     # ring full
+suppressed = 0  # rate-limited
+written = 0
+_tags = {}
+
+
+def _read_settings():
+    """DEBUG / DEBUG_LEVEL from robot_config.txt via config_loader; defaults if it can't load."""
+    try:
+        from config_loader import load_config
+        cfg = load_config()
+    except (ImportError, OSError, ValueError):
+        return INFO
+    return cfg["DEBUG_LEVEL"] if cfg["DEBUG"] else ERROR
+
+
+class Tag:
+    __slots__ = ("name", "rate_ms", "last", "suppressed", "dropped")
+
+    def __init__(self, name, rate_ms=0):
+        self.name = name
+        self.rate_ms = rate_ms
+        self.last = None
+        self.suppressed = 0
+        self.dropped = 0
+
+    def log(self, lvl, fmt, a=_NO_ARG, b=_NO_ARG, c=_NO_ARG):
+        global _head, dropped, suppressed
+        if lvl > level:
+            return False
+        now = ticks_ms()
+        if self.rate_ms and self.last is not None and ((now - self.last) & _TICKS_MASK) < self.rate_ms:
+            self.suppressed += 1
+            suppressed += 1
+            return False
+        if _head - _tail >= RING_SLOTS:
+            self.dropped += 1
+            dropped += 1
+            return False
+        self.last = now
+        i = _head % RING_SLOTS
+        _fmt[i] = fmt
+        _a[i] = a
+        _b[i] = b
+        _c[i] = c
+        _tag[i] = self
+        _lvl[i] = lvl
+        _tick[i] = now
+        _skipped[i] = self.suppressed
+        self.suppressed = 0
+        _head += 1
+        return True
+
+    def error(self, fmt, a=_NO_ARG, b=_NO_ARG, c=_NO_ARG):
+        return self.log(ERROR, fmt, a, b, c)
+
+    def warn(self, fmt, a=_NO_ARG, b=_NO_ARG, c=_NO_ARG):
+        return self.log(WARN, fmt, a, b, c)
+
+    def info(self, fmt, a=_NO_ARG, b=_NO_ARG, c=_NO_ARG):
+        return self.log(INFO, fmt, a, b, c)
+
+    def debug(self, fmt, a=_NO_ARG, b=_NO_ARG, c=_NO_ARG):
+        return self.log(DEBUG, fmt, a, b, c)
+
+
+def get_level():
+    global level
+    if level is None:
+        level = _read_settings()
+    return level
+
+
+def tag(name, rate_ms=0):
+    """Returns the named tag, creating it at setup time. rate_ms is the minimum spacing between messages."""
+    get_level()  # Tag.log compares against it
+    t = _tags.get(name)
+    if t is None:
+        t = Tag(name, rate_ms)
+        _tags[name] = t
+    return t
+
+
+def set_level(lvl):
+    global level
+    level = lvl
+
+
+def _format(i):
+    fmt = _fmt[i]
+    if _a[i] is _NO_ARG:
+        text = fmt
+    elif _b[i] is _NO_ARG:
+        text = fmt % (_a[i],)
+    elif _c[i] is _NO_ARG:
+        text = fmt % (_a[i], _b[i])
+    else:
+        text = fmt % (_a[i], _b[i], _c[i])
+    extra = " (+%d)" % _skipped[i] if _skipped[i] else ""
+    return "%8d %s %-6s %s%s" % (_tick[i], LEVEL_NAMES[_lvl[i]], _tag[i].name, text, extra)
+
+
+def drain(max_lines=DRAIN_LINES):
+    """Formats and prints up to max_lines queued messages. Call from a low-priority task."""
+    global _tail, written, dropped
+    if supervisor is not None and not supervisor.runtime.serial_connected:
+        # Nobody is listening: discard instead of letting CDC buffers back up
+        dropped += _head - _tail
+        _tail = _head
+        return 0
+    n = 0
+    while _tail < _head and n < max_lines:
+        i = _tail % RING_SLOTS
+        try:
+            line = _format(i)
+        except (TypeError, ValueError):
+            line = "%8d ! %-6s bad format %r" % (_tick[i], _tag[i].name, _fmt[i])
+        _fmt[i] = _a[i] = _b[i] = _c[i] = None
+        _tail += 1
+        print(line)
+        n += 1
+    written += n
+    return n
+
+
+def flush():
+    """Drains everything (shutdown, REPL)."""
+    while drain(RING_SLOTS):
+        pass
+
+
+def pending():
+    return _head - _tail
+
+
+def stats_line():
+    return "log q=%d written=%d dropped=%d suppressed=%d level=%d" % (
+        pending(), written, dropped, suppressed, get_level())
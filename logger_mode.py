@@ -2,94 +2,157 @@
 # hardcoded non-shared bus
 # Do not use as-is on a shared bus
 # hard coded rotation and resolution
+#
+# Pages are drawn by BitmapText into one preallocated bitmap; only character
+# cells that change between updates are redrawn, and the compositor pushes at
+# most one refresh per update.
 import time
-import displayio
-import terminalio
-from adafruit_display_text import label
-from adafruit_displayio_sh1107 import SH1107
+import boot_sequence
+
+boot = boot_sequence.timeline
+
 import board
 import busio
-from adafruit_bitmap_font import bitmap_font
+
+from bitmap_text import BitmapText
+from gnss_dfrobot import GnssService
+from i2c_device_loader import I2CBusManager
+from oled_compositor import OledCompositor
+import profiler
 
 # External data modules
 import gps  # Replaces direct import to avoid import error
 from robot_state import get_robot_state
 
-# LIS3DH setup
-import adafruit_lis3dh
-
-# I2C and Display setup
-i2c = busio.I2C(scl=board.IO9, sda=board.IO8)
-display_bus = displayio.I2CDisplay(i2c, device_address=0x3D)
-display = SH1107(display_bus, width=128, height=128, rotation=90)
+# I2C and Display setup (README order: bus, OLED first, then the other devices)
+with boot.stage("i2c"):
+    i2c = busio.I2C(scl=board.IO9, sda=board.IO8)
+    bus = I2CBusManager(i2c)
+with boot.stage("oled"):
+    import displayio
+    from adafruit_displayio_sh1107 import SH1107
+    display_bus = displayio.I2CDisplay(i2c, device_address=0x3D)
+    display = SH1107(display_bus, width=128, height=128, rotation=90)
+
+# GNSS: burst-read in the background, pages read the cached fix
+gnss = GnssService(bus)
+gnss.txn.section = profiler.section("gnss")  # bus time of each burst read, not the submit
+try:
+    with boot.stage("gnss"):
+        gnss.enable()
+except OSError as e:
+    print(" GNSS enable failed:", e)
+gps.attach(gnss)
+GNSS_POLL_INTERVAL = 1  # seconds, module update rate
+last_gnss_poll = 0
 
 # LIS3DH init
-lis3dh = adafruit_lis3dh.LIS3DH_I2C(i2c, address=0x18)
-lis3dh.range = adafruit_lis3dh.RANGE_2_G
-
-# Load Droid font
-font = bitmap_font.load_font("/DroidobeshDepot-12.bdf") # We made this
+with boot.stage("lis3dh"):
+    import adafruit_lis3dh
+    lis3dh = adafruit_lis3dh.LIS3DH_I2C(i2c, address=0x18)
+    lis3dh.range = adafruit_lis3dh.RANGE_2_G
+
+# Load Droid font: the prebuilt atlas (tools/font_atlas.py) if it's on the
+# board, else parse the BDF
+with boot.stage("font"):
+    try:
+        import glyph_atlas
+        font = glyph_atlas.load("/DroidobeshDepot-12.atlas")
+    except OSError:
+        from adafruit_bitmap_font import bitmap_font
+        font = bitmap_font.load_font("/DroidobeshDepot-12.bdf") # We made this
 
 # Display group
-main_group = displayio.Group()
-display.show(main_group)
-
-# Label for output
-output_label = label.Label(font=font, text="...", x=0, y=8, line_spacing=1.1)
-main_group.append(output_label)
+oled = OledCompositor(display, max_hz=10)
+text = oled.add_text(BitmapText(font=font))
 
 # Page state
 page = 0
+shown = -1            # page whose labels are on screen
 last_update = time.monotonic()
-PAGE_INTERVAL = 2  # seconds
-
-while True:
-    now = time.monotonic()
-    if now - last_update >= PAGE_INTERVAL:
-        last_update = now
-        page = (page + 1) % 3
-
-        # Get live robot state
+last_values = 0
+PAGE_INTERVAL = 2     # seconds per page
+VALUE_INTERVAL = 0.25 # seconds between field updates
+PAGE_COUNT = 4
+prof_i2c = profiler.section("i2c")
+prof_refresh = profiler.section("refresh")
+boot.mark("ready")
+boot.report()
+
+
+def draw_labels(page):
+    """Static text, written once when a page is entered."""
+    text.clear()
+    if page == 0:
+        text.write_line(0, "THR     %")
+        text.write_line(1, "PVT     %")
+    elif page == 1:
+        text.write_line(0, "SPD:        kt")
+        text.write_line(1, "LAT:")
+        text.write_line(2, "LON:")
+        text.write_line(3, "SAT:")
+    elif page == 2:
+        text.write_line(0, "X:       g")
+        text.write_line(1, "Y:       g")
+        text.write_line(2, "Z:       g")
+
+
+def draw_values(page):
+    """Only the fields: unchanged cells are skipped by BitmapText, so an idle page costs no refresh."""
+    if page == 0:
+        # Throttle, Pivot, Brake, Mode
         state = get_robot_state()  # dict with keys: throttle_pct, pivot_pct, brake, mode
-        gps_data = gps.get_gnss_data()  # dict with speed_kph, lat, lon, sats
-        accel_xyz = lis3dh.acceleration  # tuple (x, y, z)
-
-        accel = {
-            "x": accel_xyz[0] / 9.806,  # convert m/s^2 to g approx
-            "y": accel_xyz[1] / 9.806,
-            "z": accel_xyz[2] / 9.806
-        }
-
-        if page == 0:
-            # Throttle, Pivot, Brake, Mode
-            text = ""
-            text += f"THR {state['throttle_pct']:>3}%\n"
-            text += f"PVT {state['pivot_pct']:>3}%\n"
-            if state['brake']:
-                output_label.color = 0xFF0000  # Red
-                text += "[ BRAKE ]\n"
-            else:
-                output_label.color = 0xFFFFFF  # White
-                text += "[   RUN  ]\n"
-            text += f"MODE {state['mode']}"
-
-        elif page == 1:
-            # GPS Page
-            text = ""
-            text += f"SPD: {gps_data['sog']:.1f} kt\n"
-            text += f"LAT: {gps_data['lat']:.5f}\n"
-            text += f"LON: {gps_data['lon']:.5f}\n"
-            text += f"SAT: {gps_data['sats']}"
-            output_label.color = 0xFFFF00  # Yellow for speed emphasis
-
-        elif page == 2:
-            # Accelerometer Page
-            text = ""
-            text += f"X: {accel['x']:.2f}g\n"
-            text += f"Y: {accel['y']:.2f}g\n"
-            text += f"Z: {accel['z']:.2f}g"
-            output_label.color = 0xFFFFFF
-
-        output_label.text = text
-
-    time.sleep(0.05)
+        text.write_number(0, 4, state['throttle_pct'], 4)
+        text.write_number(1, 4, state['pivot_pct'], 4)
+        text.write_line(2, "[ BRAKE ]" if state['brake'] else "[   RUN  ]")
+        text.write_line(3, "MODE " + state['mode'])
+    elif page == 1:
+        # GPS Page
+        gps_data = gps.get_gnss_data()  # dict with sog, lat, lon, sats
+        if gps_data['lat'] is None:
+            text.write(0, 5, "    --")
+            text.write(1, 5, "        --")
+            text.write(2, 5, "        --")
+        else:
+            text.write_fixed(0, 5, round((gps_data['sog'] or 0) * 10), 6, 1)
+            text.write_fixed(1, 5, round(gps_data['lat'] * 100000), 10, 5)
+            text.write_fixed(2, 5, round(gps_data['lon'] * 100000), 10, 5)
+        text.write_number(3, 5, gps_data['sats'] or 0, 3)
+    elif page == 2:
+        # Accelerometer Page, m/s^2 -> centi-g
+        x, y, z = lis3dh.acceleration
+        text.write_fixed(0, 3, round(x * 100 / 9.806), 5, 2)
+        text.write_fixed(1, 3, round(y * 100 / 9.806), 5, 2)
+        text.write_fixed(2, 3, round(z * 100 / 9.806), 5, 2)
+    elif page == 3:
+        # Timing page: p99 / max per section, in us
+        profiler.render(text, 0, rows=4, header=False)
+
+
+def main():
+    global page, shown, last_update, last_values, last_gnss_poll
+    while True:
+        now = time.monotonic()
+        if now - last_gnss_poll >= GNSS_POLL_INTERVAL:
+            last_gnss_poll = now
+            gnss.poll()
+        with prof_i2c:
+            bus.run_pending()
+
+        if now - last_update >= PAGE_INTERVAL:
+            last_update = now
+            page = (page + 1) % PAGE_COUNT
+        if now - last_values >= VALUE_INTERVAL:
+            last_values = now
+            if page != shown:
+                shown = page
+                draw_labels(page)
+            draw_values(page)
+
+        with prof_refresh:
+            oled.tick()
+        time.sleep(0.05)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
 # /code/main_robot.py
 # Entry point — Initializes shared I2C, OLED, and Qwiic Twist
 
-import board
-import busio
 import displayio
 import terminalio
 from adafruit_display_text import label
+from i2c_device_loader import init_bus
 from oled_display import init_display
 from twist_module import check_twist_events
 import sparkfun_qwiictwist
@@ -14,15 +13,11 @@ import time
 # 1. Release any preexisting display locks
 displayio.release_displays()
 
-# 2. Set up the shared I2C bus
-i2c = busio.I2C(scl=board.SCL, sda=board.SDA)
-while not i2c.try_lock():
-    pass
-try:
-    devices = i2c.scan()
-    print("🔍 I2C scan:", [hex(d) for d in devices])
-finally:
-    i2c.unlock()
+# 2. Set up the shared I2C bus (lock retries live in the bus manager)
+bus = init_bus()
+i2c = bus.i2c
+devices = bus.scan()
+print("🔍 I2C scan:", [hex(d) for d in devices])
 
 # 3. Initialize OLED display
 display = init_display(i2c)
@@ -49,24 +44,29 @@ except Exception as e:
         pass
 
 # 5. Main loop to poll twist and update screen
-last_position = twist.count if twist else 0
+def main():
+    last_position = twist.count if twist else 0
+
+    while True:
+        if twist:
+            event = check_twist_events(twist)
+            if event:
+                print("🎛️ Twist event:", event)
+                new_text = f"Twist: {event}"
+                if text_area.text != new_text:
+                    text_area.text = new_text
+
+            new_position = twist.count
+            if new_position != last_position:
+                delta = new_position - last_position
+                print(f"🔄 Twist moved: {new_position} (Δ {delta})")
+                new_text = f"Rot: {new_position}"
+                if text_area.text != new_text:
+                    text_area.text = new_text
+                last_position = new_position
 
-while True:
-    if twist:
-        event = check_twist_events(twist)
-        if event:
-            print("🎛️ Twist event:", event)
-            new_text = f"Twist: {event}"
-            if text_area.text != new_text:
-                text_area.text = new_text
+        time.sleep(0.05)
 
-        new_position = twist.count
-        if new_position != last_position:
-            delta = new_position - last_position
-            print(f"🔄 Twist moved: {new_position} (Δ {delta})")
-            new_text = f"Rot: {new_position}"
-            if text_area.text != new_text:
-                text_area.text = new_text
-            last_position = new_position
 
-    time.sleep(0.05)
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,129 @@
 # /motor_controller.py
 # Author: savant42
 # zs-x11h motor controller for CircuitPython 9.2
+#
+# Low-speed crawl: below the slowest speed a wheel can hold (HOLD duty, just
+# above stall) it is driven in bursts instead. Each cycle kicks above
+# breakaway for KICK_MS, holds at HOLD duty, then rests at 0; the on-time is
+# the target's share of HOLD_PPS, trimmed every cycle from the average
+# measured by hall edge count. crawl() is called once per control tick and
+# never blocks.
 
 import pwmio
 import digitalio
 import board
+from supervisor import ticks_ms
+
+import duty_speed
+
+_TICKS_MASK = 0x1FFFFFFF  # supervisor.ticks_ms wraps at 2**29
+_TRIM_ONE = 1024          # crawl on-time trim, Q10
+_TRIM_MIN = 32
+_TRIM_MAX = 8192
 
 class MotorController:
-    def __init__(self, pwm_pin, dir_pin, reverse=False):
+    def __init__(self, pwm_pin, dir_pin, reverse=False, name=None, crawl=None):
         self.pwm = pwmio.PWMOut(pwm_pin, frequency=2000, duty_cycle=0)
         self.dir = digitalio.DigitalInOut(dir_pin)
         self.dir.direction = digitalio.Direction.OUTPUT
         self.reverse = reverse
+        # Measured duty->speed tables from the bench sweep (None until one is saved)
+        self.table_fwd = duty_speed.load(name, True) if name else None
+        self.table_rev = duty_speed.load(name, False) if name else None
+        # Pulse-burst crawl (config.CRAWL_CONFIG entry); crawl_below = 0 disables it
+        self.crawl_below = 0
+        self.crawling = False
+        self.crawl_trim = _TRIM_ONE
+        self._t0 = 0
+        self._on_ms = 0
+        self._cycle_ms = 0
+        self._target = 0
+        self._edges0 = -1
+        if crawl:
+            self.set_crawl(crawl)
+
+    def set_crawl(self, cfg):
+        """cfg: KICK/HOLD % duty, KICK_MS, PERIOD_MS, HOLD_PPS (steady speed at HOLD duty)."""
+        self.kick_duty = int(cfg['KICK'] * 65535 // 100)
+        self.hold_duty = int(cfg['HOLD'] * 65535 // 100)
+        self.kick_ms = int(cfg['KICK_MS'])
+        self.period_ms = int(cfg['PERIOD_MS'])
+        self.crawl_below = int(cfg['HOLD_PPS'] * 10)  # pps_x10
+
+    def crawls(self, pps_x10):
+        """True when this target is too slow to hold steadily and should be crawled."""
+        return 0 < pps_x10 < self.crawl_below
+
+    def _start_cycle(self, now, edges):
+        target = self._target
+        elapsed = (now - self._t0) & _TICKS_MASK
+        if edges >= 0 and self._edges0 >= 0 and elapsed:
+            # Average over the cycle just finished, from edge totals (2 edges per pulse)
+            avg = (edges - self._edges0) * 5000 // elapsed
+            trim = self.crawl_trim
+            if avg > 0:
+                trim += (trim * target // avg - trim) >> 1
+            else:
+                trim += trim >> 2  # never got going: longer bursts
+            self.crawl_trim = min(_TRIM_MAX, max(_TRIM_MIN, trim))
+        self._edges0 = edges
+        num = target * self.crawl_trim
+        den = self.crawl_below * _TRIM_ONE
+        on = self.period_ms * num // den
+        cycle = self.period_ms
+        if on < self.kick_ms:
+            # Slower than one kick per period allows: stretch the rest instead
+            on = self.kick_ms
+            cycle = min(self.kick_ms * den // num, 8 * self.period_ms)
+        self._on_ms = on
+        self._cycle_ms = cycle
+        self._t0 = now
+
+    def crawl(self, pps_x10, dir_level, edges=-1):
+        """One control tick of pulse-burst drive toward an average speed (pps x10).
+        edges: the wheel's running hall edge total (WheelSpeedEstimator.edges); when
+        given, each cycle's measured average trims the next on-time. Returns the duty written."""
+        now = ticks_ms()
+        self._target = pps_x10
+        if self.dir.value != dir_level or not self.crawling:
+            self.dir.value = dir_level
+            self.crawling = True
+            self._edges0 = -1
+            self._start_cycle(now, edges)
+        elif ((now - self._t0) & _TICKS_MASK) >= self._cycle_ms:
+            self._start_cycle(now, edges)
+        t = (now - self._t0) & _TICKS_MASK
+        if t < self.kick_ms:
+            duty = self.kick_duty
+        elif t < self._on_ms:
+            duty = self.hold_duty
+        else:
+            duty = 0
+        self.pwm.duty_cycle = duty
+        return duty
+
+    def feedforward(self, pps_x10, forward=True):
+        """16-bit duty for a steady speed (pps x10) from the measured table, O(1); None without one."""
+        table = self.table_fwd if forward else self.table_rev
+        return table.duty_for(pps_x10) if table is not None else None
+
+    def ff_fns(self, fallback=None):
+        """(forward, reverse) ff(pps_x10) -> duty for the speed PID; fallback where no table was measured."""
+        fwd = self.table_fwd.duty_for if self.table_fwd is not None else fallback
+        rev = self.table_rev.duty_for if self.table_rev is not None else fallback
+        return fwd, rev
 
     def set_speed(self, speed_percent):
         speed_percent = max(0, min(100, speed_percent))
         self.pwm.duty_cycle = int(speed_percent * 65535 / 100)
 
+    def write(self, duty, dir_level):
+        """Raw mixer output: 16-bit duty plus the DIR pin level (polarity already applied)."""
+        self.crawling = False
+        if self.dir.value != dir_level:
+            self.dir.value = dir_level
+        self.pwm.duty_cycle = duty
+
     def forward(self):
         self.dir.value = not self.reverse
 
@@ -24,4 +131,5 @@ class MotorController:
         self.dir.value = self.reverse
 
     def stop(self):
+        self.crawling = False
         self.pwm.duty_cycle = 0
@@ -0,0 +1,126 @@
+# /oled_compositor.py
+# Rate-limited, dirty-tracking text compositor for the SH1107 OLED
+# Author: savant42
+#
+# Callers write the screen they *want* (text/color per line) as often as they
+# like. Writes that change nothing are dropped before they reach a Label, and
+# real changes are batched into one display.refresh() no faster than max_hz.
+# auto_refresh is turned off, so nothing else triggers an I2C frame push.
+#
+# displayio only pushes the area that changed, so a BitmapText page added with
+# add_text() (cells redrawn only when they differ) costs a refresh proportional
+# to the cells that changed; a multi-line Label rewrites its whole box.
+
+import time
+
+import displayio
+import terminalio
+
+
+class OledCompositor:
+    def __init__(self, display, max_hz=10, group=None):
+        self.display = display
+        display.auto_refresh = False
+        self.group = group if group is not None else displayio.Group()
+        display.root_group = self.group
+
+        self._labels = []
+        self._texts = []  # BitmapText grids, see add_text()
+        self._text = []
+        self._color = []
+        self._dirty_lines = []
+        self._dirty = True  # the new root group is pushed whole on the first tick
+        self._min_interval_ns = 1_000_000_000 // max_hz
+        self._last_refresh_ns = -self._min_interval_ns  # first tick is never held back
+
+        # Stats
+        self.refresh_count = 0
+        self.refresh_us_last = 0
+        self.refresh_us_max = 0
+        self.writes_ignored = 0     # set_* calls that matched the current state
+        self.refreshes_skipped = 0  # ticks with pending changes held back by the rate limit
+
+    def add_line(self, x, y, text="", color=0xFFFFFF, font=terminalio.FONT):
+        """Adds a text line and returns its slot index for set_text/set_color."""
+        from adafruit_display_text import label
+        lbl = label.Label(font, text=text, x=x, y=y, color=color)
+        self.group.append(lbl)
+        self._labels.append(lbl)
+        self._text.append(text)
+        self._color.append(color)
+        self._dirty_lines.append(False)
+        self._dirty = True
+        return len(self._labels) - 1
+
+    def add_text(self, text):
+        """Shows a BitmapText; its changed cells are pushed on the next allowed tick."""
+        self.group.append(text.tilegrid)
+        self._texts.append(text)
+        return text
+
+    def pending(self):
+        """True while a change is waiting for a refresh."""
+        if self._dirty:
+            return True
+        for t in self._texts:
+            if t.dirty:
+                return True
+        return False
+
+    def set_text(self, slot, text):
+        if self._text[slot] == text:
+            self.writes_ignored += 1
+            return
+        self._text[slot] = text
+        self._dirty_lines[slot] = True
+        self._dirty = True
+
+    def set_color(self, slot, color):
+        if self._color[slot] == color:
+            self.writes_ignored += 1
+            return
+        self._color[slot] = color
+        self._dirty_lines[slot] = True
+        self._dirty = True
+
+    def invalidate(self):
+        """Forces a refresh on the next tick (e.g. after editing the group directly)."""
+        self._dirty = True
+
+    def tick(self, now_ns=None):
+        """Pushes pending changes to the panel if the rate limit allows. Returns True on refresh."""
+        if not self.pending():
+            return False
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        if now_ns - self._last_refresh_ns < self._min_interval_ns:
+            self.refreshes_skipped += 1
+            return False
+
+        dirty_lines = self._dirty_lines
+        for i in range(len(dirty_lines)):
+            if dirty_lines[i]:
+                lbl = self._labels[i]
+                if lbl.text != self._text[i]:
+                    lbl.text = self._text[i]
+                if lbl.color != self._color[i]:
+                    lbl.color = self._color[i]
+                dirty_lines[i] = False
+        for t in self._texts:
+            t.dirty = False
+
+        start = time.monotonic_ns()
+        self.display.refresh()
+        end = time.monotonic_ns()
+        us = (end - start) // 1000
+        self.refresh_us_last = us
+        if us > self.refresh_us_max:
+            self.refresh_us_max = us
+        self.refresh_count += 1
+        self._last_refresh_ns = now_ns
+        self._dirty = False
+        return True
+
+    def stats_line(self):
+        return (f"oled refresh={self.refresh_count} last={self.refresh_us_last}us "
+                f"max={self.refresh_us_max}us held={self.refreshes_skipped} ignored={self.writes_ignored}")
@@ -0,0 +1,196 @@
+# /profiler.py
+# Named-section timing with fixed-size log2 histograms
+# Author: savant42
+#
+# Every section owns one preallocated array of BUCKETS counters; bucket b holds
+# samples of 2^(b-1)..2^b - 1 us (bucket 0 is < 1 us, the last bucket is open).
+# Recording a sample is a few integer ops and array stores; nothing is appended
+# or resized, so sampling never grows the heap. Sections are created at
+# setup time; the hot path only touches objects that already exist.
+#
+#   import profiler
+#   ibus = profiler.section("ibus")
+#   with ibus:
+#       decoder.poll()
+#
+#   @profiler.profiled("gnss")
+#   def gnss_task(): ...
+#
+#   profiler.report()          # REPL: one line per section
+#   profiler.summary()         # compact string for logs / serial dumps
+#   profiler.render(text, 0)   # OLED diagnostics page via BitmapText
+#
+# ControlRuntime(profile=True) records every task into a section of the same
+# name plus a shared "late" section: how far past its slot each task started.
+# A spike in "late" while every task section stays quiet means the time went
+# somewhere no task owns, i.e. GC or a blocking USB console write, not I2C.
+
+import time
+from array import array
+
+BUCKETS = 20  # last bucket starts at 2^18 us (~262 ms)
+_SUM_MAX = (1 << 30) - 1  # running sum stays a small int: no long on the heap per sample
+
+_sections = {}
+_order = []
+enabled = True
+
+
+class Section:
+    __slots__ = ("name", "hist", "count", "avg", "max_us", "last_us", "_t0")
+
+    def __init__(self, name):
+        self.name = name
+        self.hist = array("L", [0] * BUCKETS)
+        self.count = 0
+        # [sum us, samples in the sum] for the mean; before the sum would pass _SUM_MAX
+        # half the samples are dropped, so long runs weight recent ones more instead of growing
+        self.avg = array("L", [0, 0])
+        self.max_us = 0
+        self.last_us = 0
+        self._t0 = 0
+
+    def record_us(self, us):
+        self.last_us = us
+        if us > self.max_us:
+            self.max_us = us
+        self.count += 1
+        a = self.avg
+        add = us if us < _SUM_MAX >> 1 else _SUM_MAX >> 1
+        if a[0] + add > _SUM_MAX:
+            n = a[1] >> 1          # drop half the samples at the current mean
+            a[0] -= a[0] // a[1] * n
+            a[1] -= n
+        a[0] += add
+        a[1] += 1
+        b = 0
+        while us and b < BUCKETS - 1:
+            us >>= 1
+            b += 1
+        self.hist[b] += 1
+
+    def __enter__(self):
+        self._t0 = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if enabled:
+            self.record_us((time.monotonic_ns() - self._t0) // 1000)
+        return False
+
+    def percentile_us(self, pct):
+        """Upper edge of the bucket holding the pct-th sample (log2 resolution), capped at max."""
+        if not self.count:
+            return 0
+        target = (self.count * pct + 99) // 100
+        seen = 0
+        for b in range(BUCKETS):
+            seen += self.hist[b]
+            if seen >= target:
+                return min((1 << b) - 1, self.max_us)
+        return self.max_us
+
+    def reset(self):
+        for b in range(BUCKETS):
+            self.hist[b] = 0
+        self.count = 0
+        self.avg[0] = 0
+        self.avg[1] = 0
+        self.max_us = 0
+        self.last_us = 0
+
+    def line(self):
+        a = self.avg
+        avg = a[0] // a[1] if a[1] else 0
+        return (f"{self.name:<8} n={self.count} avg={avg}us p50<={self.percentile_us(50)} "
+                f"p99<={self.percentile_us(99)} max={self.max_us}us")
+
+    def short(self):
+        """Fits one 21-char OLED row: name p99 max (us)."""
+        return f"{self.name[:6]:<6}{self.percentile_us(99):>7}{self.max_us:>8}"
+
+
+def section(name):
+    """Returns the named section, creating it on first use (do this at setup, not per tick)."""
+    s = _sections.get(name)
+    if s is None:
+        s = Section(name)
+        _sections[name] = s
+        _order.append(s)
+    return s
+
+
+def profiled(name):
+    """Decorator: times every call of a task callable into section `name`."""
+    s = section(name)
+
+    def wrap(fn):
+        def timed(*args):
+            if not enabled:
+                return fn(*args)
+            t0 = time.monotonic_ns()
+            result = fn(*args)
+            s.record_us((time.monotonic_ns() - t0) // 1000)
+            return result
+        return timed
+    return wrap
+
+
+def sections():
+    return _order
+
+
+def reset():
+    for s in _order:
+        s.reset()
+
+
+def report():
+    for s in _order:
+        print(s.line())
+
+
+def summary():
+    """One compact line: name:p50/p99/max for every section with samples."""
+    return " ".join(f"{s.name}:{s.percentile_us(50)}/{s.percentile_us(99)}/{s.max_us}"
+                    for s in _order if s.count)
+
+
+def histogram(name):
+    """Prints one section's buckets with their us ranges, for a closer look at the REPL."""
+    s = _sections[name]
+    for b in range(BUCKETS):
+        if s.hist[b]:
+            lo = (1 << (b - 1)) if b else 0
+            print(f"{lo:>7}-{(1 << b) - 1 if b < BUCKETS - 1 else '':<7}us {s.hist[b]}")
+
+
+def render(text, row=0, rows=8, header=True):
+    """Diagnostics page into a BitmapText: one row per section (p99 / max in us). Returns the next row."""
+    r = row
+    end = row + rows
+    if header:
+        text.write_line(r, "sect      p99     max")
+        r += 1
+    for s in _order:
+        if r >= end:
+            break
+        text.write_line(r, s.short())
+        r += 1
+    while r < end:
+        text.write_line(r, "")
+        r += 1
+    return r
+
+
+def page_lines(rows=8):
+    """Same page as a list of row strings, for callers that push one row at a time."""
+    lines = ["sect      p99     max"]
+    for s in _order[:rows - 1]:
+        lines.append(s.short())
+    return lines
+
+
+def page_text(rows=8):
+    """Same page as one newline-joined string, for label-based displays."""
+    return "\n".join(page_lines(rows))
@@ -0,0 +1,183 @@
+# /relay_tune.py
+# Relay-feedback (Astrom-Hagglund) PID autotune for the wheel speed loops
+# Author: savant42
+#
+# Instead of sweeping Kp until the loop happens to oscillate, each wheel is put
+# under relay control around its operating point: duty = bias + d while the
+# speed is below setpoint - eps, bias - d once it is above setpoint + eps. The
+# wheel settles into a limit cycle within a few periods; its period is Pu and
+# its speed amplitude a gives the ultimate gain
+#
+#   Ku = 4 d / (pi * sqrt(a^2 - eps^2))      (% duty per pps)
+#
+# from which RULES give Kp/Ki/Kd in the same units speed_pid.py and the
+# harness PID use. Several wheels run in the same loop on one time base, so
+# both sides of the sled tune in one short run.
+#
+#   tuner = RelayTuner(setpoint_pps=180, bias_pct=45, amp_pct=10, wheels=2)
+#   while not tuner.done:
+#       estimator.update()
+#       duties = tuner.step(now_ms, [estimator.pulses_per_sec(w) for w in (0, 1)])
+#   tuner.results[0].gains("tyreus_luyben")
+
+import math
+
+# name -> (Kp / Ku, Ti / Pu, Td / Pu); Ti = 0 means no integral, Td = 0 no derivative
+RULES = {
+    "zn": (0.6, 0.5, 0.125),                 # Ziegler-Nichols PID: fast, ~25% overshoot
+    "zn_pi": (0.45, 1 / 1.2, 0.0),           # Ziegler-Nichols PI
+    "pessen": (0.7, 0.4, 0.15),              # Pessen integral rule: faster still
+    "some_overshoot": (0.33, 0.5, 1 / 3),
+    "no_overshoot": (0.2, 0.5, 1 / 3),
+    "tyreus_luyben": (1 / 2.2, 2.2, 1 / 6.3),  # robust, slow integral: good for hall noise
+    "tyreus_luyben_pi": (1 / 3.2, 2.2, 0.0),
+}
+DEFAULT_RULE = "tyreus_luyben_pi"
+
+SETTLE_CYCLES = 2     # limit cycles ignored while the oscillation builds
+MEASURE_CYCLES = 4    # cycles averaged for Pu and a
+PERIOD_TOLERANCE = 0.15
+
+
+class RelayResult:
+    __slots__ = ("ku", "pu", "amplitude", "cycles")
+
+    def __init__(self, ku, pu, amplitude, cycles):
+        self.ku = ku
+        self.pu = pu
+        self.amplitude = amplitude
+        self.cycles = cycles
+
+    def gains(self, rule=DEFAULT_RULE):
+        """(Kp, Ki, Kd) for the named rule."""
+        kp_f, ti_f, td_f = RULES[rule]
+        kp = kp_f * self.ku
+        ki = kp / (ti_f * self.pu) if ti_f else 0.0
+        kd = kp * td_f * self.pu
+        return kp, ki, kd
+
+    def __repr__(self):
+        return f"Ku={self.ku:.4f} %/pps, Pu={self.pu:.3f}s, a={self.amplitude:.1f}pps over {self.cycles} cycles"
+
+
+class RelayChannel:
+    """Relay state and cycle measurements for one wheel."""
+
+    def __init__(self, setpoint, bias, amp, eps):
+        self.setpoint = setpoint
+        self.bias = bias
+        self.amp = amp
+        self.eps = eps
+        self.high = True
+        self.last_rise_ms = None
+        self.periods = []
+        self.amplitudes = []
+        self._lo = None
+        self._hi = None
+        self.result = None
+        self.error = None
+
+    def step(self, now_ms, pps):
+        if self.high and pps > self.setpoint + self.eps:
+            self.high = False
+        elif not self.high and pps < self.setpoint - self.eps:
+            self.high = True
+            self._cycle(now_ms)
+        if self._lo is None or pps < self._lo:
+            self._lo = pps
+        if self._hi is None or pps > self._hi:
+            self._hi = pps
+        return self.bias + self.amp if self.high else self.bias - self.amp
+
+    def _cycle(self, now_ms):
+        # A cycle ends each time the relay switches back to high
+        if self.last_rise_ms is not None:
+            self.periods.append((now_ms - self.last_rise_ms) / 1000)
+            self.amplitudes.append((self._hi - self._lo) / 2)
+        self.last_rise_ms = now_ms
+        self._lo = self._hi = None
+        n = len(self.periods) - SETTLE_CYCLES
+        if n >= MEASURE_CYCLES and self.result is None:
+            periods = self.periods[-MEASURE_CYCLES:]
+            pu = sum(periods) / len(periods)
+            if max(periods) - min(periods) > PERIOD_TOLERANCE * pu:
+                return  # not settled yet; keep going until the timeout
+            a = sum(self.amplitudes[-MEASURE_CYCLES:]) / MEASURE_CYCLES
+            if a <= self.eps:
+                self.error = "oscillation smaller than the hysteresis; raise amp_pct"
+                return
+            ku = 4 * self.amp / (math.pi * math.sqrt(a * a - self.eps * self.eps))
+            self.result = RelayResult(ku, pu, a, MEASURE_CYCLES)
+
+    @property
+    def done(self):
+        return self.result is not None or self.error is not None
+
+
+class RelayTuner:
+    def __init__(self, setpoint_pps, bias_pct, amp_pct=10.0, eps_pps=None, wheels=1, timeout_s=10.0):
+        """bias_pct: duty near the setpoint speed (feedforward); amp_pct: relay swing d.
+        eps_pps: hysteresis, default 3% of setpoint to ride over hall quantization."""
+        if eps_pps is None:
+            eps_pps = 0.03 * setpoint_pps
+        if bias_pct - amp_pct <= 0 or bias_pct + amp_pct > 100:
+            raise ValueError("bias_pct +/- amp_pct must stay within 0..100%")
+        self.channels = [RelayChannel(setpoint_pps, bias_pct, amp_pct, eps_pps) for _ in range(wheels)]
+        self.timeout_ms = int(timeout_s * 1000)
+        self.start_ms = None
+        self.duties = [0.0] * wheels
+
+    def step(self, now_ms, pps):
+        """One tick: pps per wheel in, duty % per wheel out (same list every call)."""
+        if self.start_ms is None:
+            self.start_ms = now_ms
+        for w, ch in enumerate(self.channels):
+            self.duties[w] = ch.step(now_ms, pps[w]) if not ch.done else ch.bias
+        if now_ms - self.start_ms >= self.timeout_ms:
+            for ch in self.channels:
+                if not ch.done:
+                    ch.error = f"no steady limit cycle in {self.timeout_ms // 1000}s ({len(ch.periods)} cycles)"
+        return self.duties
+
+    @property
+    def done(self):
+        return all(ch.done for ch in self.channels)
+
+    @property
+    def results(self):
+        return [ch.result for ch in self.channels]
+
+
+def run(estimator, pwms, setpoint_pps, bias_pct, amp_pct=10.0, tick_ms=20, timeout_s=10.0, rule=DEFAULT_RULE,
+        log=print):
+    """Blocking tune of every wheel in pwms at once (bench use). Wheels must already be
+    enabled (STOP high, BRAKE released). Returns the RelayTuner; PWMs are left at 0."""
+    import time
+    tuner = RelayTuner(setpoint_pps, bias_pct, amp_pct, wheels=len(pwms), timeout_s=timeout_s)
+    pps = [0.0] * len(pwms)
+    for pwm in pwms:
+        pwm.duty_cycle = int(bias_pct * 655.35)
+    time.sleep(0.5)  # spin up to the operating point before the relay starts
+    next_ms = time.monotonic_ns() // 1_000_000
+    try:
+        while not tuner.done:
+            now_ms = time.monotonic_ns() // 1_000_000
+            estimator.update()
+            for w in range(len(pwms)):
+                pps[w] = estimator.pulses_per_sec(w)
+            for pwm, duty in zip(pwms, tuner.step(now_ms, pps)):
+                pwm.duty_cycle = int(duty * 655.35)
+            next_ms += tick_ms
+            delay = next_ms - time.monotonic_ns() // 1_000_000
+            if delay > 0:
+                time.sleep(delay / 1000)
+    finally:
+        for pwm in pwms:
+            pwm.duty_cycle = 0
+    for w, ch in enumerate(tuner.channels):
+        if ch.result is None:
+            log(f"❌ wheel {w}: {ch.error}")
+        else:
+            kp, ki, kd = ch.result.gains(rule)
+            log(f"🎯 wheel {w}: {ch.result} -> {rule}: Kp={kp:.4f} Ki={ki:.4f} Kd={kd:.4f}")
+    return tuner
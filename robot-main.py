@@ -1,11 +1,303 @@
 # robot-main.py
 # Author: savant42
+# Entry point — wires iBUS, intent, motors, speed, GNSS and OLED into one
+# cooperative control runtime instead of a single sleep-paced loop.
 
+import boot_sequence
+
+# 0. Motors safe before anything heavy loads (no-op if code.py already did it)
+boot_sequence.safe_motors()
+boot = boot_sequence.timeline
+
+from config import (MOTOR_CONFIG, CRAWL_CONFIG, TASK_PERIODS_MS, I2C_BUDGET_US, RECORDER_RECORDS,
+                    FLIGHT_LOG_DIR, LINK_TIMEOUT_MS)
+from control_runtime import ControlRuntime
+from ibus_receiver import IBusDecoder, open_uart, FAILSAFE_CH4_VALUE
+import drive_mixer
+from flight_recorder import FlightRecorder, FLAG_LINK, FLAG_STOPPED
+from intent_mapper import IntentMapper, MODE_NAMES, MODE_DEV
+from arming import ArmingGate, EV_ARMED, EV_DISARMED, EV_NOT_ARMED, EV_FAILSAFE
+from motor_controller import MotorController
+import speed_pid
+import gc
 import time
-from ibus_receiver import get_latest_packet
+import log_sink
+import profiler
 
 print("🤖 Robot Main Starting Up...")
 
-while True:
-    ch_data = get_latest_packet()
-    time.sleep(0.1)
+# 1. UART first (see README boot sequence)
+with boot.stage("uart"):
+    decoder = IBusDecoder(open_uart())
+
+# 2. Motors: PWM/DIR, plus the boot-held STOP/BRAKE pins
+LEFT = MOTOR_CONFIG['LEFT']
+RIGHT = MOTOR_CONFIG['RIGHT']
+with boot.stage("motors"):
+    left_motor = MotorController(LEFT['PWM'], LEFT['DIR'], reverse=not LEFT['FWD'], name='LEFT',
+                                 crawl=CRAWL_CONFIG.get('LEFT'))
+    right_motor = MotorController(RIGHT['PWM'], RIGHT['DIR'], reverse=not RIGHT['FWD'], name='RIGHT',
+                                  crawl=CRAWL_CONFIG.get('RIGHT'))
+    mixer = drive_mixer.from_config()
+    # Warm-up, CH8 arm switch, throttle-low baseline and CH5 brake: same gate as ibusting-oled.py.
+    # It is the only writer of the mixer; nothing is driven until it has armed.
+    gate = ArmingGate(mixer)
+    stop_pins = (boot_sequence.take(LEFT['STOP'], False), boot_sequence.take(RIGHT['STOP'], False))
+    brake_pins = (boot_sequence.take(LEFT['BRAKE'], True), boot_sequence.take(RIGHT['BRAKE'], True))
+enabled = False
+# Wheel speed PID: open loop until the speed inputs come up, then closed (bumpless).
+# Feedforward comes from the measured duty->speed tables when a sweep has been saved.
+pid = speed_pid.from_config(motors=(left_motor, right_motor))
+
+# 3. Flight recorder: RAM ring, flushed to flash only while idle
+with boot.stage("recorder"):
+    recorder = FlightRecorder(RECORDER_RECORDS, FLIGHT_LOG_DIR)
+
+# I2C, OLED, GNSS and speed inputs come up from the 'boot' task once the control
+# loop is running, one stage per tick and only while the wheels are stopped,
+# so the sled answers the radio before displayio and drivers have loaded.
+bus = None
+oled = None
+oled_refresh = None
+status = None       # BitmapText status page
+status_shown = []   # text currently on each status row
+status_row = 0      # where display_task looks for the next changed row
+gnss = None
+speed = None
+
+def boot_i2c():
+    # 4. Shared I2C with lock retries
+    global bus
+    from i2c_device_loader import init_bus
+    bus = init_bus()
+
+def boot_oled():
+    # 5. OLED first on the bus
+    global oled, oled_refresh, status, status_shown
+    from bitmap_text import BitmapText
+    from oled_compositor import OledCompositor
+    from oled_display import init_display
+    display = init_display(bus.i2c)
+    if display is None:
+        print("❌ OLED init failed — running headless")
+        return
+    compositor = OledCompositor(display, max_hz=1000 // TASK_PERIODS_MS['oled'])
+    status = compositor.add_text(BitmapText())
+    status_shown = [""] * status.rows
+    oled_refresh = profiler.profiled('refresh')(compositor.tick)
+    # The one full-panel push (new root group) happens here, while the wheels are stopped
+    oled_refresh()
+    oled = compositor
+
+def boot_scan():
+    print("🔍 I2C scan:", [hex(d) for d in bus.scan()])
+
+def boot_gnss():
+    # 6. GNSS (optional)
+    global gnss
+    from gnss_dfrobot import GnssService
+    service = GnssService(bus)
+    service.enable()
+    service.txn.section = profiler.section('gnss')  # the burst read as the bus runs it
+    gnss = service
+
+def boot_speed():
+    # 7. Speed pulses (optional)
+    global speed
+    import speed_pulse_reader
+    speed = speed_pulse_reader.from_config()
+    pid.attach(speed)
+
+BOOT_STAGES = (("i2c", boot_i2c), ("oled", boot_oled), ("scan", boot_scan),
+               ("gnss", boot_gnss), ("speed", boot_speed))
+boot_next = 0
+
+# === Shared state between tasks ===
+mapper = IntentMapper()
+intent = mapper.intent
+last_frame = 0
+stopped = True
+
+def ibus_task():
+    decoder.poll()
+
+log_arm = log_sink.tag("arm", rate_ms=2000)
+
+def intent_task():
+    global last_frame
+    if decoder.frame_count == last_frame:
+        return
+    last_frame = decoder.frame_count
+    mapper.update(decoder.channels)
+    events = gate.update(decoder.channels)
+    if events & EV_ARMED:
+        log_arm.warn("🟢 armed, throttle baseline %d", gate.startup_throttle)
+    elif events & EV_DISARMED:
+        log_arm.warn("🔴 disarmed (CH8 off)")
+    elif events & EV_NOT_ARMED:
+        log_arm.info("⚠️ not armed: CH8 on with the throttle low to arm")
+    if events & EV_FAILSAFE:
+        log_arm.error("🚨 receiver failsafe")
+    # One record per frame with what the wheels are being driven with right now
+    recorder.record(decoder.channels, intent, 0 if stopped else gate.duty_pct,
+                    left_motor.pwm.duty_cycle, left_motor.dir.value,
+                    right_motor.pwm.duty_cycle, right_motor.dir.value,
+                    speed.pulses_per_sec(0) if speed else 0,
+                    speed.pulses_per_sec(1) if speed else 0,
+                    (FLAG_LINK if link_ok() else 0) | (FLAG_STOPPED if stopped else 0), mapper.changed)
+
+def link_ok():
+    # Fresh frames that aren't the receiver's failsafe output
+    t = decoder.last_frame_time
+    if t is None or time.monotonic() - t > LINK_TIMEOUT_MS / 1000:
+        return False
+    return decoder.channels[3] != FAILSAFE_CH4_VALUE
+
+def set_enabled(on):
+    # STOP HIGH + BRAKE LOW to drive; STOP LOW + BRAKE HIGH otherwise
+    global enabled
+    if on == enabled:
+        return
+    enabled = on
+    for pin in stop_pins:
+        pin.value = on
+    for pin in brake_pins:
+        pin.value = not on
+
+def motor_task():
+    global stopped
+    link = link_ok()
+    if not link and gate.frames:
+        gate.reset()  # link back means warm-up and arming again, throttle low first
+    if not link or not gate.armed or gate.brakes:
+        left_motor.stop()
+        right_motor.stop()
+        pid.stop()
+        set_enabled(False)
+        stopped = True
+        return
+    stopped = False
+    set_enabled(True)
+    pid.set_targets(mixer)
+    if pid.closed:
+        drive(left_motor, pid.left, pid.left_target, pid.left_duty, mixer.left_dir, 0)
+        drive(right_motor, pid.right, pid.right_target, pid.right_duty, mixer.right_dir, 1)
+    else:
+        drive(left_motor, pid.left, pid.left_target, mixer.left_duty, mixer.left_dir, 0)
+        drive(right_motor, pid.right, pid.right_target, mixer.right_duty, mixer.right_dir, 1)
+        pid.track(mixer.left_duty, mixer.right_duty)
+
+def drive(motor, wheel_pid, target, duty, dir_level, wheel):
+    # Too slow to hold steadily: kick/hold bursts instead, with that wheel's PID sat out
+    if motor.crawls(target):
+        motor.crawl(target, dir_level, speed.edges[wheel] if speed is not None else -1)
+        wheel_pid.reset(speed.pps_x10(wheel) if speed is not None else 0)
+    else:
+        motor.write(duty, dir_level)
+
+def speed_task():
+    if speed is not None:
+        speed.update()
+        pid.update()
+
+def gnss_task():
+    # Only queues the read ('gnss_q'); its bus time lands in 'gnss' from i2c_task
+    if gnss is not None:
+        gnss.poll()
+
+DIR_NAMES = ("REV", "---", "FWD")
+
+def status_lines():
+    if intent.mode == MODE_DEV:
+        return profiler.page_lines(status.rows)
+    if last_frame == 0:
+        state = "Waiting for iBUS"
+    elif not link_ok():
+        state = "iBUS link lost"
+    elif not gate.armed:
+        state = "Not armed: CH8 on"
+    elif gate.brakes:
+        state = "BRAKE"
+    else:
+        state = "ARMED"
+    return (f"THR {gate.duty_pct:>3}%", "DIR " + DIR_NAMES[intent.direction + 1],
+            "MODE " + MODE_NAMES[intent.mode], state)
+
+def display_task():
+    # Redraws at most one changed row, and only once the last one has been pushed:
+    # displayio sends just the changed cells, so a refresh stays a few ms, well
+    # under a motor period, instead of a ~47 ms full-panel push.
+    global status_row
+    if oled is None or oled.pending():
+        return
+    lines = status_lines()
+    rows = status.rows
+    for i in range(rows):
+        row = (status_row + i) % rows
+        line = lines[row] if row < len(lines) else ""
+        if status_shown[row] != line:
+            status.write_line(row, line)
+            status_shown[row] = line
+            status_row = row + 1
+            return
+
+def oled_task():
+    # A refresh is one blocking displayio push that can't be budgeted, so it runs
+    # here and never inside the budgeted I2C pass. display_task keeps each one to
+    # a single status row (a full 128-column row is ~9 ms at 400 kHz).
+    if oled is not None:
+        oled_refresh()
+
+def i2c_task():
+    if bus is not None:
+        bus.run_pending(budget_us=I2C_BUDGET_US)
+
+def boot_task():
+    # One deferred stage per tick, and only while the wheels are not driven
+    global boot_next
+    if boot_next >= len(BOOT_STAGES):
+        return
+    if not (stopped or (mixer.left_duty == 0 and mixer.right_duty == 0)):
+        return
+    name, fn = BOOT_STAGES[boot_next]
+    boot_next += 1
+    if bus is not None or name == "i2c":
+        boot.run(name, fn)
+    if boot_next == len(BOOT_STAGES):
+        boot.mark("ready")
+        boot.report()
+
+def flush_task():
+    recorder.service(stopped or (mixer.left_duty == 0 and mixer.right_duty == 0))
+
+def log_task():
+    log_sink.drain()
+
+def gc_task():
+    # Collect on our schedule so GC shows up as its own section instead of a stall elsewhere
+    gc.collect()
+
+runtime = ControlRuntime(profile=True)
+runtime.add_task('ibus', TASK_PERIODS_MS['ibus'], ibus_task)
+runtime.add_task('intent', TASK_PERIODS_MS['intent'], intent_task)
+runtime.add_task('motor', TASK_PERIODS_MS['motor'], motor_task)
+runtime.add_task('speed', TASK_PERIODS_MS['speed'], speed_task)
+runtime.add_task('i2c', TASK_PERIODS_MS['i2c'], i2c_task)
+# Non-control ticks must each fit inside one motor period
+tick_budget = TASK_PERIODS_MS['motor']
+runtime.add_task('gnss_q', TASK_PERIODS_MS['gnss'], gnss_task, tick_budget)
+runtime.add_task('display', TASK_PERIODS_MS['display'], display_task, tick_budget)
+runtime.add_task('oled', TASK_PERIODS_MS['oled'], oled_task, tick_budget)
+runtime.add_task('boot', TASK_PERIODS_MS['boot'], boot_task)
+runtime.add_task('flush', TASK_PERIODS_MS['flush'], flush_task)
+runtime.add_task('log', TASK_PERIODS_MS['log'], log_task)
+runtime.add_task('gc', TASK_PERIODS_MS['gc'], gc_task)
+
+
+def main():
+    boot.mark("control")
+    runtime.run()
+
+
+if __name__ == "__main__":
+    main()
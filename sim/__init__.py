@@ -0,0 +1,83 @@
+# sim/__init__.py
+# Desktop simulation backend for the robosled stack
+# Author: savant42
+#
+# sim.install() puts sim/shims first on sys.path so `import board`, `busio`,
+# `pwmio`, `digitalio`, `countio`, `pulseio`, `displayio` ... resolve to
+# desktop stand-ins, and swaps time.monotonic/monotonic_ns/sleep for the
+# world's virtual clock. After that the real modules import and run unchanged.
+# config.FLIGHT_LOG_DIR is pointed at a host temp directory, so the flight
+# recorder never writes into the desktop's filesystem root.
+#
+#   import sim
+#   world = sim.install()
+#   sim.attach_robot(world)          # wheels, OLED, GNSS, iBUS stream
+#   import robot modules and drive them, or sim.run_script("robot-main.py", 10)
+
+import os
+import sys
+import tempfile
+import time
+
+from sim.world import WORLD, SimStop, SimWorld
+
+_SHIM_DIR = os.path.join(os.path.dirname(__file__), "shims")
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_real_time = (time.monotonic, time.monotonic_ns, time.sleep)
+LOG_DIR = os.path.join(tempfile.gettempdir(), "robosled-sim-logs")
+
+
+def install(world=WORLD, virtual_time=True, log_dir=LOG_DIR):
+    if _SHIM_DIR not in sys.path:
+        sys.path.insert(0, _SHIM_DIR)
+    if _REPO_DIR not in sys.path:
+        sys.path.insert(1, _REPO_DIR)
+    import config
+    config.FLIGHT_LOG_DIR = log_dir  # the board's "/logs" is the host's root
+    if virtual_time:
+        time.monotonic = world.monotonic
+        time.monotonic_ns = world.monotonic_ns
+        time.sleep = world.sleep
+    return world
+
+
+def uninstall():
+    time.monotonic, time.monotonic_ns, time.sleep = _real_time
+    if _SHIM_DIR in sys.path:
+        sys.path.remove(_SHIM_DIR)
+
+
+def attach_robot(world=WORLD, motor_config=None, ibus_rx_pin=None, gnss=True):
+    """Wires the standard sled: two BLDC wheels, SH1107 at 0x3D, GNSS at 0x20, iBUS on the RX pin."""
+    import board
+    from sim.bldc import BldcWheel
+    from sim.gnss import FakeGnss
+    from sim.ibus_stream import IBusStream
+    from sim.sh1107 import FakeOled
+
+    if motor_config is None:
+        from config import MOTOR_CONFIG
+        motor_config = MOTOR_CONFIG
+    for device in motor_config.values():
+        world.add_model(BldcWheel(device))
+    world.add_i2c_device(0x3D, FakeOled())
+    if gnss:
+        world.add_model(world.add_i2c_device(0x20, FakeGnss()))
+    return world.add_model(IBusStream(ibus_rx_pin or board.IO44))
+
+
+def run_script(path, seconds, world=WORLD):
+    """Runs an entry script (e.g. robot-main.py) for `seconds` of virtual time; returns its globals."""
+    import control_runtime
+    control_runtime.asyncio = None  # asyncio would wait in real time; the step loop sleeps virtually
+    world.stop_at_ns = world.now_ns + int(seconds * 1_000_000_000)
+    scope = {"__name__": "__main__", "__file__": path}
+    with open(path) as f:
+        code = compile(f.read(), path, "exec")
+    try:
+        exec(code, scope)
+    except SimStop:
+        pass
+    finally:
+        world.stop_at_ns = None
+    return scope
@@ -0,0 +1,62 @@
+# sim/__main__.py
+# Headless run of an entry script against the simulated sled
+# Author: savant42
+#
+#   python -m sim                      # robot-main.py for 10 s of virtual time
+#   python -m sim robot-main.py 30 --noise 0.001
+
+import argparse
+import time
+
+import sim
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run a robosled entry script on the desktop simulator")
+    ap.add_argument("script", nargs="?", default="robot-main.py")
+    ap.add_argument("seconds", nargs="?", type=float, default=10.0)
+    ap.add_argument("--noise", type=float, default=0.0, help="per-byte iBUS corruption probability")
+    ap.add_argument("--throttle", type=int, default=1800, help="CH3 value applied after 1 s (CH2 goes forward)")
+    ap.add_argument("--no-arm", action="store_true", help="leave the CH8 arm switch off")
+    ap.add_argument("--screen", action="store_true", help="print the final OLED framebuffer")
+    args = ap.parse_args()
+
+    wall = time.perf_counter()
+    world = sim.install()
+    stream = sim.attach_robot(world)
+    stream.noise = args.noise
+    if not args.no_arm:
+        stream.schedule(0.5, 7, 2000)  # CH8 arm switch, throttle still low
+    stream.schedule(1.0, 1, 2000)
+    stream.schedule(1.0, 2, args.throttle)
+
+    scope = sim.run_script(args.script, args.seconds, world)
+    wall = time.perf_counter() - wall
+
+    print()
+    print(f"⏱️ {args.seconds:.1f}s virtual in {wall:.2f}s wall ({args.seconds / wall:.1f}x)")
+    print(f"📡 iBUS frames sent: {stream.frames_sent}  corrupted bytes: {stream.bytes_corrupted}")
+    for model in world.models:
+        if hasattr(model, "pps"):
+            print(f"🛞 {model.device['PWM']}: {model.pps:.1f} pps, {model.edges} edges")
+    for key in ("runtime", "decoder", "bus", "oled"):
+        obj = scope.get(key)
+        if obj is None:
+            continue
+        if hasattr(obj, "stats_lines"):
+            for line in obj.stats_lines():
+                print(line)
+        elif hasattr(obj, "stats_line"):
+            print(obj.stats_line())
+    recorder = scope.get("recorder")
+    if recorder is not None and recorder.path:
+        print(f"💾 flight log: {recorder.path}")
+    display = scope.get("display")
+    if display is None and scope.get("oled") is not None:
+        display = scope["oled"].display
+    if args.screen and display is not None:
+        print(display.ascii())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# sim/bldc.py
+# First-order hoverboard wheel + ZS-X11H model driven by the claimed pin objects
+# Author: savant42
+#
+# Speed follows a first-order lag toward a target set by PWM duty above the
+# stall threshold. A stopped wheel needs breakaway duty to start, and a moving
+# wheel stalls once duty falls under stall duty (the "low duty = stall" issue in
+# the README). STOP low (ESC disabled) coasts the wheel down; BRAKE high stops it
+# hard. Pins nobody has claimed read as the ESC board defaults (enabled, no brake). Hall edges go to whichever PulseIn/Counter has claimed the PULSE pin.
+
+
+class BldcWheel:
+    def __init__(self, device, max_pps=600.0, tau_s=0.25, brake_tau_s=0.05, coast_tau_s=0.8,
+                 stall_duty=0.18, breakaway_duty=0.25):
+        self.device = device
+        self.max_pps = max_pps
+        self.tau_s = tau_s
+        self.brake_tau_s = brake_tau_s
+        self.coast_tau_s = coast_tau_s
+        self.stall_duty = stall_duty
+        self.breakaway_duty = breakaway_duty
+
+        self.pps = 0.0        # signed pulses/sec, positive = wheel forward
+        self.edges = 0        # total hall edges emitted
+        self._phase = 0.0     # fractional half-periods
+        self._level = False
+
+    def _pin_value(self, world, key, default):
+        obj = world.pin_obj(self.device[key])
+        if obj is None:
+            return default
+        return obj.value
+
+    def target_pps(self, duty, moving):
+        threshold = self.stall_duty if moving else self.breakaway_duty
+        if duty < threshold:
+            return 0.0
+        span = 1.0 - self.stall_duty
+        return self.max_pps * (duty - self.stall_duty) / span
+
+    def step(self, world, dt_ns):
+        dt = dt_ns / 1_000_000_000
+        pwm = world.pin_obj(self.device['PWM'])
+        duty = pwm.duty_cycle / 65535 if pwm is not None else 0.0
+        enabled = self._pin_value(world, 'STOP', True)   # floating enable = ESC on
+        braking = self._pin_value(world, 'BRAKE', False)
+        forward = self._pin_value(world, 'DIR', self.device['FWD']) == self.device['FWD']
+
+        moving = abs(self.pps) > 1.0
+        if braking:
+            target, tau = 0.0, self.brake_tau_s
+        elif not enabled:
+            target, tau = 0.0, self.coast_tau_s
+        else:
+            target = self.target_pps(duty, moving)
+            if not forward:
+                target = -target
+            tau = self.tau_s if target else self.coast_tau_s
+        self.pps += (target - self.pps) * min(1.0, dt / tau)
+        if abs(self.pps) < 0.5 and target == 0.0:
+            self.pps = 0.0
+            return
+
+        speed = abs(self.pps)
+        self._phase += speed * 2 * dt
+        if self._phase >= 1.0:
+            half_us = 500_000 / speed
+            sink = world.pin_obj(self.device['PULSE'])
+            while self._phase >= 1.0:
+                self._phase -= 1.0
+                self._level = not self._level
+                self.edges += 1
+                if sink is not None:
+                    sink._edge(self._level, half_us)
+
+    def rpm(self):
+        return self.pps * 60 / self.device.get('PULSES_PER_REV', 90)
@@ -0,0 +1,72 @@
+# sim/gnss.py
+# Fake DFRobot GNSS register map at 0x20
+# Author: savant42
+#
+# Register layout matches gnss_dfrobot: 0..6 UTC, 7..12 latitude,
+# 13..18 longitude, 19 satellites, 20..22 altitude, 23..25 SOG, 26..28 COG.
+# A write sets the register pointer (extra bytes are stored as register
+# writes), and reads stream from the pointer. The fix changes once per
+# update period like the real module.
+
+
+class FakeGnss:
+    def __init__(self, lat=37.7749, lon=-122.4194, alt=16.0, sog=0.0, cog=0.0, sats=9,
+                 update_hz=1):
+        self.regs = bytearray(64)
+        self.pointer = 0
+        self.lat = lat
+        self.lon = lon
+        self.alt = alt
+        self.sog = sog
+        self.cog = cog
+        self.sats = sats
+        self.period_ns = 1_000_000_000 // update_hz
+        self.epoch_s = 12 * 3600  # 12:00:00 UTC
+        self._next_ns = 0
+        self.reads = 0
+        self.writes = 0
+        self._encode(0)
+
+    @staticmethod
+    def _degmin(value):
+        value = abs(value)
+        deg = int(value)
+        minutes = (value - deg) * 60
+        whole = int(minutes)
+        frac = int(round((minutes - whole) * 100000))
+        return deg, whole, frac
+
+    def _encode(self, now_ns):
+        r = self.regs
+        t = self.epoch_s + now_ns // 1_000_000_000
+        year = 2025
+        r[0], r[1], r[2], r[3] = year >> 8, year & 0xFF, 4, 25
+        r[4], r[5], r[6] = (t // 3600) % 24, (t // 60) % 60, t % 60
+        for base, value, pos, neg in ((7, self.lat, "N", "S"), (13, self.lon, "E", "W")):
+            deg, whole, frac = self._degmin(value)
+            r[base], r[base + 1] = deg, whole
+            r[base + 2], r[base + 3], r[base + 4] = (frac >> 16) & 0xFF, (frac >> 8) & 0xFF, frac & 0xFF
+            r[base + 5] = ord(neg if value < 0 else pos)
+        r[19] = self.sats
+        for base, value in ((20, self.alt), (23, self.sog), (26, self.cog)):
+            whole = int(value)
+            r[base], r[base + 1], r[base + 2] = (whole >> 8) & 0xFF, whole & 0xFF, int(round((value - whole) * 100))
+
+    def step(self, world, dt_ns):
+        if world.now_ns >= self._next_ns:
+            self._next_ns = world.now_ns + self.period_ns
+            self._encode(world.now_ns)
+
+    # === I2C device interface ===
+    def write(self, data):
+        self.writes += 1
+        if not data:
+            return
+        self.pointer = data[0]
+        for i in range(1, len(data)):
+            self.regs[(self.pointer + i - 1) % len(self.regs)] = data[i]
+
+    def read_into(self, buf):
+        self.reads += 1
+        for i in range(len(buf)):
+            buf[i] = self.regs[(self.pointer + i) % len(self.regs)]
@@ -0,0 +1,75 @@
+# sim/ibus_stream.py
+# FlySky iBUS transmitter stand-in: pushes 32-byte frames into the UART FIFO
+# Author: savant42
+
+import random
+import struct
+
+IBUS_CHANNEL_COUNT = 14
+# Sticks centred, throttle (CH3) low, switches off, CH4 at the receiver's idle value
+DEFAULT_CHANNELS = (1500, 1500, 1000, 1500, 1000, 1000, 1000, 1000,
+                    1500, 1500, 1500, 1500, 1500, 1500)
+
+
+def encode_frame(channels):
+    frame = bytearray(32)
+    frame[0] = 0x20
+    frame[1] = 0x40
+    struct.pack_into("<14H", frame, 2, *channels)
+    checksum = 0xFFFF - (sum(frame[:30]) & 0xFFFF)
+    struct.pack_into("<H", frame, 30, checksum)
+    return frame
+
+
+class IBusStream:
+    """One frame every period_ms. noise is the per-byte probability of a flipped bit."""
+
+    def __init__(self, rx_pin, period_ms=7, noise=0.0, seed=1):
+        self.rx_pin = rx_pin
+        self.period_ns = period_ms * 1_000_000
+        self.noise = noise
+        self.channels = list(DEFAULT_CHANNELS)
+        self.enabled = True
+        self.frames_sent = 0
+        self.bytes_corrupted = 0
+        self._rng = random.Random(seed)
+        self._next_ns = 0
+        self._keys = []  # (t_ns, ch_index, value), sorted
+
+    def set(self, ch_index, value):
+        self.channels[ch_index] = value
+
+    def schedule(self, t_s, ch_index, value):
+        """Sets ch_index (0-based) to value once the world clock reaches t_s."""
+        self._keys.append((int(t_s * 1_000_000_000), ch_index, value))
+        self._keys.sort()
+
+    def step(self, world, dt_ns):
+        while self._keys and self._keys[0][0] <= world.now_ns:
+            _, ch, value = self._keys.pop(0)
+            self.channels[ch] = value
+        if not self.enabled or world.now_ns < self._next_ns:
+            return
+        self._next_ns = world.now_ns + self.period_ns
+        frame = encode_frame(self.channels)
+        if self.noise:
+            for i in range(len(frame)):
+                if self._rng.random() < self.noise:
+                    frame[i] ^= 1 << self._rng.randrange(8)
+                    self.bytes_corrupted += 1
+        world.uart_fifo(self.rx_pin).extend(frame)
+        self.frames_sent += 1
+
+
+def stream_bytes(channel_frames, noise=0.0, seed=1):
+    """Offline helper: concatenated frames for a list of channel tuples (decoder tests, benches)."""
+    rng = random.Random(seed)
+    out = bytearray()
+    for channels in channel_frames:
+        frame = encode_frame(channels)
+        if noise:
+            for i in range(len(frame)):
+                if rng.random() < noise:
+                    frame[i] ^= 1 << rng.randrange(8)
+        out.extend(frame)
+    return out
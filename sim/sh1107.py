@@ -0,0 +1,163 @@
+# sim/sh1107.py
+# Headless SH1107: renders the displayio group tree into a 1-bit framebuffer
+# Author: savant42
+
+from sim.world import WORLD
+
+# Bus cost of a refresh: 1 byte per 8-pixel page column plus page/column commands
+# per page, over the pages and columns that changed. displayio pushes only its
+# dirty area, so an unchanged screen costs nothing and a whole new root group
+# (or the first refresh) costs the full frame.
+_PAGE_CMD_BYTES = 3
+
+
+class FakeOled:
+    """The I2C-side presence of the panel at 0x3D; counts raw writes."""
+
+    def __init__(self):
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.bytes_written += len(data)
+
+    def read_into(self, buf):
+        for i in range(len(buf)):
+            buf[i] = 0
+
+
+class SH1107:
+    def __init__(self, bus, *, width=128, height=128, rotation=0, **kwargs):
+        self.bus = bus
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self._root_group = None
+        self._full = True
+        self.auto_refresh = True
+        self.brightness = 1.0
+        self.framebuffer = bytearray(width * height)
+        self._shown = bytearray(width * height)
+        self.refresh_count = 0
+        self.bytes_last = 0
+
+    @property
+    def root_group(self):
+        return self._root_group
+
+    @root_group.setter
+    def root_group(self, group):
+        self._root_group = group
+        self._full = True
+
+    def show(self, group):
+        raise AttributeError(".show(x) removed. Use .root_group = x")
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        fb = self.framebuffer
+        for i in range(len(fb)):
+            fb[i] = 0
+        if self._root_group is not None:
+            self._draw(self._root_group, 0, 0)
+        nbytes = self._push_bytes()
+        self._shown[:] = fb
+        self._full = False
+        self.refresh_count += 1
+        self.bytes_last = nbytes
+        self.bus.device.bytes_written += nbytes
+        WORLD.charge_i2c(nbytes)
+        return True
+
+    def _push_bytes(self):
+        w = self.width
+        if self._full:
+            x0, x1, y0, y1 = 0, w - 1, 0, self.height - 1
+        else:
+            fb, shown = self.framebuffer, self._shown
+            x0, x1, y0, y1 = w, -1, None, None
+            for y in range(self.height):
+                row = y * w
+                if fb[row:row + w] == shown[row:row + w]:
+                    continue
+                for x in range(w):
+                    if fb[row + x] != shown[row + x]:
+                        if x < x0:
+                            x0 = x
+                        if x > x1:
+                            x1 = x
+                if y0 is None:
+                    y0 = y
+                y1 = y
+            if y0 is None:
+                return 0
+        pages = y1 // 8 - y0 // 8 + 1
+        return pages * (x1 - x0 + 1 + _PAGE_CMD_BYTES)
+
+    # === Rendering ===
+    def _draw(self, item, ox, oy):
+        if getattr(item, "hidden", False):
+            return
+        if hasattr(item, "_items"):
+            for child in item._items:
+                self._draw(child, ox + item.x, oy + item.y)
+        elif hasattr(item, "bitmap") and hasattr(item, "pixel_shader"):
+            self._draw_tilegrid(item, ox + item.x, oy + item.y)
+        elif hasattr(item, "font") and hasattr(item, "text"):
+            self._draw_label(item, ox + item.x, oy + item.y)
+
+    def _plot(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.framebuffer[y * self.width + x] = 1
+
+    def _draw_tilegrid(self, tg, ox, oy):
+        bmp = tg.bitmap
+        shader = tg.pixel_shader
+        tw = tg.tile_width
+        th = tg.tile_height
+        per_row = max(1, bmp.width // tw)
+        for ty in range(tg.height):
+            for tx in range(tg.width):
+                tile = tg[ty * tg.width + tx]
+                sx0 = (tile % per_row) * tw
+                sy0 = (tile // per_row) * th
+                for y in range(th):
+                    for x in range(tw):
+                        v = bmp[sx0 + x, sy0 + y]
+                        if shader[v] and not shader.is_transparent(v):
+                            self._plot(ox + tx * tw + x, oy + ty * th + y)
+
+    def _draw_label(self, lbl, ox, oy):
+        font = lbl.font
+        box = font.get_bounding_box()
+        line_h = int(box[1] * lbl.line_spacing)
+        x = ox
+        top = oy - box[1] // 2
+        for ch in lbl.text:
+            if ch == "\n":
+                x = ox
+                top += line_h
+                continue
+            glyph = font.get_glyph(ord(ch))
+            if glyph is None:
+                continue
+            per_row = max(1, glyph.bitmap.width // glyph.width)
+            sx0 = (glyph.tile_index % per_row) * glyph.width
+            sy0 = (glyph.tile_index // per_row) * glyph.height
+            for gy in range(glyph.height):
+                for gx in range(glyph.width):
+                    if glyph.bitmap[sx0 + gx, sy0 + gy]:
+                        self._plot(x + gx, top + gy)
+            x += glyph.shift_x
+
+    # === Inspection ===
+    def lit_pixels(self):
+        return sum(self.framebuffer)
+
+    def ascii(self, step=2):
+        """Coarse text dump of the framebuffer, one character per step x step block."""
+        lines = []
+        for y in range(0, self.height, step):
+            row = []
+            for x in range(0, self.width, step):
+                row.append("#" if self.framebuffer[y * self.width + x] else ".")
+            lines.append("".join(row))
+        return "\n".join(lines)
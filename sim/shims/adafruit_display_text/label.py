@@ -0,0 +1,19 @@
+# sim/shims/adafruit_display_text/label.py
+# Minimal Label: keeps text/color/position; the headless SH1107 draws it from font glyphs
+
+
+class Label:
+    def __init__(self, font, *, text="", x=0, y=0, color=0xFFFFFF, line_spacing=1.25, **kwargs):
+        self.font = font
+        self.text = text
+        self.x = x
+        self.y = y
+        self.color = color
+        self.line_spacing = line_spacing
+        self.hidden = False
+        self.layouts = 0
+
+    def __setattr__(self, name, value):
+        if name == "text" and "layouts" in self.__dict__ and value != self.__dict__["text"]:
+            self.__dict__["layouts"] += 1
+        object.__setattr__(self, name, value)
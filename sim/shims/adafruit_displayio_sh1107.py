@@ -0,0 +1,4 @@
+# sim/shims/adafruit_displayio_sh1107.py
+from sim.sh1107 import SH1107
+
+DISPLAY_OFFSET_ADAFRUIT_128x128_OLED_5297 = 0
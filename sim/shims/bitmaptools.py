@@ -0,0 +1,54 @@
+# sim/shims/bitmaptools.py
+
+
+def fill_region(dest_bitmap, x1, y1, x2, y2, value):
+    w = dest_bitmap.width
+    data = dest_bitmap._data
+    x1 = max(0, x1)
+    y1 = max(0, y1)
+    x2 = min(w, x2)
+    y2 = min(dest_bitmap.height, y2)
+    for y in range(y1, y2):
+        row = y * w
+        for x in range(row + x1, row + x2):
+            data[x] = value
+
+
+def blit(dest_bitmap, source_bitmap, x, y, *, x1=0, y1=0, x2=None, y2=None,
+         skip_source_index=None, skip_dest_index=None):
+    x2 = source_bitmap.width if x2 is None else x2
+    y2 = source_bitmap.height if y2 is None else y2
+    sw = source_bitmap.width
+    dw = dest_bitmap.width
+    src = source_bitmap._data
+    dst = dest_bitmap._data
+    for sy in range(y1, y2):
+        dy = y + sy - y1
+        if not 0 <= dy < dest_bitmap.height:
+            continue
+        for sx in range(x1, x2):
+            dx = x + sx - x1
+            if not 0 <= dx < dw:
+                continue
+            v = src[sy * sw + sx]
+            if v == skip_source_index:
+                continue
+            if skip_dest_index is not None and dst[dy * dw + dx] == skip_dest_index:
+                continue
+            dst[dy * dw + dx] = v
+
+
+def readinto(bitmap, file, bits_per_pixel, element_size=1, reverse_pixels_in_element=False,
+             swap_bytes_in_element=False, reverse_rows=False):
+    # Rows padded to whole elements; reverse_pixels_in_element puts the first pixel in the MSB
+    w = bitmap.width
+    mask = (1 << bits_per_pixel) - 1
+    per_byte = 8 // bits_per_pixel
+    stride = ((w * bits_per_pixel + element_size * 8 - 1) // (element_size * 8)) * element_size
+    for y in range(bitmap.height):
+        row = file.read(stride)
+        dy = bitmap.height - 1 - y if reverse_rows else y
+        for x in range(w):
+            slot = x % per_byte
+            shift = (per_byte - 1 - slot) * bits_per_pixel if reverse_pixels_in_element else slot * bits_per_pixel
+            bitmap._data[dy * w + x] = (row[x // per_byte] >> shift) & mask
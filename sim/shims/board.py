@@ -0,0 +1,32 @@
+# sim/shims/board.py
+# Pin objects for the FeatherS3 names the sled code uses (Dxx, IOxx, bus pins)
+
+
+class Pin:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"board.{self.name}"
+
+
+for _i in range(49):
+    globals()[f"D{_i}"] = Pin(f"D{_i}")
+    globals()[f"IO{_i}"] = Pin(f"IO{_i}")
+
+SCL = Pin("SCL")
+SDA = Pin("SDA")
+TX = Pin("TX")
+RX = Pin("RX")
+NEOPIXEL = Pin("NEOPIXEL")
+
+_i2c = None
+
+def I2C():
+    global _i2c
+    if _i2c is None:
+        import busio
+        _i2c = busio.I2C(SCL, SDA)
+    return _i2c
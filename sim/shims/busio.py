@@ -0,0 +1,114 @@
+# sim/shims/busio.py
+from sim.world import WORLD
+
+
+class UART:
+    def __init__(self, tx=None, rx=None, *, baudrate=9600, bits=8, parity=None, stop=1,
+                 timeout=1, receiver_buffer_size=64):
+        if tx is not None:
+            WORLD.claim(tx, self)
+        if rx is not None:
+            WORLD.claim(rx, self)
+        self.tx = tx
+        self.rx = rx
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.receiver_buffer_size = receiver_buffer_size
+        self.overruns = 0
+        self.tx_bytes = bytearray()
+        self._fifo = WORLD.uart_fifo(rx)
+
+    def _trim(self):
+        extra = len(self._fifo) - self.receiver_buffer_size
+        if extra > 0:
+            # Hardware FIFO overflow: the oldest bytes are lost
+            del self._fifo[:extra]
+            self.overruns += 1
+
+    @property
+    def in_waiting(self):
+        self._trim()
+        return len(self._fifo)
+
+    def readinto(self, buf, nbytes=None):
+        self._trim()
+        n = min(len(buf) if nbytes is None else nbytes, len(self._fifo))
+        if n == 0:
+            return None
+        buf[:n] = self._fifo[:n]
+        del self._fifo[:n]
+        return n
+
+    def read(self, nbytes=None):
+        self._trim()
+        if not self._fifo:
+            return None
+        n = len(self._fifo) if nbytes is None else min(nbytes, len(self._fifo))
+        data = bytes(self._fifo[:n])
+        del self._fifo[:n]
+        return data
+
+    def write(self, buf):
+        self.tx_bytes.extend(buf)
+        return len(buf)
+
+    def reset_input_buffer(self):
+        self._fifo.clear()
+
+    def deinit(self):
+        WORLD.release(self.tx)
+        WORLD.release(self.rx)
+
+
+class I2C:
+    def __init__(self, scl, sda, *, frequency=100000, timeout=255):
+        WORLD.claim(scl, self)
+        WORLD.claim(sda, self)
+        self.scl = scl
+        self.sda = sda
+        self.frequency = frequency
+        self._locked = False
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def scan(self):
+        return sorted(WORLD.i2c_devices)
+
+    def _device(self, address):
+        dev = WORLD.i2c_devices.get(address)
+        if dev is None:
+            raise OSError(19, "No I2C device at address: 0x%x" % address)
+        return dev
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        data = buffer[start:end]
+        WORLD.charge_i2c(len(data) + 1)
+        self._device(address).write(data)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        end = len(buffer) if end is None else end
+        WORLD.charge_i2c(end - start + 1)
+        view = memoryview(buffer)[start:end]
+        self._device(address).read_into(view)
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        self.writeto(address, out_buffer, start=out_start, end=out_end)
+        self.readfrom_into(address, in_buffer, start=in_start, end=in_end)
+
+    def deinit(self):
+        WORLD.release(self.scl)
+        WORLD.release(self.sda)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
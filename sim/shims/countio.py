@@ -0,0 +1,32 @@
+# sim/shims/countio.py
+from sim.world import WORLD
+
+
+class Edge:
+    RISE = "RISE"
+    FALL = "FALL"
+    RISE_AND_FALL = "RISE_AND_FALL"
+
+
+class Counter:
+    def __init__(self, pin, *, edge=Edge.FALL, pull=None):
+        WORLD.claim(pin, self)
+        self.pin = pin
+        self.edge = edge
+        self.count = 0
+
+    def _edge(self, rising, half_period_us):
+        if self.edge == Edge.RISE_AND_FALL or (self.edge == Edge.RISE) == rising:
+            self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+    def deinit(self):
+        WORLD.release(self.pin)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
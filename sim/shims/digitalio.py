@@ -0,0 +1,51 @@
+# sim/shims/digitalio.py
+from sim.world import WORLD
+
+
+class Direction:
+    INPUT = "INPUT"
+    OUTPUT = "OUTPUT"
+
+
+class Pull:
+    UP = "UP"
+    DOWN = "DOWN"
+
+
+class DriveMode:
+    PUSH_PULL = "PUSH_PULL"
+    OPEN_DRAIN = "OPEN_DRAIN"
+
+
+class DigitalInOut:
+    def __init__(self, pin):
+        WORLD.claim(pin, self)
+        self.pin = pin
+        self.direction = Direction.INPUT
+        self.pull = None
+        self.value = False
+        self.writes = 0
+
+    def __setattr__(self, name, value):
+        if name == "value" and "writes" in self.__dict__:
+            self.__dict__["writes"] += 1
+            value = bool(value)
+        object.__setattr__(self, name, value)
+
+    def switch_to_output(self, value=False, drive_mode=DriveMode.PUSH_PULL):
+        self.direction = Direction.OUTPUT
+        self.value = value
+
+    def switch_to_input(self, pull=None):
+        self.direction = Direction.INPUT
+        self.pull = pull
+
+    def deinit(self):
+        WORLD.release(self.pin)
+        self.__dict__.pop("value", None)  # reading a deinit()ed pin raises, as on the board
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
@@ -0,0 +1,47 @@
+# sim/shims/fontio.py
+
+
+class Glyph:
+    def __init__(self, *, bitmap, tile_index, width, height, dx, dy, shift_x, shift_y):
+        self.bitmap = bitmap
+        self.tile_index = tile_index
+        self.width = width
+        self.height = height
+        self.dx = dx
+        self.dy = dy
+        self.shift_x = shift_x
+        self.shift_y = shift_y
+
+
+class BuiltinFont:
+    """6x12 cell font. Glyph shapes are synthetic (derived from the code point) so
+    headless frames differ per character; they are not meant to be legible."""
+
+    WIDTH = 6
+    HEIGHT = 12
+    FIRST = 32
+    LAST = 126
+
+    def __init__(self):
+        import displayio
+        count = self.LAST - self.FIRST + 1
+        self.bitmap = displayio.Bitmap(self.WIDTH * count, self.HEIGHT, 2)
+        for t in range(count):
+            code = self.FIRST + t
+            if code == 32:
+                continue
+            seed = (code * 2654435761) & 0xFFFFFFFF
+            for row in range(2, 10):
+                bits = (seed >> ((row * 5) % 27)) & 0x1F
+                for col in range(5):
+                    if bits & (1 << col):
+                        self.bitmap[t * self.WIDTH + col, row] = 1
+
+    def get_bounding_box(self):
+        return (self.WIDTH, self.HEIGHT)
+
+    def get_glyph(self, codepoint):
+        if not self.FIRST <= codepoint <= self.LAST:
+            codepoint = ord("?")
+        return Glyph(bitmap=self.bitmap, tile_index=codepoint - self.FIRST, width=self.WIDTH,
+                     height=self.HEIGHT, dx=0, dy=0, shift_x=self.WIDTH, shift_y=0)
@@ -0,0 +1,47 @@
+# sim/shims/pulseio.py
+from collections import deque
+
+from sim.world import WORLD
+
+
+class PulseIn:
+    def __init__(self, pin, maxlen=2, *, idle_state=False):
+        WORLD.claim(pin, self)
+        self.pin = pin
+        self.maxlen = maxlen
+        self.idle_state = idle_state
+        self.paused = False
+        self._q = deque(maxlen=maxlen)
+
+    def _edge(self, rising, half_period_us):
+        if not self.paused:
+            self._q.append(min(int(half_period_us), 0xFFFF))
+
+    def __len__(self):
+        return len(self._q)
+
+    def __getitem__(self, index):
+        return self._q[index]
+
+    def popleft(self):
+        if not self._q:
+            raise IndexError("pop from empty PulseIn")
+        return self._q.popleft()
+
+    def clear(self):
+        self._q.clear()
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self, trigger_duration=0):
+        self.paused = False
+
+    def deinit(self):
+        WORLD.release(self.pin)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
@@ -0,0 +1,28 @@
+# sim/shims/pwmio.py
+from sim.world import WORLD
+
+
+class PWMOut:
+    def __init__(self, pin, *, duty_cycle=0, frequency=500, variable_frequency=False):
+        WORLD.claim(pin, self)
+        self.pin = pin
+        self.frequency = frequency
+        self.duty_cycle = duty_cycle
+        self.writes = 0
+
+    def __setattr__(self, name, value):
+        if name == "duty_cycle":
+            if not 0 <= value <= 0xFFFF:
+                raise ValueError("duty_cycle must be 0-65535")
+            if "writes" in self.__dict__:
+                self.__dict__["writes"] += 1
+        object.__setattr__(self, name, value)
+
+    def deinit(self):
+        WORLD.release(self.pin)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
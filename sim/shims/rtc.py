@@ -0,0 +1,8 @@
+# sim/shims/rtc.py
+import time
+
+
+class RTC:
+    @property
+    def datetime(self):
+        return time.localtime()
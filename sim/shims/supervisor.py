@@ -0,0 +1,14 @@
+# sim/shims/supervisor.py
+import time
+
+
+def ticks_ms():
+    return (time.monotonic_ns() // 1_000_000) & 0x1FFFFFFF  # wraps at 2**29 like the firmware
+
+
+class _Runtime:
+    serial_connected = True
+    serial_bytes_available = 0
+
+
+runtime = _Runtime()
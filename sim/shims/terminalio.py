@@ -0,0 +1,4 @@
+# sim/shims/terminalio.py
+from fontio import BuiltinFont
+
+FONT = BuiltinFont()
@@ -0,0 +1,87 @@
+# sim/world.py
+# Virtual clock, pin registry and I2C device map shared by the hardware shims
+# Author: savant42
+#
+# Nothing here runs on its own thread. Time only moves when code calls
+# time.sleep() (patched by sim.install) or world.advance(), and each advance is
+# cut into fixed substeps in which the wheel models, iBUS stream and GNSS get
+# to update. A control loop that sleeps therefore runs as fast as the CPU allows.
+
+STEP_NS = 250_000  # 0.25 ms model substep
+
+# Approximate I2C cost at 400 kHz: 9 bit times per byte
+_I2C_NS_PER_BYTE = 22_500
+
+
+class SimStop(BaseException):
+    """Raised from time.sleep() once the world reaches stop_at_ns. BaseException, like
+    KeyboardInterrupt, so the scripts' own `except Exception` handlers don't swallow it."""
+
+
+class SimWorld:
+    def __init__(self):
+        self.now_ns = 0
+        self.stop_at_ns = None
+        self.pins = {}          # Pin -> claiming shim object
+        self.i2c_devices = {}   # 7-bit address -> sim device
+        self.uart_rx = {}       # rx Pin -> bytearray FIFO
+        self.models = []        # objects with step(world, dt_ns)
+        self.model_bus_time = True
+        self.i2c_bytes = 0
+
+    # === Time ===
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def monotonic(self):
+        return self.now_ns / 1_000_000_000
+
+    def sleep(self, seconds):
+        self.advance(int(seconds * 1_000_000_000))
+
+    def advance(self, dt_ns):
+        end = self.now_ns + max(0, dt_ns)
+        while self.now_ns < end:
+            step = min(STEP_NS, end - self.now_ns)
+            self.now_ns += step
+            for model in self.models:
+                model.step(self, step)
+        if self.stop_at_ns is not None and self.now_ns >= self.stop_at_ns:
+            raise SimStop()
+
+    def charge_i2c(self, nbytes):
+        """Bus transfers take time: move the clock without stepping the models twice."""
+        self.i2c_bytes += nbytes
+        if self.model_bus_time:
+            self.advance(nbytes * _I2C_NS_PER_BYTE)
+
+    # === Pins ===
+    def claim(self, pin, obj):
+        if pin in self.pins:
+            raise ValueError(f"{pin} in use")
+        self.pins[pin] = obj
+
+    def release(self, pin):
+        self.pins.pop(pin, None)
+
+    def pin_obj(self, pin):
+        return self.pins.get(pin)
+
+    # === Peripherals ===
+    def add_model(self, model):
+        self.models.append(model)
+        return model
+
+    def add_i2c_device(self, addr, device):
+        self.i2c_devices[addr] = device
+        return device
+
+    def uart_fifo(self, rx_pin):
+        fifo = self.uart_rx.get(rx_pin)
+        if fifo is None:
+            fifo = bytearray()
+            self.uart_rx[rx_pin] = fifo
+        return fifo
+
+
+WORLD = SimWorld()
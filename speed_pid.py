@@ -0,0 +1,225 @@
+# /speed_pid.py
+# Fixed-point per-wheel speed PID for the drive loop
+# Author: savant42
+#
+# Speeds are integer pulses/sec x10 (pps_x10), outputs are 16-bit PWM duty.
+# Gains are given in friendly units at setup (% duty per pps, per pps*s, per
+# pps/s), folded with the loop period into Q8 integers once, so update() is
+# integer multiply/add/shift only: no floats, nothing allocated per tick.
+#
+#   out = ff(target) + (Kp*e + I - Kd*d(meas)/dt) >> Q
+#
+# - feedforward: ff(target_pps_x10) -> duty, from the duty->speed model
+# - derivative on measurement (no kick on setpoint steps), lightly IIR-filtered
+# - anti-windup: the integrator only moves when it would not push an already
+#   saturated output further, and is clamped to one full duty range
+# - bumpless transfer: track() keeps the integrator aligned with whatever duty
+#   open loop is writing, so switching to closed loop starts from that duty
+#
+#   pid = SpeedController(estimator, dt_ms=20)
+#   motor task:  pid.set_targets(mixer); write pid.left_duty / pid.right_duty
+#   speed task:  estimator.update(); pid.update()
+#
+# With a measured duty->speed table (duty_speed.py) each wheel's ff switches
+# to that table's forward or reverse curve when its command changes sign.
+
+from drive_mixer import DUTY_MAX, FULL
+
+Q = 8
+I_LIMIT = DUTY_MAX << Q
+# % duty per pps -> (duty << Q) per pps_x10
+_GAIN_SCALE = DUTY_MAX / 100 / 10 * (1 << Q)
+
+
+def linear_feedforward(min_duty_pct, max_pps):
+    """Straight-line duty->speed model: min_duty_pct at (just above) zero, 100% at max_pps."""
+    lo = int(min_duty_pct * DUTY_MAX / 100)
+    span = DUTY_MAX - lo
+    full = int(max_pps * 10)
+
+    def ff(pps_x10):
+        if pps_x10 <= 0:
+            return 0
+        if pps_x10 >= full:
+            return DUTY_MAX
+        return lo + span * pps_x10 // full
+    return ff
+
+
+class WheelPid:
+    __slots__ = ("kp_q", "ki_q", "kd_q", "d_shift", "ff",
+                 "i_acc", "prev_meas", "d_filt", "duty", "err")
+
+    def __init__(self, kp, ki, kd, dt_ms, ff=None, d_shift=2):
+        self.ff = ff
+        self.d_shift = d_shift  # derivative IIR: d += (raw - d) >> d_shift
+        self.set_gains(kp, ki, kd, dt_ms)
+        self.reset()
+
+    def set_gains(self, kp, ki, kd, dt_ms):
+        """kp: % duty per pps; ki: % per pps*s; kd: % per pps/s. Setup time only (floats)."""
+        self.kp_q = int(kp * _GAIN_SCALE)
+        self.ki_q = int(ki * dt_ms / 1000 * _GAIN_SCALE)
+        self.kd_q = int(kd * 1000 / dt_ms * _GAIN_SCALE)
+
+    def reset(self, meas=0):
+        self.i_acc = 0
+        self.prev_meas = meas
+        self.d_filt = 0
+        self.duty = 0
+        self.err = 0
+
+    def _ff(self, target):
+        ff = self.ff
+        return ff(target) if ff is not None else 0
+
+    def update(self, target, meas):
+        """One fixed-rate step. target/meas in pps_x10 (magnitudes). Returns duty."""
+        if target <= 0:
+            self.reset(meas)
+            return 0
+        err = target - meas
+        self.err = err
+        self.d_filt += ((meas - self.prev_meas) - self.d_filt) >> self.d_shift
+        self.prev_meas = meas
+        base = self._ff(target)
+        pd = self.kp_q * err - self.kd_q * self.d_filt
+        out = base + ((pd + self.i_acc) >> Q)
+        # Conditional integration: hold I while saturated in the direction of err
+        if (err > 0 and out < DUTY_MAX) or (err < 0 and out > 0):
+            i = self.i_acc + self.ki_q * err
+            if i > I_LIMIT:
+                i = I_LIMIT
+            elif i < -I_LIMIT:
+                i = -I_LIMIT
+            self.i_acc = i
+            out = base + ((pd + i) >> Q)
+        if out > DUTY_MAX:
+            out = DUTY_MAX
+        elif out < 0:
+            out = 0
+        self.duty = out
+        return out
+
+    def track(self, duty, target, meas):
+        """Open loop is writing `duty`: preload I so the next update() continues from it."""
+        if target <= 0:
+            self.reset(meas)
+            return
+        i = ((duty - self._ff(target)) << Q) - self.kp_q * (target - meas)
+        if i > I_LIMIT:
+            i = I_LIMIT
+        elif i < -I_LIMIT:
+            i = -I_LIMIT
+        self.i_acc = i
+        self.prev_meas = meas
+        self.d_filt = 0
+        self.duty = duty
+
+
+class SpeedController:
+    """Both wheels: mixer commands -> speed targets -> per-wheel PID duty."""
+
+    def __init__(self, estimator=None, dt_ms=20, kp=0.1, ki=0.5, kd=0.0, max_pps=600,
+                 ff=None, ff_right=None):
+        self.estimator = estimator
+        self.max_x10 = int(max_pps * 10)
+        self.left = WheelPid(kp, ki, kd, dt_ms, ff)
+        self.right = WheelPid(kp, ki, kd, dt_ms, ff_right or ff)
+        self._left_ff = None    # (forward, reverse) ff per wheel, see use_feedforward()
+        self._right_ff = None
+        self.left_target = 0    # pps_x10
+        self.right_target = 0
+        self._left_sign = 0
+        self._right_sign = 0
+        self.left_duty = 0
+        self.right_duty = 0
+        self.closed = False
+        self.enabled = True  # config switch; closed loop also needs an estimator
+        self.updates = 0
+
+    def _target(self, cmd):
+        return (cmd if cmd >= 0 else -cmd) * self.max_x10 // FULL
+
+    def set_targets(self, mixer):
+        """Takes the mixer's signed commands; a direction reversal restarts that wheel's loop."""
+        left = mixer.left_cmd
+        right = mixer.right_cmd
+        sign = (left > 0) - (left < 0)
+        if sign != self._left_sign:
+            self._left_sign = sign
+            if sign and self._left_ff is not None:
+                self.left.ff = self._left_ff[sign < 0]
+            self.left.reset(self._meas(0))
+        sign = (right > 0) - (right < 0)
+        if sign != self._right_sign:
+            self._right_sign = sign
+            if sign and self._right_ff is not None:
+                self.right.ff = self._right_ff[sign < 0]
+            self.right.reset(self._meas(1))
+        self.left_target = self._target(left)
+        self.right_target = self._target(right)
+        if not self.left_target:
+            self.left_duty = 0
+        if not self.right_target:
+            self.right_duty = 0
+
+    def use_feedforward(self, left, right):
+        """Per-direction ff: left/right are (forward, reverse) pairs, e.g. MotorController.ff_fns()."""
+        self._left_ff = left
+        self._right_ff = right
+        self.left.ff = left[0]
+        self.right.ff = right[0]
+
+    def _meas(self, wheel):
+        est = self.estimator
+        return est.pps_x10(wheel) if est is not None else 0
+
+    def update(self):
+        """Fixed-rate PID step; call right after estimator.update()."""
+        if not self.closed:
+            return
+        self.left_duty = self.left.update(self.left_target, self._meas(0))
+        self.right_duty = self.right.update(self.right_target, self._meas(1))
+        self.updates += 1
+
+    def track(self, left_duty, right_duty):
+        """Open loop: follow the duties actually written so a switch to closed is bumpless."""
+        self.left.track(left_duty, self.left_target, self._meas(0))
+        self.right.track(right_duty, self.right_target, self._meas(1))
+        self.left_duty = left_duty
+        self.right_duty = right_duty
+
+    def stop(self):
+        """Motors stopped or braked: zero targets and restart both loops on the next command."""
+        self.left_target = self.right_target = 0
+        self._left_sign = self._right_sign = 0
+        self.left_duty = self.right_duty = 0
+        self.left.reset(self._meas(0))
+        self.right.reset(self._meas(1))
+
+    def set_closed(self, on):
+        self.closed = bool(on and self.enabled and self.estimator is not None)
+        return self.closed
+
+    def attach(self, estimator):
+        """Speed inputs came up (late boot stage): start closing the loop from the current duty."""
+        self.estimator = estimator
+        return self.set_closed(True)
+
+    def stats_line(self):
+        return (f"pid {'closed' if self.closed else 'open'} L {self.left_target}/{self._meas(0)} "
+                f"d={self.left_duty} R {self.right_target}/{self._meas(1)} d={self.right_duty}")
+
+
+def from_config(estimator=None, dt_ms=None, motors=None):
+    """motors: (left, right) MotorControllers; their measured tables replace the linear ff."""
+    from config import SPEED_CLOSED_LOOP, SPEED_MAX_PPS, SPEED_PID, SPEED_FF_MIN_DUTY, TASK_PERIODS_MS
+    ff = linear_feedforward(SPEED_FF_MIN_DUTY, SPEED_MAX_PPS)
+    pid = SpeedController(estimator, dt_ms or TASK_PERIODS_MS['speed'], SPEED_PID['Kp'],
+                          SPEED_PID['Ki'], SPEED_PID['Kd'], SPEED_MAX_PPS, ff)
+    if motors is not None:
+        pid.use_feedforward(motors[0].ff_fns(ff), motors[1].ff_fns(ff))
+    pid.enabled = SPEED_CLOSED_LOOP
+    pid.set_closed(True)
+    return pid
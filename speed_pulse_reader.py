@@ -3,55 +3,192 @@ speed_pulse_reader.py
 
 Speed Pulse Reader Module for Robot Control System
 
-This module reads the speed pulse signals (one per motor) using pulseio.
-Pin mappings are loaded exclusively from robot_config.txt.
-It uses pulseio.PulseIn to measure pulse durations, which later can be used for
-closed-loop (PID) control.
+Continuously estimates wheel RPM from the ZS-X11H speed pulse outputs without
+blocking. A pin takes one capture peripheral at a time, so each wheel runs in
+one of two modes and update() switches between them with hysteresis:
+
+- counting: a countio.Counter counts every edge in hardware, with no buffer to
+  fill or drain. update() reads the count delta into a fixed-size moving
+  window and rpm() is edges in window / window time.
+- period timing: at low speed a window holds too few edges to count, so the
+  wheel is on a pulseio.PulseIn instead and rpm() is 1/T of the last full
+  pulse. A PulseIn buffer that fills between updates (overflow) also switches
+  the wheel to counting.
+
+Pin mappings and PULSES_PER_REV come from config.MOTOR_CONFIG.
 """
 
-import board
-import pulseio
 import time
-from config_loader import load_config
-
-# Load configuration parameters
-config = load_config("robot_config.txt")
-
-# Verify required configuration keys exist
-required_keys = ["SPEED_PULSE_LEFT_PIN", "SPEED_PULSE_RIGHT_PIN"]
-for key in required_keys:
-    if key not in config:
-        raise RuntimeError("Missing required config entry: {}".format(key))
-
-# Retrieve pin names from config (no defaults)
-LEFT_PULSE_PIN_NAME = config["SPEED_PULSE_LEFT_PIN"]
-RIGHT_PULSE_PIN_NAME = config["SPEED_PULSE_RIGHT_PIN"]
-
-# Initialize pulse input objects (maxlen can be adjusted as needed)
-left_pulse_input = pulseio.PulseIn(getattr(board, LEFT_PULSE_PIN_NAME), maxlen=10, idle_state=True)
-right_pulse_input = pulseio.PulseIn(getattr(board, RIGHT_PULSE_PIN_NAME), maxlen=10, idle_state=True)
-
-def read_speed_pulse(pulse_input):
-    """
-    Reads pulse durations from a pulseio.PulseIn object.
-    
-    :param pulse_input: A pulseio.PulseIn instance.
-    :return: The duration (in microseconds) of the first pulse, or None if no pulse is available.
-    """
-    pulse_input.clear()
-    pulse_input.resume()
-    time.sleep(0.05)  # Allow some time to accumulate pulse data
-    if len(pulse_input) > 0:
-        return pulse_input[0]
-    return None
+from array import array
 
-if __name__ == "__main__":
-    print("Speed Pulse Reader Test: Monitoring left and right pulse durations.")
+WINDOW_SLOTS = 8         # update() calls kept in the moving window
+MIN_COUNT_EDGES = 6      # below this many edges in the window, fall back to 1/T
+COUNT_ABOVE_EDGES = 16   # at this many edges in the window, switch the wheel to countio
+STALL_TIMEOUT_US = 500_000  # no edge for this long means the wheel is stopped
+PULSEIN_MAXLEN = 64
+
+
+class WheelSpeedEstimator:
+    def __init__(self, pins, pulses_per_rev, window=WINDOW_SLOTS, maxlen=PULSEIN_MAXLEN):
+        self.count = len(pins)
+        self.window = window
+        self.pins = list(pins)
+        self.ppr = array("H", pulses_per_rev)
+        self._maxlen = maxlen
+        # Every wheel starts (and restarts from a stop) on PulseIn: 1/T at low speed
+        self.counting = bytearray(self.count)
+        self.inputs = [self._pulse_in(pin) for pin in pins]
+        self._count0 = [0] * self.count
+
+        n = self.count * window
+        self._win_edges = array("H", [0] * n)
+        self._win_us = array("L", [0] * n)
+        self._edge_sum = array("L", [0] * self.count)
+        self._us_sum = array("L", [0] * self.count)
+        self._slot = 0
+
+        self._prev_half_us = array("L", [0] * self.count)
+        self.period_us = array("L", [0] * self.count)   # last full pulse period
+        self._since_edge_us = array("L", [0] * self.count)
+        self.overflows = array("H", [0] * self.count)
+        self.switches = array("H", [0] * self.count)  # Counter <-> PulseIn changes
+        self.edges = array("L", [0] * self.count)  # running edge total (2 per pulse)
+        self._last_ns = None
+
+    def _pulse_in(self, pin):
+        import pulseio
+        return pulseio.PulseIn(pin, maxlen=self._maxlen, idle_state=True)
+
+    def _counter(self, pin):
+        import countio
+        return countio.Counter(pin, edge=countio.Edge.RISE_AND_FALL)
+
+    def _switch(self, w, counting):
+        """Moves wheel w's pin to the other peripheral. The window is in edges either
+        way, so it carries over; going back to 1/T, the period starts from the window's
+        average until PulseIn has seen a full pulse."""
+        self.inputs[w].deinit()
+        if counting:
+            self.inputs[w] = self._counter(self.pins[w])
+            self._count0[w] = 0
+        else:
+            self.inputs[w] = self._pulse_in(self.pins[w])
+            if self._edge_sum[w]:
+                self.period_us[w] = 2 * self._us_sum[w] // self._edge_sum[w]
+            self._prev_half_us[w] = 0
+        self.counting[w] = counting
+        self.switches[w] += 1
+
+    def _drain(self, w):
+        """Edges captured on wheel w since the last update."""
+        p = self.inputs[w]
+        if self.counting[w]:
+            count = p.count
+            n = count - self._count0[w]
+            self._count0[w] = count
+            return n
+        n = len(p)
+        if n >= self._maxlen:
+            self.overflows[w] += 1
+        prev = self._prev_half_us[w]
+        for _ in range(n):
+            half = p.popleft()
+            if prev:
+                self.period_us[w] = prev + half
+            prev = half
+        self._prev_half_us[w] = prev
+        return n
+
+    def update(self):
+        """Drains captured edges from every wheel into the window. Never blocks."""
+        now = time.monotonic_ns()
+        if self._last_ns is None:
+            self._last_ns = now
+            for p in self.inputs:
+                p.clear()
+            return
+        dt_us = (now - self._last_ns) // 1000
+        self._last_ns = now
+        slot = self._slot
+        for w in range(self.count):
+            n = self._drain(w)
+            if n:
+                self.edges[w] += n
+                self._since_edge_us[w] = 0
+            elif self._since_edge_us[w] < STALL_TIMEOUT_US:
+                self._since_edge_us[w] += dt_us
+
+            i = w * self.window + slot
+            self._edge_sum[w] += n - self._win_edges[i]
+            self._us_sum[w] += dt_us - self._win_us[i]
+            self._win_edges[i] = n
+            self._win_us[i] = dt_us
+
+            if self.counting[w]:
+                if self._edge_sum[w] < MIN_COUNT_EDGES:
+                    self._switch(w, False)
+            elif self._edge_sum[w] >= COUNT_ABOVE_EDGES or n >= self._maxlen:
+                self._switch(w, True)
+        self._slot = (slot + 1) % self.window
+
+    def pulses_per_sec(self, wheel):
+        if self._since_edge_us[wheel] >= STALL_TIMEOUT_US:
+            return 0.0
+        edges = self._edge_sum[wheel]
+        if edges >= MIN_COUNT_EDGES and self._us_sum[wheel]:
+            # Two edges (one PulseIn entry per high or low phase) per pulse
+            return edges * 500_000 / self._us_sum[wheel]
+        period = self.period_us[wheel]
+        if period:
+            return 1_000_000 / period
+        return 0.0
+
+    def pps_x10(self, wheel):
+        """pulses_per_sec() as an integer x10, for fixed-point control loops (no float)."""
+        if self._since_edge_us[wheel] >= STALL_TIMEOUT_US:
+            return 0
+        edges = self._edge_sum[wheel]
+        us10 = self._us_sum[wheel] // 10
+        if edges >= MIN_COUNT_EDGES and us10:
+            return edges * 500_000 // us10
+        period = self.period_us[wheel]
+        if period:
+            return 10_000_000 // period
+        return 0
+
+    def rpm(self, wheel):
+        return self.pulses_per_sec(wheel) * 60 / self.ppr[wheel]
+
+    def deinit(self):
+        for p in self.inputs:
+            p.deinit()
+
+
+def from_config(names=("LEFT", "RIGHT")):
+    """Builds an estimator for the named wheels in config.MOTOR_CONFIG."""
+    from config import MOTOR_CONFIG
+    devices = [MOTOR_CONFIG[name] for name in names]
+    return WheelSpeedEstimator(
+        [d['PULSE'] for d in devices],
+        [d.get('PULSES_PER_REV', 90) for d in devices],
+    )
+
+
+def main():
+    print("Speed Pulse Reader Test: Monitoring left and right RPM.")
+    estimator = from_config()
+    last_print = time.monotonic()
     try:
         while True:
-            left_duration = read_speed_pulse(left_pulse_input)
-            right_duration = read_speed_pulse(right_pulse_input)
-            print("Left Pulse: {}, Right Pulse: {}".format(left_duration, right_duration))
-            time.sleep(0.5)
+            estimator.update()
+            if time.monotonic() - last_print >= 0.5:
+                last_print = time.monotonic()
+                print("Left RPM: {:.1f}, Right RPM: {:.1f}".format(estimator.rpm(0), estimator.rpm(1)))
+            time.sleep(0.02)
     except KeyboardInterrupt:
+        estimator.deinit()
         print("Exiting Speed Pulse Reader Test.")
+
+
+if __name__ == "__main__":
+    main()
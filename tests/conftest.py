@@ -0,0 +1,15 @@
+# tests/conftest.py
+# Host tests import the board modules straight from the repo root
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def shims():
+    """Desktop stand-ins for board/displayio/... on sys.path; real time stays real."""
+    import sim
+    return sim.install(virtual_time=False)
@@ -0,0 +1,41 @@
+# tests/test_analysis.py
+# Traces that never drive the wheels still analyze; one bad file doesn't escape analyze_file
+import numpy as np
+
+from analysis.batch import analyze_file, analyze_trace
+from analysis.wheels import duty_speed_curve, stall_duty
+
+
+def _parked(n=500):
+    zeros = np.zeros(n)
+    ch = np.full((n, 14), 1500, dtype=np.uint16)
+    return {"t": np.arange(n) * 0.007, "ch": ch, "throttle": zeros,
+            "left_duty": zeros, "right_duty": zeros, "left_pps": zeros, "right_pps": zeros}
+
+
+def test_curve_empty_when_never_driven():
+    curve = duty_speed_curve(np.zeros(200), np.zeros(200))
+    assert len(curve) == 0 and "pps_median" in curve.dtype.names
+    assert stall_duty(curve) is None
+
+
+def test_curve_bins_steady_duty():
+    duty = np.repeat([0.0, 0.3, 0.6], 100)
+    pps = np.repeat([0.0, 150.0, 400.0], 100)
+    curve = duty_speed_curve(duty, pps, bins=10, hold_samples=10)
+    assert list(curve["pps_median"]) == [150.0, 400.0]
+    assert list(curve["n"]) == [90, 90]
+
+
+def test_parked_trace_analyzes():
+    result = analyze_trace(_parked())
+    assert result["left"]["curve"] == [] and result["left"]["stall_duty"] is None
+
+
+def test_analyze_file_reports_failures(tmp_path):
+    trace = _parked()
+    trace["ch"] = trace["ch"][:, :2]  # too few channels for the stick column
+    path = str(tmp_path / "bad.npz")
+    np.savez(path, **trace)
+    result = analyze_file(path)
+    assert result["path"] == path and "error" in result
@@ -0,0 +1,89 @@
+# tests/test_arming.py
+# Failsafe zeroes the output; arming needs CH8 and a low throttle; one CH5 brake rule
+from arming import ArmingGate, EV_ARMED, EV_DISARMED, EV_FAILSAFE, EV_FAILSAFE_CLEAR
+from drive_mixer import DriveMixer
+from ibus_receiver import FAILSAFE_CH4_VALUE
+
+IDLE = [1500, 1500, 1000, 1500, 1500, 1000, 1000, 2000] + [1500] * 6
+
+
+def _armed_gate():
+    gate = ArmingGate(DriveMixer(), warmup=1, ghost_repeat=2)
+    events = 0
+    for _ in range(4):
+        events |= gate.update(IDLE)
+    assert events & EV_ARMED
+    return gate
+
+
+def test_failsafe_writes_zero_duty():
+    gate = _armed_gate()
+    drive = list(IDLE)
+    drive[1], drive[2] = 2000, 1800
+    gate.update(drive)
+    assert gate.write and gate.mixer.left_duty > 0
+
+    drive[3] = FAILSAFE_CH4_VALUE
+    assert gate.update(drive) & EV_FAILSAFE
+    assert gate.write and gate.duty_pct == 0
+    assert gate.mixer.left_duty == 0 and gate.mixer.right_duty == 0
+    gate.update(drive)
+    assert gate.write and gate.mixer.left_duty == 0
+
+    drive[3] = 1500
+    assert gate.update(drive) & EV_FAILSAFE_CLEAR
+    assert gate.write and gate.mixer.left_duty > 0
+
+
+def test_failsafe_frames_do_not_arm():
+    gate = ArmingGate(DriveMixer(), warmup=1, ghost_repeat=2)
+    fs = list(IDLE)
+    fs[3] = FAILSAFE_CH4_VALUE
+    for _ in range(5):
+        assert not gate.update(fs) & EV_ARMED
+        assert not gate.armed
+
+
+def test_brake_rule_matches_intent():
+    from intent_mapper import IntentMapper
+    gate = _armed_gate()
+    mapper = IntentMapper()
+    for ch5, on in ((2000, True), (1500, False), (1000, False), (1600, True)):
+        frame = list(IDLE)
+        frame[4] = ch5
+        gate.update(frame)
+        mapper.update(frame)
+        assert gate.brakes is on and mapper.intent.brake is on
+
+
+def test_throttle_high_does_not_arm():
+    gate = ArmingGate(DriveMixer(), warmup=1, ghost_repeat=2)
+    frame = list(IDLE)
+    frame[2] = 1800
+    for _ in range(10):
+        assert not gate.update(frame) & EV_ARMED
+    assert not gate.armed and gate.mixer.left_duty == 0
+
+
+def test_arm_switch_off_disarms_and_zeroes():
+    gate = _armed_gate()
+    drive = list(IDLE)
+    drive[1], drive[2] = 2000, 1800
+    gate.update(drive)
+    assert gate.mixer.left_duty > 0
+    drive[7] = 1000
+    assert gate.update(drive) & EV_DISARMED
+    assert not gate.armed and gate.write and gate.mixer.left_duty == 0
+    drive[7] = 2000  # switch back on with the throttle still up: stays disarmed
+    for _ in range(5):
+        gate.update(drive)
+    assert not gate.armed and gate.mixer.left_duty == 0
+
+
+def test_reset_zeroes_the_mixer():
+    gate = _armed_gate()
+    drive = list(IDLE)
+    drive[1], drive[2] = 2000, 1800
+    gate.update(drive)
+    gate.reset()
+    assert gate.mixer.left_duty == 0 and gate.mixer.right_duty == 0 and not gate.armed
@@ -0,0 +1,34 @@
+# tests/test_bench_control_path.py
+# The fast path is robot-main's: armed gate, mixer, PID targets, write/crawl
+from tools import bench_control_path as bench
+
+
+def test_fast_path_drives_like_robot_main():
+    pipe = bench.Pipeline()
+    try:
+        assert pipe.gate.armed
+        driven = 0
+        for frame in bench.synthetic_stream(400):
+            if pipe.decode(frame):
+                pipe.map()
+                pipe.mix()
+                pipe.pwm()
+                driven += pipe.left.pwm.duty_cycle > 0
+        assert driven > 300
+        # CH3 at the bottom of the stick is no power, whatever intent.throttle says
+        stick_down = bench.encode_frame([1500, 2000, 1000, 1500, 1000, 1000, 1000, 2000] + [1500] * 6)
+        for _ in range(3):
+            pipe.decode(bytes(stick_down))
+            pipe.map()
+            pipe.mix()
+            pipe.pwm()
+        assert pipe.intent.throttle == 100
+        assert pipe.mixer.left_duty == 0 and pipe.left.pwm.duty_cycle == 0
+    finally:
+        pipe.close()
+
+
+def test_run_reports_every_stage():
+    result = bench.run(bench.synthetic_stream(300))
+    assert result["frames_decoded"] == 300
+    assert set(result["time_us"]) == set(bench.STAGES) | {"total"}
@@ -0,0 +1,80 @@
+# tests/test_bitmap_text.py
+# Cells are only redrawn when they change; numbers are laid out without building strings
+import pytest
+
+
+@pytest.fixture
+def text(shims):
+    from bitmap_text import BitmapText
+    return BitmapText()  # terminalio.FONT: 6x12 cells, 21 x 10 on the 128x128 panel
+
+
+def _row(text, row):
+    return bytes(text._cells[row * text.cols:(row + 1) * text.cols]).decode()
+
+
+def _cell_pixels(text, row, col):
+    x0, y0 = col * text.cell_w, row * text.cell_h
+    return [[text.bitmap[x0 + x, y0 + y] for x in range(text.cell_w)] for y in range(text.cell_h)]
+
+
+def test_grid_from_the_font(text):
+    assert (text.cell_w, text.cell_h, text.cols, text.rows) == (6, 12, 21, 10)
+
+
+def test_only_changed_cells_are_drawn(text):
+    assert text.write(0, 0, "THR 42%") == 6  # the space is already blank
+    assert text.dirty and text.cells_drawn == 6
+    text.dirty = False
+    assert text.write(0, 0, "THR 42%") == 0 and not text.dirty
+    assert text.write(0, 0, "THR 43%") == 1 and text.cells_drawn == 7
+
+
+def test_glyph_pixels_land_in_the_cell(text):
+    import terminalio
+    font = terminalio.FONT
+    text.write(2, 3, "Q")
+    glyph = font.get_glyph(ord("Q"))
+    sx = glyph.tile_index * glyph.width
+    expected = [[font.bitmap[sx + x, y] for x in range(6)] for y in range(12)]
+    assert _cell_pixels(text, 2, 3) == expected
+    text.write(2, 3, " ")
+    assert not any(any(r) for r in _cell_pixels(text, 2, 3))
+
+
+def test_write_clips_to_the_row(text):
+    assert text.write(1, 19, "abcd") == 2
+    assert _row(text, 1).endswith("ab") and _row(text, 2).strip() == ""
+    assert text.write(10, 0, "off the panel") == 0
+
+
+def test_write_line_blanks_the_rest(text):
+    text.write_line(0, "MODE DRIVE")
+    assert text.write_line(0, "MODE DEV") == 4  # E V over R I, then two blanks
+    assert _row(text, 0).rstrip() == "MODE DEV"
+
+
+@pytest.mark.parametrize("value, width, shown", [(42, 4, "  42"), (-7, 4, "  -7"), (0, 3, "  0"),
+                                                 (12345, 3, "345")])
+def test_write_number(text, value, width, shown):
+    text.write_number(0, 0, value, width)
+    assert _row(text, 0)[:width] == shown
+
+
+@pytest.mark.parametrize("value, width, decimals, shown", [(1234, 6, 2, " 12.34"), (5, 5, 2, " 0.05"),
+                                                           (-98, 5, 1, " -9.8"), (7, 3, 0, "  7")])
+def test_write_fixed(text, value, width, decimals, shown):
+    text.write_fixed(0, 0, value, width, decimals)
+    assert _row(text, 0)[:width] == shown
+
+
+def test_number_update_touches_only_the_changed_digit(text):
+    text.write_number(3, 4, 120, 4)
+    assert text.write_number(3, 4, 121, 4) == 1
+
+
+def test_clear(text):
+    text.write(0, 0, "abc")
+    text.write(9, 18, "xyz")
+    assert text.clear() is None and text.cells_drawn == 12
+    assert all(c == 32 for c in text._cells) and not any(text.bitmap._data)
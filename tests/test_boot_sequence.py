@@ -0,0 +1,138 @@
+# tests/test_boot_sequence.py
+# Motors safe before config loads, boot-held pins reused, entry imported and main() called
+import ast
+import os
+import sys
+import types
+
+import pytest
+
+import boot_sequence
+
+_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_SCRIPTS = ("robot-main.py", "ibusting-oled.py", "logger_mode.py", "main_robot.py",
+                 "zsx11h_test_harness.py", "zsx11h_pid_integration.py", "gps.py",
+                 "ibus_receiver.py", "speed_pulse_reader.py")
+
+
+def _release():
+    for io in boot_sequence._held.values():
+        io.deinit()
+    boot_sequence._held.clear()
+
+
+@pytest.fixture
+def board(shims):
+    _release()
+    import board
+    yield board
+    _release()
+
+
+def _pins(board, names):
+    return [boot_sequence._held[getattr(board, n)].value for n in names]
+
+
+def test_default_pins_safe_before_config_is_imported(board, monkeypatch):
+    seen = {}
+    from config import MOTOR_CONFIG
+
+    def lookup(name):
+        if name != "MOTOR_CONFIG":
+            raise AttributeError(name)
+        seen["pins"] = _pins(board, ("D10", "D6", "D17", "D15"))
+        return MOTOR_CONFIG
+
+    fake = types.ModuleType("config")
+    fake.__getattr__ = lookup
+    monkeypatch.setitem(sys.modules, "config", fake)
+    boot_sequence.safe_motors()
+    assert seen["pins"] == [False, True, False, True]  # STOP low, BRAKE high
+
+
+def test_remapped_pins_held_and_defaults_released(board):
+    config = {'LEFT': {'STOP': board.D5, 'BRAKE': board.D6},
+              'RIGHT': {'STOP': board.D18, 'BRAKE': board.D15}}
+    boot_sequence.safe_motors(config)
+    assert _pins(board, ("D5", "D6", "D18", "D15")) == [False, True, False, True]
+    assert board.D10 not in boot_sequence._held and board.D17 not in boot_sequence._held
+    import digitalio
+    digitalio.DigitalInOut(board.D10).deinit()  # released, so free to claim
+
+
+def test_take_reuses_the_held_pin(board):
+    boot_sequence.safe_motors()
+    held = boot_sequence._held[board.D10]
+    assert boot_sequence.take(board.D10, True) is held and held.value
+    held.deinit()
+    again = boot_sequence.take(board.D10, False)
+    assert again is not held and again.value is False
+
+
+def test_safe_motors_is_idempotent(board):
+    boot_sequence.safe_motors()
+    stop = boot_sequence.take(board.D10, True)
+    boot_sequence.safe_motors()
+    assert boot_sequence._held[board.D10] is stop and stop.value is False
+
+
+@pytest.mark.parametrize("path, name", [("/robot-main.py", "robot-main"),
+                                        ("tools/bench_control_path.py", "tools.bench_control_path"),
+                                        ("/logger_mode.mpy", "logger_mode")])
+def test_entry_module(path, name):
+    assert boot_sequence.entry_module(path) == name
+
+
+def _entry(tmp_path, monkeypatch, name, body):
+    (tmp_path / f"{name}.py").write_text(body)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    return f"/{name}.py"
+
+
+def test_run_entry_imports_and_calls_main(board, tmp_path, monkeypatch):
+    path = _entry(tmp_path, monkeypatch, "entry_probe",
+                  "calls = []\n"
+                  "def main():\n"
+                  "    calls.append(__name__)\n"
+                  "if __name__ == '__main__':\n"
+                  "    main()\n")
+    assert boot_sequence.run_entry(path)
+    assert sys.modules["entry_probe"].calls == ["entry_probe"]  # imported, main() once
+
+
+def test_run_entry_failure_puts_motors_back_to_safe(board, tmp_path, monkeypatch):
+    boot_sequence.safe_motors()
+    path = _entry(tmp_path, monkeypatch, "entry_crash",
+                  "import boot_sequence, board\n"
+                  "def main():\n"
+                  "    boot_sequence.take(board.D10, True)\n"
+                  "    boot_sequence.take(board.D6, False)\n"
+                  "    raise RuntimeError('boom')\n")
+    assert boot_sequence.run_entry(path) is False
+    assert _pins(board, ("D10", "D6")) == [False, True]
+
+
+def test_run_entry_reports_a_missing_module(board):
+    assert boot_sequence.run_entry("/no_such_entry.py") is False
+
+
+@pytest.mark.parametrize("script", ENTRY_SCRIPTS)
+def test_entry_scripts_define_main_behind_the_guard(script):
+    with open(os.path.join(_REPO, script), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    assert any(isinstance(n, ast.FunctionDef) and n.name == "main" for n in tree.body)
+    guard = tree.body[-1]
+    assert isinstance(guard, ast.If) and ast.unparse(guard.test) == "__name__ == '__main__'"
+
+
+def test_timeline_stages():
+    timeline = boot_sequence.BootTimeline()
+    assert timeline.run("ok", lambda: 7) == 7
+    assert timeline.run("bad", lambda: 1 // 0) is None
+    timeline.mark("control")
+    assert timeline.names == ["ok", "bad", "control"]
+    assert timeline.ok == [True, False, True]
+    assert timeline.elapsed_ms("control") == timeline.start_ms[2]
+    assert timeline.elapsed_ms("missing") is None
+    assert timeline.lines()[1].startswith("❌")
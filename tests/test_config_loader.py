@@ -0,0 +1,99 @@
+# tests/test_config_loader.py
+# Every bad line is reported; the snapshot is only trusted while its crc matches the text
+import json
+import sys
+import types
+
+import pytest
+
+import config_loader
+from config_loader import ConfigError, load_config, parse
+
+PINS = ("D6", "D9", "D10", "D12", "D13", "D14", "D15", "D16", "D17", "D19")
+BOARD = types.SimpleNamespace(**{name: "pin:" + name for name in PINS})
+
+GOOD = """\
+MOTOR_LEFT_PWM_PIN = D13
+SPEED_PULSE_LEFT_PIN = D12
+MANUAL_STOP_LEFT_PIN = D10
+MOTOR_LEFT_DIR_PIN = D9
+MOTOR_LEFT_BRAKE_PIN = D6
+MOTOR_RIGHT_PWM_PIN = D19
+SPEED_PULSE_RIGHT_PIN = D14   # trailing comment
+MANUAL_STOP_RIGHT_PIN = D17
+MOTOR_RIGHT_DIR_PIN = D16
+MOTOR_RIGHT_BRAKE_PIN = D15
+DEBUG_LEVEL = 2
+"""
+
+
+def test_parse_good_text_fills_defaults():
+    values, warnings = parse(GOOD + "SOMETHING_ELSE = 1\n", BOARD)
+    assert values["SPEED_PULSE_RIGHT_PIN"] == "D14"
+    assert values["DEBUG_LEVEL"] == 2 and values["PULSES_PER_REV_LEFT"] == 90
+    assert warnings == ["line 12: unknown key SOMETHING_ELSE"]
+
+
+def test_parse_reports_every_bad_line():
+    text = GOOD.replace("MOTOR_RIGHT_BRAKE_PIN = D15", "MOTOR_RIGHT_BRAKE_PIN = D13")
+    text = text.replace("MOTOR_LEFT_DIR_PIN = D9\n", "")
+    text += "not a setting\nDEBUG_LEVEL = 3\nDEBUG = yes\nTARGET_PWM_FREQUENCY = 50\nPULSES_PER_REV_LEFT = x\n"
+    text += "MOTOR_RIGHT_DIR_PIN = \nSPEED_PULSE_LEFT_PIN = D99\n"
+    with pytest.raises(ConfigError) as e:
+        parse(text, BOARD)
+    msg = str(e.value)
+    for part in ("line 11: expected KEY = VALUE", "line 12: DEBUG_LEVEL set twice",
+                 "DEBUG: expected True or False", "TARGET_PWM_FREQUENCY: 50 outside 100..40000",
+                 "PULSES_PER_REV_LEFT: expected int", "line 16: expected KEY = VALUE",
+                 "SPEED_PULSE_LEFT_PIN set twice", "MOTOR_LEFT_DIR_PIN missing",
+                 "MOTOR_RIGHT_BRAKE_PIN: D13 already used by MOTOR_LEFT_PWM_PIN"):
+        assert part in msg
+
+
+def test_unknown_board_pin():
+    with pytest.raises(ConfigError, match="board has no pin D13"):
+        parse(GOOD, types.SimpleNamespace(**{n: n for n in PINS if n != "D13"}))
+
+
+@pytest.fixture
+def board(monkeypatch):
+    monkeypatch.setitem(sys.modules, "board", BOARD)
+    return BOARD
+
+
+def test_snapshot_used_until_text_changes(tmp_path, board):
+    txt = tmp_path / "robot_config.txt"
+    snap = tmp_path / "robot_config.json"
+    txt.write_text(GOOD)
+    cfg = load_config(str(txt))
+    assert config_loader.source == "parsed" and cfg["MOTOR_LEFT_PWM_PIN"] == "pin:D13"
+    assert json.loads(snap.read_text())["values"]["DEBUG_LEVEL"] == 2
+
+    assert load_config(str(txt))["DEBUG_LEVEL"] == 2
+    assert config_loader.source == "snapshot"
+
+    txt.write_text(GOOD.replace("DEBUG_LEVEL = 2", "DEBUG_LEVEL = 4"))  # crc no longer matches
+    assert load_config(str(txt))["DEBUG_LEVEL"] == 4
+    assert config_loader.source == "parsed"
+    assert json.loads(snap.read_text())["values"]["DEBUG_LEVEL"] == 4
+
+
+def test_snapshot_with_wrong_crc_is_ignored(tmp_path, board):
+    txt = tmp_path / "robot_config.txt"
+    snap = tmp_path / "robot_config.json"
+    txt.write_text(GOOD)
+    load_config(str(txt))
+    data = json.loads(snap.read_text())
+    data["crc"] ^= 1
+    data["values"]["DEBUG_LEVEL"] = 1
+    snap.write_text(json.dumps(data))
+    assert load_config(str(txt))["DEBUG_LEVEL"] == 2
+    assert config_loader.source == "parsed"
+
+
+def test_bad_text_raises_even_with_snapshot_off(tmp_path, board):
+    txt = tmp_path / "robot_config.txt"
+    txt.write_text(GOOD + "DEBUG_LEVEL = 9\n")
+    with pytest.raises(ConfigError, match="set twice"):
+        load_config(str(txt), use_snapshot=False)
+    assert not (tmp_path / "robot_config.json").exists()
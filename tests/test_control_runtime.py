@@ -0,0 +1,36 @@
+# tests/test_control_runtime.py
+# A long tick is charged to its own budget counter and to the slots it makes others miss
+import control_runtime
+from control_runtime import ControlRuntime
+
+MS = 1_000_000
+
+
+def test_slow_tick_counts_over_budget_and_misses(monkeypatch):
+    clock = [0]
+    monkeypatch.setattr(control_runtime.time, "monotonic_ns", lambda: clock[0])
+    rt = ControlRuntime()
+    ticks = []
+    motor = rt.add_task("motor", 10, lambda: ticks.append(clock[0]))
+    slow = [0]
+
+    def display():
+        clock[0] += slow[0]
+
+    disp = rt.add_task("display", 100, display, budget_ms=10)
+    for t in range(0, 100, 10):  # on time: motor every 10 ms, display at 0
+        clock[0] = t * MS
+        rt.step()
+    assert motor.missed == 0 and len(ticks) == 10
+    slow[0] = 35 * MS
+    clock[0] = 100 * MS
+    rt.step()                    # display blocks 35 ms after motor ran
+    clock[0] += 1
+    rt.step()                    # motor due at 110 ms starts at 135: two whole slots gone
+    assert disp.over_budget == 1 and disp.overruns == 0
+    assert motor.missed == 2 and motor.over_budget == 0
+    assert rt.missed_line() == "missed motor=2"
+    assert "overb=1/10000us" in disp.stats_line() and "overb" not in motor.stats_line()
+    assert rt.stats_lines()[-1] == "missed motor=2"
+    disp.reset_stats()
+    assert disp.over_budget == 0
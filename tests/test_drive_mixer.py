@@ -0,0 +1,72 @@
+# tests/test_drive_mixer.py
+# Integer mixer: full-scale clamps, DIR polarity per wheel, batch matches per-frame mix
+from array import array
+
+from drive_mixer import DriveMixer, DUTY_MAX, FULL
+
+
+def test_full_forward_and_reverse():
+    m = DriveMixer(left_fwd=True, right_fwd=False)
+    m.mix(1, 100, 0, 0)
+    assert (m.left_cmd, m.right_cmd) == (FULL, FULL)
+    assert (m.left_duty, m.right_duty) == (DUTY_MAX, DUTY_MAX)
+    assert (m.left_dir, m.right_dir) == (True, False)
+    m.mix(-1, 100, 0, 0)
+    assert (m.left_cmd, m.right_cmd) == (-FULL, -FULL)
+    assert (m.left_duty, m.right_duty) == (DUTY_MAX, DUTY_MAX)
+    assert (m.left_dir, m.right_dir) == (False, True)
+
+
+def test_pivot_on_full_throttle_clamps_at_full():
+    m = DriveMixer(pivot_limit=60)
+    m.mix(1, 100, 0, 100)
+    assert (m.left_cmd, m.right_cmd) == (FULL, FULL - 100 * 60)
+    m.mix(-1, 100, 0, 100)
+    assert (m.left_cmd, m.right_cmd) == (-FULL + 100 * 60, -FULL)
+
+
+def test_pivot_in_place():
+    m = DriveMixer(pivot_limit=60)
+    m.mix(0, 0, 0, -100)
+    assert (m.left_cmd, m.right_cmd) == (-6000, 6000)
+    assert m.left_duty == m.right_duty == 6000 * DUTY_MAX // FULL
+
+
+def test_veer_slows_inner_wheel():
+    m = DriveMixer(veer_limit=100)
+    m.mix(1, 100, 50, 0)
+    assert (m.left_cmd, m.right_cmd) == (FULL, FULL // 2)
+    m.mix(1, 100, -100, 0)
+    assert (m.left_cmd, m.right_cmd) == (0, FULL)
+
+
+def test_batch_matches_mix():
+    frames = [(1, 100, 0, 100), (-1, 100, 0, -100), (1, 37, -20, 5), (0, 0, 100, 100), (-1, 80, 60, 0)]
+    cols = [array("b", [f[i] for f in frames]) for i in range(4)]
+    out_l = array("i", [0] * len(frames))
+    out_r = array("i", [0] * len(frames))
+    m = DriveMixer()
+    m.mix_batch(*cols, out_l, out_r)
+    ref = DriveMixer()
+    for i, f in enumerate(frames):
+        ref.mix(*f)
+        assert (out_l[i], out_r[i]) == (ref.left_cmd, ref.right_cmd)
+        assert -FULL <= out_l[i] <= FULL and -FULL <= out_r[i] <= FULL
+
+
+def test_mix_intent_stick_down_is_zero_duty():
+    from intent_mapper import IntentMapper
+    mapper = IntentMapper()
+    m = DriveMixer()
+    m.mix_intent(mapper.intent)  # nothing mapped yet
+    assert m.left_duty == 0 and m.right_duty == 0
+    mapper.update([1500, 2000, 1000, 1500, 1000, 1000, 0] + [1500] * 7)
+    assert mapper.intent.throttle == 100  # legacy field: distance from centre
+    m.mix_intent(mapper.intent)
+    assert m.left_duty == 0 and m.right_duty == 0
+    mapper.update([1500, 2000, 2000, 1500, 1000, 1000, 0] + [1500] * 7)
+    m.mix_intent(mapper.intent)
+    assert m.left_duty == DUTY_MAX and m.right_duty == DUTY_MAX
+    mapper.update([1500, 2000, 1500, 1500, 1000, 1000, 0] + [1500] * 7)
+    m.mix_intent(mapper.intent)
+    assert m.left_cmd == FULL // 2
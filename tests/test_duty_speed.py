@@ -0,0 +1,53 @@
+# tests/test_duty_speed.py
+# Table lookup interpolates between speed bins; a wheel that never moved gets no table
+from array import array
+
+import duty_speed
+from duty_speed import DutySpeedTable, analyze, invert, table_source
+
+# Moving branch: 20% holds 50 pps, 100% gives 450 pps, linear in between
+DOWN = [(d, 0.0 if d < 20 else 50 + (d - 20) * 5.0) for d in range(100, -1, -5)]
+UP = [(d, 0.0 if d < 30 else 50 + (d - 20) * 5.0) for d in range(0, 101, 5)]
+DEAD = [(d, 0.0) for d in range(0, 101, 5)]
+
+
+def test_duty_for_interpolates_between_bins():
+    table = DutySpeedTable(1000, 10, 20, array("H", [0, 1000, 3000]))  # bins at 0, 50, 100 pps
+    assert table.duty_for(0) == 0 and table.duty_for(-20) == 0
+    assert table.duty_for(250) == 500
+    assert table.duty_for(500) == 1000
+    assert table.duty_for(750) == 2000
+    assert table.duty_for(1000) == 3000 and table.duty_for(5000) == 3000
+
+
+def test_invert_round_trips_the_measured_curve():
+    max_x10, bins = invert(DOWN)
+    assert max_x10 == 4500
+    table = DutySpeedTable(max_x10, 20, 30, bins)
+    for duty, pps in DOWN:
+        if duty >= 25:  # bins under the stall speed clamp to the stall duty, skewing the first one
+            assert abs(table.duty_for(int(pps * 10)) - duty * 655.35) <= 655.35 / 10
+
+
+def test_analyze_finds_stall_and_breakaway():
+    stall, breakaway, max_x10, _ = analyze(UP, DOWN)
+    assert (stall, breakaway, max_x10) == (20, 30, 4500)
+    assert analyze(DEAD, DEAD)[2] == 0
+
+
+def test_wheel_that_never_moved_is_not_saved():
+    warnings = []
+    src = table_source({("LEFT", True): (UP, DOWN), ("RIGHT", True): (DEAD, DEAD)}, log=warnings.append)
+    scope = {}
+    exec(src, scope)
+    assert set(scope["TABLES"]) == {("LEFT", True)}
+    assert len(warnings) == 1 and "RIGHT FWD never moved" in warnings[0]
+
+
+def test_load_refuses_a_dead_entry(monkeypatch):
+    max_x10, bins = invert(DOWN)
+    monkeypatch.setattr(duty_speed, "_tables", {("LEFT", True): (max_x10, 20, 30, bins),
+                                                ("RIGHT", True): (0, 100, 100, array("H", [0] * 33))})
+    assert duty_speed.load("LEFT", True).max_x10 == 4500
+    assert duty_speed.load("RIGHT", True) is None
+    assert duty_speed.load("LEFT", False) is None
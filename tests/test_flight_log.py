@@ -0,0 +1,82 @@
+# tests/test_flight_log.py
+# FlightRecorder writes records, tools/flight_log.py decodes them back
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from flight_recorder import FlightRecorder, FLAG_LINK, FLAG_STOPPED
+from intent_mapper import Intent
+from tools.flight_log import load, wheel_columns
+
+CHANNELS = list(range(1000, 1014))
+
+
+def _intent(throttle=80, brake=False):
+    it = Intent()
+    it.direction, it.throttle, it.veer, it.veer_amt = 1, throttle, -1, -40
+    it.pivot, it.pivot_amt, it.brake = 1, 25, brake
+    return it
+
+
+def test_flushed_records_decode(tmp_path):
+    rec = FlightRecorder(128, str(tmp_path))
+    for i in range(70):
+        rec.record(CHANNELS, _intent(brake=i % 2 == 1), i % 101, 200 * i, i % 3 == 0, 65535, False,
+                   12.3, 4.56, FLAG_LINK if i < 60 else FLAG_STOPPED, changed=i)
+    rec.mark(_intent(), code=7)
+    rec.close()
+    assert rec.path.endswith("flight_000.bin") and rec.blocks_written == 2
+
+    log = load(rec.path)
+    assert int(log.header["capacity"]) == 128 and log.lost == 0
+    control = log.control
+    assert len(control) == 70 and list(control["seq"]) == list(range(70))
+    assert list(control["throttle"]) == [i % 101 for i in range(70)]  # commanded, not intent.throttle
+    assert list(control["ch"][5]) == CHANNELS
+    row = control[3]
+    assert (int(row["direction"]), int(row["veer"]), int(row["veer_amt"]),
+            int(row["pivot"]), int(row["pivot_amt"])) == (1, -1, -40, 1, 25)
+    assert row["left_duty"] == 600 and row["right_duty"] == 65535
+    assert row["left_pps_x10"] == 123 and row["right_pps_x10"] == 45 and row["changed"] == 3
+
+    cols = wheel_columns(control)
+    assert list(cols["left_dir"][:4]) == [True, False, False, True] and not cols["right_dir"].any()
+    assert list(cols["brake"][:2]) == [False, True]
+    assert cols["link"][:60].all() and not cols["link"][60:].any()
+    assert cols["stopped"][60:].all() and not cols["stopped"][:60].any()
+    assert cols["right_duty"][0] == 1.0
+    assert np.all(np.diff(log.t) >= 0) and log.t[0] == 0.0
+
+    assert len(log.marks) == 1 and log.marks[0]["changed"] == 7
+
+
+def test_saved_ring_keeps_the_latest_records(tmp_path):
+    rec = FlightRecorder(64, None)
+    for i in range(100):
+        rec.record(CHANNELS, _intent(), 50, i, False, 0, False)
+    assert rec.overwritten == 36
+    path = str(tmp_path / "ring.bin")
+    assert rec.save(path) == 64
+    log = load(path)
+    assert list(log.control["seq"]) == list(range(36, 100)) and log.lost == 0
+
+
+def test_records_dropped_between_flushes_are_counted_lost(tmp_path):
+    rec = FlightRecorder(64, str(tmp_path))
+    for i in range(10):
+        rec.record(CHANNELS, _intent(), 50, i, False, 0, False)
+    rec.flush()
+    for i in range(100):
+        rec.record(CHANNELS, _intent(), 50, i, False, 0, False)
+    rec.close()
+    log = load(rec.path)
+    seq = [int(s) for s in log.control["seq"]]
+    assert seq[:10] == list(range(10))
+    assert log.lost == seq[10] - 10 and len(seq) + log.lost == 110
+
+
+def test_not_a_flight_log(tmp_path):
+    path = tmp_path / "junk.bin"
+    path.write_bytes(bytes(256))
+    with pytest.raises(ValueError):
+        load(str(path))
@@ -0,0 +1,142 @@
+# tests/test_glyph_atlas.py
+# Tiny BDF -> tools/font_atlas build/pack -> glyph_atlas load -> BitmapText cells
+import pytest
+
+from tools import font_atlas
+
+# 4x6 cells, 1 px descent. 'g' hangs below the baseline; '@' is not requested.
+BDF = """STARTFONT 2.1
+FONT tiny
+SIZE 6 75 75
+FONTBOUNDINGBOX 4 6 0 -1
+CHARS 5
+STARTCHAR space
+ENCODING 32
+DWIDTH 4 0
+BBX 1 1 0 0
+BITMAP
+00
+ENDCHAR
+STARTCHAR A
+ENCODING 65
+DWIDTH 4 0
+BBX 3 5 0 0
+BITMAP
+40
+A0
+E0
+A0
+A0
+ENDCHAR
+STARTCHAR one
+ENCODING 49
+DWIDTH 4 0
+BBX 2 5 1 0
+BITMAP
+40
+C0
+40
+40
+40
+ENDCHAR
+STARTCHAR g
+ENCODING 103
+DWIDTH 4 0
+BBX 3 4 0 -1
+BITMAP
+E0
+A0
+E0
+20
+ENDCHAR
+STARTCHAR at
+ENCODING 64
+DWIDTH 4 0
+BBX 3 3 0 1
+BITMAP
+E0
+E0
+E0
+ENDCHAR
+ENDFONT
+"""
+
+# Expected 4x6 cells, baseline at row 5 (top row 0)
+CELLS = {
+    "A": [".#..", "#.#.", "###.", "#.#.", "#.#.", "...."],
+    "1": ["..#.", ".##.", "..#.", "..#.", "..#.", "...."],
+    "g": ["....", "....", "###.", "#.#.", "###.", "..#."],
+}
+
+
+@pytest.fixture
+def atlas_path(tmp_path):
+    bdf = tmp_path / "tiny.bdf"
+    bdf.write_text(BDF)
+    out = tmp_path / "tiny.atlas"
+    assert font_atlas.main([str(bdf), str(out), "--chars", "A1g "]) == 0
+    return str(out)
+
+
+def test_build_places_glyphs_on_the_baseline(tmp_path):
+    bdf = tmp_path / "tiny.bdf"
+    bdf.write_text(BDF)
+    bbox, glyphs = font_atlas.parse_bdf(str(bdf))
+    header, codes, pixels = font_atlas.build(bbox, glyphs, "gA1")
+    assert codes == [ord("1"), ord("A"), ord("g")]
+    for tile, code in enumerate(codes):
+        cell = ["".join("#" if pixels[y][tile * 4 + x] else "." for x in range(4)) for y in range(6)]
+        assert cell == CELLS[chr(code)], chr(code)
+
+
+def test_pack_layout(atlas_path):
+    import struct
+    with open(atlas_path, "rb") as f:
+        data = f.read()
+    header = struct.unpack_from(font_atlas.HEADER_FMT, data)
+    magic, version, cell_w, cell_h, descent, per_row, count, width, height = header
+    assert (magic, version, cell_w, cell_h, descent) == (b"RSGA", 1, 4, 6, 1)
+    assert (per_row, count, width, height) == (32, 4, 128, 6)
+    size = struct.calcsize(font_atlas.HEADER_FMT)
+    assert data[size:size + count] == b" 1Ag"  # tile order is code order; '@' was not asked for
+    assert len(data) == size + count + height * width // 8
+
+
+def _cell(text, row, col):
+    x0, y0 = col * text.cell_w, row * text.cell_h
+    return ["".join("#" if text.bitmap[x0 + x, y0 + y] else "." for x in range(text.cell_w))
+            for y in range(text.cell_h)]
+
+
+@pytest.mark.parametrize("readinto", [True, False])
+def test_round_trip_into_bitmap_text(shims, atlas_path, monkeypatch, readinto):
+    import bitmaptools
+    import glyph_atlas
+    from bitmap_text import BitmapText
+    if not readinto:  # firmware without bitmaptools.readinto: row-by-row unpack
+        monkeypatch.delattr(bitmaptools, "readinto")
+    font = glyph_atlas.load(atlas_path)
+    assert font.get_bounding_box() == (4, 6, 0, -1)
+    assert font.get_glyph(ord("@")) is None and font.get_glyph(300) is None
+
+    text = BitmapText(font=font)
+    assert (text.cols, text.rows) == (32, 21)
+    assert text.write(1, 2, "A1g@") == 4
+    for col, ch in ((2, "A"), (3, "1"), (4, "g")):
+        assert _cell(text, 1, col) == CELLS[ch], ch
+    assert _cell(text, 1, 5) == ["...."] * 6  # not in the atlas: drawn blank
+    assert sum(text.bitmap._data) == sum("".join(c).count("#") for c in CELLS.values())
+
+
+def test_scan_chars(tmp_path):
+    src = tmp_path / "page.py"
+    src.write_text('LABEL = "SPD: kt"\nx = 3\nprint(f"LAT {x}")\n')
+    assert font_atlas.scan_chars([str(src)]) == " :ADLPSTkt"  # string literals only, sorted
+
+
+def test_no_requested_chars_in_the_font(tmp_path):
+    bdf = tmp_path / "tiny.bdf"
+    bdf.write_text(BDF)
+    bbox, glyphs = font_atlas.parse_bdf(str(bdf))
+    with pytest.raises(ValueError):
+        font_atlas.build(bbox, glyphs, "xyz")
@@ -0,0 +1,119 @@
+# tests/test_gnss_dfrobot.py
+# One 29-byte burst decoded from a fixed register dump; S/W negative; UTC formatted once per fix
+import struct
+
+import pytest
+
+from gnss_dfrobot import GnssService, GNSS_I2C_ADDR, BLOCK_LEN, _BLOCK_FMT
+from i2c_device_loader import I2CBusManager
+
+# 2025-04-25 12:34:56, 37 46.49400' S, 122 25.16400' W, 9 sats, 16.25 m, 1.50 kt, 270.75 deg
+DUMP = bytes([
+    0x07, 0xE9, 4, 25, 12, 34, 56,
+    37, 46, 0x00, 0xC0, 0xF8, ord("S"),
+    122, 25, 0x00, 0x40, 0x10, ord("W"),
+    9,
+    0x00, 0x10, 25,
+    0x00, 0x01, 50,
+    0x01, 0x0E, 75,
+])
+
+
+class FakeI2C:
+    def __init__(self, regs):
+        self.regs = bytearray(regs)
+        self.fail = False
+        self.reads = []
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def writeto_then_readfrom(self, addr, out_buf, in_buf):
+        if self.fail:
+            raise OSError(19)
+        self.reads.append((addr, bytes(out_buf), len(in_buf)))
+        start = out_buf[0]
+        in_buf[:] = self.regs[start:start + len(in_buf)]
+
+
+@pytest.fixture
+def gnss():
+    i2c = FakeI2C(DUMP)
+    bus = I2CBusManager(i2c)
+    service = GnssService(bus)
+    service.i2c = i2c
+
+    def read():
+        assert service.poll()
+        bus.run_pending()
+    service.read = read
+    return service
+
+
+def test_block_is_one_29_byte_read(gnss):
+    assert struct.calcsize(_BLOCK_FMT) == BLOCK_LEN == len(DUMP) == 29
+    gnss.read()
+    assert gnss.i2c.reads == [(GNSS_I2C_ADDR, b"\x00", 29)]
+    assert gnss.reads == 1 and gnss.errors == 0
+
+
+def test_decode_register_dump(gnss):
+    gnss.read()
+    fix = gnss.fix
+    assert (fix.year, fix.month, fix.day, fix.hour, fix.minute, fix.second) == (2025, 4, 25, 12, 34, 56)
+    assert fix.lat == pytest.approx(-(37 + 46.494 / 60))  # south is negative
+    assert fix.lon == pytest.approx(-(122 + 25.164 / 60))  # west is negative
+    assert fix.sats == 9
+    assert fix.alt == pytest.approx(16.25)
+    assert fix.sog == pytest.approx(1.50)
+    assert fix.cog == pytest.approx(270.75)
+    assert fix.utc() == "2025-04-25T12:34:56Z"
+
+
+def test_north_east_positive_and_24_bit_fraction(gnss):
+    gnss.i2c.regs[12] = ord("N")
+    gnss.i2c.regs[18] = ord("E")
+    gnss.i2c.regs[9:12] = bytes([0x01, 0x86, 0x9F])  # 99999 -> 46.99999'
+    gnss.read()
+    assert gnss.fix.lat == pytest.approx(37 + 46.99999 / 60)
+    assert gnss.fix.lon == pytest.approx(122 + 25.164 / 60)
+
+
+def test_same_second_is_stale(gnss):
+    gnss.read()
+    stamp = gnss.fix.stamp
+    gnss.i2c.regs[19] = 12  # changed, but the module has not produced a new fix
+    gnss.read()
+    assert gnss.stale_reads == 1 and gnss.fix.stamp == stamp and gnss.fix.sats == 9
+    gnss.i2c.regs[6] = 57
+    gnss.read()
+    assert gnss.stale_reads == 1 and gnss.fix.sats == 12 and gnss.fix.stamp >= stamp
+
+
+def test_utc_string_is_built_once_per_fix(gnss):
+    assert gnss.as_dict()["utc"] is None and gnss.age() is None
+    gnss.read()
+    first = gnss.as_dict()["utc"]
+    assert first == "2025-04-25T12:34:56Z"
+    assert gnss.as_dict()["utc"] is first  # cached, not reformatted
+    gnss.i2c.regs[6] = 57
+    gnss.read()
+    assert gnss.as_dict()["utc"] == "2025-04-25T12:34:57Z"
+
+
+def test_as_dict_reuses_one_dict(gnss):
+    gnss.read()
+    d = gnss.as_dict()
+    assert gnss.as_dict() is d
+    assert (d["lat"], d["sats"], d["fix"]) == (gnss.fix.lat, 9, 3) and d["age"] >= 0
+
+
+def test_failed_read_keeps_the_last_fix(gnss):
+    gnss.read()
+    gnss.i2c.fail = True
+    gnss.i2c.regs[6] = 57
+    gnss.read()
+    assert gnss.errors == 1 and gnss.reads == 2 and gnss.fix.second == 56
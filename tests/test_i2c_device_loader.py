@@ -0,0 +1,81 @@
+# tests/test_i2c_device_loader.py
+# Transaction queue: resubmits from inside a running pass must survive it
+from i2c_device_loader import (I2CBusManager, Transaction, TXN_CALL, TXN_WRITE,
+                               PRIO_SENSOR, PRIO_DISPLAY)
+
+
+class FakeI2C:
+    def __init__(self):
+        self.writes = []
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def writeto(self, addr, buf):
+        self.writes.append((addr, bytes(buf)))
+
+
+def test_call_resubmitted_from_its_fn_runs_next_pass():
+    bus = I2CBusManager(FakeI2C())
+    runs = []
+
+    def fn():
+        runs.append(1)
+        bus.submit(txn)  # still pending here, so refused
+    txn = Transaction(TXN_CALL, addr=0x3D, fn=fn, priority=PRIO_DISPLAY,
+                      callback=lambda t: bus.submit(t))  # pending cleared: accepted
+    assert bus.submit(txn)
+    assert bus.run_pending() == 1
+    assert txn.pending and bus.pending() == 1
+    assert bus.run_pending() == 1
+    assert len(runs) == 2
+
+
+def test_write_resubmitted_from_callback_is_not_lost():
+    i2c = FakeI2C()
+    bus = I2CBusManager(i2c)
+    again = [True]
+
+    def cb(t):
+        if again[0]:
+            again[0] = False
+            assert bus.submit(t)
+    a = Transaction(TXN_WRITE, addr=0x20, out_buf=b"\x01", priority=PRIO_SENSOR, callback=cb)
+    b = Transaction(TXN_WRITE, addr=0x30, out_buf=b"\x02", priority=PRIO_SENSOR)
+    bus.submit(a)
+    bus.submit(b)
+    assert bus.run_pending() == 2
+    assert bus.pending() == 1
+    assert bus.run_pending() == 1
+    assert i2c.writes == [(0x20, b"\x01"), (0x30, b"\x02"), (0x20, b"\x01")]
+    assert not a.pending and bus.pending() == 0
+    assert bus.submit(a)  # usable again
+
+
+def test_budget_exit_keeps_resubmits():
+    bus = I2CBusManager(FakeI2C())
+    calls = []
+    txns = []
+    for k in range(3):
+        txns.append(Transaction(TXN_CALL, addr=0x3D, fn=lambda k=k: calls.append(k),
+                                priority=PRIO_DISPLAY, callback=lambda t: bus.submit(t)))
+        bus.submit(txns[-1])
+    assert bus.run_pending(budget_us=0) == 1  # budget spent after the first
+    assert bus.pending() == 3                 # 2 left over + 1 resubmitted
+    bus.run_pending()
+    assert calls == [0, 1, 2, 0]
+
+
+def test_section_gets_execution_time():
+    import profiler
+    s = profiler.Section("t")
+    bus = I2CBusManager(FakeI2C())
+    txn = Transaction(TXN_WRITE, addr=0x20, out_buf=b"\x01")
+    txn.section = s
+    bus.submit(txn)
+    assert s.count == 0  # submitting is not the transaction
+    bus.run_pending()
+    assert s.count == 1 and s.last_us == bus.last_us[0x20]
@@ -0,0 +1,42 @@
+# tests/test_ibus_receiver.py
+# Every byte fed in ends up in exactly one frame or once in bytes_dropped
+import random
+
+from ibus_receiver import IBusDecoder, IBUS_PACKET_SIZE
+from sim.ibus_stream import encode_frame
+
+
+def _stream(rng):
+    data = bytearray()
+    for _ in range(rng.randint(1, 12)):
+        r = rng.random()
+        if r < 0.4:  # noise rich in header bytes
+            data += bytes(rng.choice((0x20, 0x40, 0x20, rng.randrange(256)))
+                          for _ in range(rng.randint(1, 70)))
+        elif r < 0.6:  # truncated frame
+            data += encode_frame([rng.randint(1000, 2000) for _ in range(14)])[:rng.randint(1, 31)]
+        else:  # payload full of 0x20/0x40 low bytes
+            data += encode_frame([rng.choice((1056, 1088, 1500, 0x2020, 0x4020)) for _ in range(14)])
+    data += encode_frame([1500] * 14)  # ends on a good frame, so nothing is left pending
+    return data
+
+
+def test_dropped_bytes_counted_once():
+    rng = random.Random(7)
+    for _ in range(500):
+        data = _stream(rng)
+        d = IBusDecoder()
+        i = 0
+        while i < len(data):
+            n = rng.randint(1, 40)
+            d.feed(data[i:i + n])
+            i += n
+        assert d.frame_count >= 1
+        assert d.bytes_dropped + d.frame_count * IBUS_PACKET_SIZE == len(data)
+
+
+def test_noise_before_frame():
+    d = IBusDecoder()
+    d.feed(b"\x20\x20\x41\x20" + encode_frame([1500] * 14))
+    assert d.frame_count == 1
+    assert d.bytes_dropped == 4
@@ -0,0 +1,39 @@
+# tests/test_intent_mapper.py
+# The compatibility wrapper keeps the old dict shape; the Intent object is new-API only
+import intent_mapper
+from intent_mapper import IntentMapper, map_ibus_to_intent, MODE_THRESHOLDS
+
+
+def test_wrapper_returns_old_dict():
+    d = map_ibus_to_intent({1: 1100, 2: 1900, 3: 1250, 4: 1500, 5: 1600, 6: 1000, 7: 0})
+    assert d == {"throttle": 50, "pivot": None, "veer": "left", "direction": "forward",
+                 "brake": True, "swb": 1000, "mode": "stealth"}
+
+
+def test_wrapper_dev_mode_adds_raw_channels():
+    d = map_ibus_to_intent({3: 1500, 7: MODE_THRESHOLDS["dev"], 8: 1234})
+    assert d["mode"] == "dev"
+    assert d["ch8"] == 1234 and d["ch16"] == 0
+    d = map_ibus_to_intent({7: 0})
+    assert "ch8" not in d
+
+
+def test_new_api_returns_intent():
+    m = IntentMapper()
+    m.update([1500, 1900, 2000, 1500, 1000, 1000, 0] + [1500] * 7)
+    assert isinstance(m.intent, intent_mapper.Intent)
+    assert m.intent.throttle == 100 and m.intent.direction == intent_mapper.FORWARD
+
+
+def test_throttle_stick_down_is_zero_duty():
+    # CH3 at the bottom must not read as full power (intent.throttle is |deflection|)
+    from drive_mixer import DriveMixer, DUTY_MAX
+    m = IntentMapper()
+    mixer = DriveMixer()
+    m.update([1500, 2000, 1000, 1500, 1000, 1000, 0] + [1500] * 7)
+    mixer.mix(m.intent.direction, intent_mapper.throttle_channel(m.intent.raw[2]), 0, 0)
+    assert mixer.left_duty == 0 and mixer.right_duty == 0
+    m.update([1500, 2000, 2000, 1500, 1000, 1000, 0] + [1500] * 7)
+    mixer.mix(m.intent.direction, intent_mapper.throttle_channel(m.intent.raw[2]), 0, 0)
+    assert mixer.left_duty == DUTY_MAX and mixer.right_duty == DUTY_MAX
+    assert intent_mapper.throttle_channel(1500) == 50
@@ -0,0 +1,127 @@
+# tests/test_log_sink.py
+# Level filter, per-tag rate limit, a full ring drops instead of blocking, config read lazily
+import os
+import subprocess
+import sys
+
+import pytest
+
+import log_sink
+
+_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Serial:
+    serial_connected = True
+
+
+class Supervisor:
+    runtime = Serial()
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    """Empty ring and counters, level WARN, a settable tick clock."""
+    clock = [1000]
+    monkeypatch.setattr(log_sink, "ticks_ms", lambda: clock[0])
+    monkeypatch.setattr(log_sink, "supervisor", Supervisor())
+    monkeypatch.setattr(log_sink, "_tail", log_sink._head)
+    for name, value in (("dropped", 0), ("suppressed", 0), ("written", 0), ("_tags", {}),
+                        ("level", log_sink.WARN)):
+        monkeypatch.setattr(log_sink, name, value)
+    log_sink.clock = clock
+    yield log_sink
+    del log_sink.clock
+
+
+def _drain(sink, capsys, n=log_sink.RING_SLOTS):
+    sink.drain(n)
+    return capsys.readouterr().out.splitlines()
+
+
+def test_level_filter(sink, capsys):
+    log = sink.tag("ibus")
+    assert not log.debug("d") and not log.info("i")
+    assert log.warn("w %d", 1) and log.error("e %s/%s", "a", "b")
+    assert sink.pending() == 2
+    lines = _drain(sink, capsys)
+    assert [line.split()[1:] for line in lines] == [["W", "ibus", "w", "1"], ["E", "ibus", "e", "a/b"]]
+    sink.set_level(sink.DEBUG)
+    assert log.debug("now %d %d %d", 1, 2, 3)
+    assert _drain(sink, capsys)[0].endswith("D ibus   now 1 2 3")
+
+
+def test_rate_limit_counts_what_it_suppressed(sink, capsys):
+    log = sink.tag("arm", rate_ms=500)
+    assert log.warn("a")
+    sink.clock[0] += 499
+    assert not log.warn("b") and not log.warn("c")
+    assert log.suppressed == 2 and sink.suppressed == 2
+    sink.clock[0] += 1
+    assert log.warn("d")
+    lines = _drain(sink, capsys)
+    assert lines[0].endswith("arm    a") and lines[1].endswith("arm    d (+2)")
+
+
+def test_rate_limit_across_the_tick_wrap(sink):
+    log = sink.tag("gnss", rate_ms=100)
+    sink.clock[0] = sink._TICKS_MASK - 10
+    assert log.warn("before")
+    sink.clock[0] = 50  # 61 ms later, after the wrap
+    assert not log.warn("too soon")
+    sink.clock[0] = 95
+    assert log.warn("after")
+
+
+def test_full_ring_drops_and_recovers(sink, capsys):
+    log = sink.tag("spam")
+    for i in range(sink.RING_SLOTS):
+        assert log.warn("%d", i)
+    assert not log.warn("one too many") and not log.error("still full")
+    assert sink.dropped == 2 and log.dropped == 2 and sink.pending() == sink.RING_SLOTS
+    assert len(_drain(sink, capsys, 4)) == 4 and sink.pending() == sink.RING_SLOTS - 4
+    assert log.warn("room again")
+    sink.flush()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[-1].endswith("room again") and sink.pending() == 0
+    assert "dropped=2" in sink.stats_line() and f"written={sink.RING_SLOTS + 1}" in sink.stats_line()
+
+
+def test_drain_is_bounded(sink, capsys):
+    log = sink.tag("x")
+    for i in range(10):
+        log.warn("%d", i)
+    assert sink.drain() == sink.DRAIN_LINES
+    assert len(capsys.readouterr().out.splitlines()) == sink.DRAIN_LINES
+
+
+def test_no_host_listening_discards(sink, capsys, monkeypatch):
+    log = sink.tag("x")
+    log.warn("a")
+    log.warn("b")
+    monkeypatch.setattr(Serial, "serial_connected", False)
+    assert sink.drain() == 0 and sink.pending() == 0 and sink.dropped == 2
+    assert capsys.readouterr().out == ""
+
+
+def test_bad_format_is_reported_not_raised(sink, capsys):
+    sink.tag("x").warn("%d items", "many")
+    assert "bad format '%d items'" in _drain(sink, capsys)[0]
+
+
+def test_import_does_not_load_config():
+    code = ("import sys, log_sink; assert 'config_loader' not in sys.modules; "
+            "log_sink.set_level(log_sink.INFO); log_sink.tag('t'); "
+            "assert 'config_loader' not in sys.modules; "
+            "print(log_sink.level)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=_REPO, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == str(log_sink.INFO)
+
+
+def test_first_tag_reads_the_config(monkeypatch):
+    monkeypatch.setattr(log_sink, "level", None)
+    monkeypatch.setattr(log_sink, "_tags", {})
+    monkeypatch.setattr(log_sink, "_read_settings", lambda: log_sink.DEBUG)
+    log_sink.tag("t")
+    assert log_sink.level == log_sink.DEBUG
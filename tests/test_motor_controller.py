@@ -0,0 +1,129 @@
+# tests/test_motor_controller.py
+# Pulse-burst crawl: on-time share, kick stretch, per-cycle trim and its clamps, restarts
+import pytest
+
+CRAWL = {'KICK': 28, 'KICK_MS': 30, 'HOLD': 20, 'HOLD_PPS': 14, 'PERIOD_MS': 400}
+KICK = 28 * 65535 // 100
+HOLD = 20 * 65535 // 100
+
+
+class Clock:
+    def __init__(self):
+        self.ms = 1000
+
+    def __call__(self):
+        return self.ms
+
+
+@pytest.fixture
+def motor(shims, monkeypatch):
+    import board
+    import motor_controller
+    clock = Clock()
+    monkeypatch.setattr(motor_controller, "ticks_ms", clock)
+    m = motor_controller.MotorController(board.D13, board.D9, crawl=CRAWL)
+    m.clock = clock
+    yield m
+    m.pwm.deinit()
+    m.dir.deinit()
+
+
+def _run(motor, target, ms, dir_level=True, edges=-1, step=10):
+    """Crawls for ms in control ticks; returns the duty written at each tick."""
+    duties = []
+    for _ in range(ms // step):
+        duties.append(motor.crawl(target, dir_level, edges))
+        motor.clock.ms += step
+    return duties
+
+
+def test_on_time_is_the_targets_share_of_hold(motor):
+    duties = _run(motor, 70, 800)  # half of HOLD_PPS: 200 of every 400 ms
+    assert motor._on_ms == 200 and motor._cycle_ms == 400
+    assert duties[:3] == [KICK] * 3
+    assert duties[3:20] == [HOLD] * 17
+    assert duties[20:40] == [0] * 20
+    assert duties[40] == KICK  # next cycle
+
+
+def test_on_time_under_kick_stretches_the_cycle(motor):
+    motor.crawl(7, True)  # 20 ms share < 30 ms kick: kick once per 600 ms
+    assert motor._on_ms == 30 and motor._cycle_ms == 600
+    motor.crawl(1, False)  # new direction restarts; 4200 ms capped at 8 periods
+    assert motor._on_ms == 30 and motor._cycle_ms == 8 * 400
+
+
+def test_trim_moves_toward_the_target(motor):
+    import motor_controller
+    edges = [0]
+    motor.crawl(70, True, edges[0])
+    assert motor.crawl_trim == motor_controller._TRIM_ONE
+    motor.clock.ms += 400
+    edges[0] += 14  # 17.5 pps measured against 7 pps asked: shorter bursts
+    motor.crawl(70, True, edges[0])
+    assert motor.crawl_trim == 1024 + ((1024 * 70 // 175 - 1024) >> 1)
+    assert motor._on_ms == 400 * 70 * motor.crawl_trim // (140 * 1024)
+    trim = motor.crawl_trim
+    motor.clock.ms += 400
+    edges[0] += 2  # 2.5 pps: too slow now, trim comes back up
+    motor.crawl(70, True, edges[0])
+    assert motor.crawl_trim == trim + ((trim * 70 // 25 - trim) >> 1)
+
+
+def test_trim_converges_on_a_wheel_that_runs_fast(motor):
+    # The wheel moves 2.5x as far per ms of burst as HOLD_PPS assumes
+    edges = 0
+    motor.crawl(70, True, edges)
+    for _ in range(12):
+        on = motor._on_ms
+        motor.clock.ms += motor._cycle_ms
+        edges += round(on * 2.5 * 14 * 2 / 1000)
+        motor.crawl(70, True, edges)
+    assert motor.crawl_trim == pytest.approx(1024 / 2.5, rel=0.05)
+
+
+def test_trim_clamps(motor):
+    import motor_controller
+    motor.crawl(70, True, 0)
+    for _ in range(40):  # never moves: bursts grow to the clamp
+        motor.clock.ms += motor._cycle_ms
+        motor.crawl(70, True, 0)
+    assert motor.crawl_trim == motor_controller._TRIM_MAX
+    edges = 0
+    for _ in range(40):  # runs away: bursts shrink to the clamp
+        motor.clock.ms += motor._cycle_ms
+        edges += 1000
+        motor.crawl(70, True, edges)
+    assert motor.crawl_trim == motor_controller._TRIM_MIN
+
+
+def test_no_trim_without_edges(motor):
+    _run(motor, 70, 1200)
+    assert motor.crawl_trim == 1024
+
+
+def test_direction_change_restarts_the_cycle(motor):
+    edges = 0
+    motor.crawl(70, True, edges)
+    motor.clock.ms += 250  # mid-rest
+    assert motor.crawl(70, True, edges) == 0
+    trim = motor.crawl_trim
+    assert motor.crawl(70, False, edges + 50) == KICK  # fresh kick, new DIR level
+    assert motor.dir.value is False and motor._t0 == motor.clock.ms
+    assert motor.crawl_trim == trim  # the cut-short cycle does not trim
+
+
+def test_write_leaves_crawl_mode(motor):
+    motor.crawl(70, True)
+    motor.clock.ms += 250
+    assert motor.crawl(70, True) == 0
+    motor.write(30000, True)
+    assert not motor.crawling and motor.pwm.duty_cycle == 30000
+    assert motor.crawl(70, True) == KICK  # same direction, but back in crawl: new cycle
+    motor.stop()
+    assert not motor.crawling and motor.pwm.duty_cycle == 0
+
+
+def test_crawls_only_below_hold_speed(motor):
+    assert motor.crawls(1) and motor.crawls(139)
+    assert not motor.crawls(0) and not motor.crawls(140)
@@ -0,0 +1,90 @@
+# tests/test_oled_compositor.py
+# Only real changes reach the panel, no faster than max_hz; BitmapText grids count as changes
+import pytest
+
+MS = 1_000_000
+
+
+class FakeDisplay:
+    def __init__(self):
+        self.auto_refresh = True
+        self.root_group = None
+        self.refreshes = 0
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+@pytest.fixture
+def oled(shims):
+    from oled_compositor import OledCompositor
+    display = FakeDisplay()
+    comp = OledCompositor(display, max_hz=10)
+    assert display.auto_refresh is False and display.root_group is comp.group
+    return comp
+
+
+def test_first_tick_pushes_the_new_group(oled):
+    assert oled.pending()
+    assert oled.tick(now_ns=0)
+    assert not oled.pending() and not oled.tick(now_ns=500 * MS)
+
+
+def test_unchanged_writes_are_dropped(oled):
+    slot = oled.add_line(0, 8, "THR 0")
+    oled.tick(now_ns=0)
+    oled.set_text(slot, "THR 0")
+    oled.set_color(slot, 0xFFFFFF)
+    assert oled.writes_ignored == 2 and not oled.pending()
+    assert not oled.tick(now_ns=1000 * MS)
+    oled.set_text(slot, "THR 5")
+    assert oled.tick(now_ns=1000 * MS)
+    assert oled._labels[slot].text == "THR 5" and oled.display.refreshes == 2
+
+
+def test_changes_batched_under_the_rate_limit(oled):
+    a = oled.add_line(0, 8)
+    b = oled.add_line(0, 20)
+    oled.tick(now_ns=0)
+    oled.set_text(a, "one")
+    assert not oled.tick(now_ns=50 * MS)  # 10 Hz: held until 100 ms
+    oled.set_text(b, "two")
+    oled.set_text(a, "three")
+    assert not oled.tick(now_ns=99 * MS)
+    assert oled.refreshes_skipped == 2
+    assert oled.tick(now_ns=100 * MS)
+    assert oled.display.refreshes == 2
+    assert (oled._labels[a].text, oled._labels[b].text) == ("three", "two")
+
+
+def test_bitmap_text_changes_are_pending(oled):
+    from bitmap_text import BitmapText
+    text = oled.add_text(BitmapText())
+    assert oled.group[len(oled.group) - 1] is text.tilegrid
+    oled.tick(now_ns=0)
+    text.write_line(0, "ARMED")
+    assert oled.pending()
+    assert oled.tick(now_ns=100 * MS)
+    assert not text.dirty and not oled.pending()
+    text.write_line(0, "ARMED")  # same cells: nothing to push
+    assert not oled.pending()
+
+
+def test_one_status_row_is_a_short_push(shims):
+    # Sim panel charges only the changed pages/columns, like displayio's dirty area
+    import displayio
+    from bitmap_text import BitmapText
+    from oled_compositor import OledCompositor
+    from sim.sh1107 import SH1107, FakeOled
+    shims.add_i2c_device(0x3D, FakeOled())
+    display = SH1107(displayio.I2CDisplay(None, device_address=0x3D))
+    oled = OledCompositor(display, max_hz=10)
+    text = oled.add_text(BitmapText())
+    oled.tick(now_ns=0)
+    assert display.bytes_last == 128 * 128 // 8 + 16 * 3  # new root group: whole panel
+    text.write_line(3, "THR  80%")
+    oled.tick(now_ns=100 * MS)
+    assert 0 < display.bytes_last <= 3 * (128 + 3)  # one 12 px row spans at most 3 pages
+    text.write_number(3, 4, 81, 3)
+    oled.tick(now_ns=200 * MS)
+    assert display.bytes_last <= 3 * (6 + 3)  # one digit cell
@@ -0,0 +1,23 @@
+# tests/test_profiler.py
+# Section stats stay bounded: the mean's running sum never leaves small-int range
+import profiler
+
+
+def test_mean_sum_stays_bounded():
+    s = profiler.Section("t")
+    for _ in range(5000):
+        s.record_us(1_000_000)
+    assert s.avg[0] <= profiler._SUM_MAX
+    assert s.avg[0] // s.avg[1] == 1_000_000
+    assert s.count == 5000
+    s.record_us(0)
+    assert 0 < s.avg[0] // s.avg[1] < 1_000_000
+
+
+def test_reset_clears_mean():
+    s = profiler.Section("t")
+    s.record_us(40)
+    s.record_us(60)
+    assert "avg=50us" in s.line()
+    s.reset()
+    assert "avg=0us" in s.line()
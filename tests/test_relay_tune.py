@@ -0,0 +1,97 @@
+# tests/test_relay_tune.py
+# Relay autotune against a simulated first-order-plus-dead-time wheel
+import math
+
+import pytest
+
+import relay_tune
+from relay_tune import RelayTuner, RelayResult, RULES
+
+DT_MS = 1
+
+
+class FopdtWheel:
+    """pps = K * duty, delayed by dead_ms, through a first-order lag tau_s."""
+
+    def __init__(self, gain, tau_s, dead_ms, duty0):
+        self.gain = gain
+        self.alpha = 1 - math.exp(-DT_MS / 1000 / tau_s)
+        self.queue = [duty0] * (dead_ms // DT_MS)
+        self.pps = gain * duty0
+
+    def step(self, duty):
+        self.queue.append(duty)
+        u = self.queue.pop(0)
+        self.pps += (self.gain * u - self.pps) * self.alpha
+        return self.pps
+
+
+def _tune(wheels, setpoint=180.0, bias=45.0, amp=10.0, eps=5.4, timeout_s=20.0):
+    tuner = RelayTuner(setpoint, bias, amp, eps_pps=eps, wheels=len(wheels), timeout_s=timeout_s)
+    pps = [w.pps for w in wheels]
+    now = 0
+    while not tuner.done:
+        duties = tuner.step(now, pps)
+        pps = [w.step(d) for w, d in zip(wheels, duties)]
+        now += DT_MS
+    return tuner
+
+
+def _limit_cycle(k, tau, dead, d, eps):
+    """Exact relay limit cycle of a FOPDT plant: amplitude (pps) and period (s)."""
+    kd = k * d
+    a = kd - (kd - eps) * math.exp(-dead / tau)
+    half = dead + tau * math.log((kd + a) / (kd - eps))
+    return a, 2 * half
+
+
+def test_ku_pu_match_the_plant():
+    k, tau, dead, d, eps = 4.0, 0.3, 0.06, 10.0, 5.4
+    tuner = _tune([FopdtWheel(k, tau, int(dead * 1000), 45.0)], amp=d, eps=eps)
+    res = tuner.results[0]
+    a, pu = _limit_cycle(k, tau, dead, d, eps)
+    assert res.amplitude == pytest.approx(a, rel=0.02)
+    assert res.pu == pytest.approx(pu, rel=0.02)
+    assert res.ku == pytest.approx(4 * d / (math.pi * math.sqrt(a * a - eps * eps)), rel=0.03)
+
+    # The describing-function Ku lands near the plant's true ultimate gain
+    w = 2 * math.pi / res.pu
+    assert res.ku == pytest.approx(math.sqrt(1 + (w * tau) ** 2) / k, rel=0.25)
+
+
+def test_two_wheels_tune_in_one_run():
+    slow = FopdtWheel(4.0, 0.5, 80, 45.0)
+    fast = FopdtWheel(4.0, 0.2, 40, 45.0)
+    res_slow, res_fast = _tune([slow, fast]).results
+    assert res_slow.pu > res_fast.pu
+    for res, (k, tau, dead) in ((res_slow, (4.0, 0.5, 0.08)), (res_fast, (4.0, 0.2, 0.04))):
+        assert res.pu == pytest.approx(_limit_cycle(k, tau, dead, 10.0, 5.4)[1], rel=0.03)
+
+
+@pytest.mark.parametrize("rule", sorted(RULES))
+def test_each_rule_scales_ku_pu(rule):
+    res = RelayResult(ku=0.8, pu=0.5, amplitude=20.0, cycles=4)
+    kp_f, ti_f, td_f = RULES[rule]
+    kp, ki, kd = res.gains(rule)
+    assert kp == pytest.approx(kp_f * 0.8)
+    assert ki == (pytest.approx(kp / (ti_f * 0.5)) if ti_f else 0.0)
+    assert kd == pytest.approx(kp * td_f * 0.5)
+
+
+def test_named_rule_values():
+    res = RelayResult(ku=1.0, pu=1.0, amplitude=20.0, cycles=4)
+    assert res.gains("zn") == pytest.approx((0.6, 1.2, 0.075))
+    assert res.gains("zn_pi") == pytest.approx((0.45, 0.54, 0.0))
+    assert res.gains() == res.gains(relay_tune.DEFAULT_RULE) == pytest.approx((1 / 3.2, 1 / 7.04, 0.0))
+
+
+def test_no_limit_cycle_times_out():
+    tuner = _tune([FopdtWheel(0.0, 0.3, 60, 45.0)], timeout_s=1.0)  # dead wheel, never crosses
+    assert tuner.results == [None] and "no steady limit cycle" in tuner.channels[0].error
+
+
+def test_bias_and_amp_must_fit_the_duty_range():
+    with pytest.raises(ValueError):
+        RelayTuner(180, 95, 10)
+    with pytest.raises(ValueError):
+        RelayTuner(180, 5, 10)
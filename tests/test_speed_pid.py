@@ -0,0 +1,94 @@
+# tests/test_speed_pid.py
+# Q8 wheel PID: anti-windup, reverse commands as magnitudes, reset on stop/brake
+from drive_mixer import DriveMixer, DUTY_MAX
+from speed_pid import I_LIMIT, SpeedController, WheelPid, linear_feedforward
+
+
+class FakeSpeed:
+    def __init__(self):
+        self.x10 = [0, 0]
+
+    def pps_x10(self, wheel):
+        return self.x10[wheel]
+
+
+def test_integrator_holds_while_saturated():
+    pid = WheelPid(kp=0.1, ki=0.5, kd=0.0, dt_ms=20)
+    for _ in range(2000):  # stalled wheel, full target
+        pid.update(6000, 0)
+    assert pid.duty == DUTY_MAX
+    assert 0 < pid.i_acc < I_LIMIT  # stopped at saturation, short of the clamp
+    held = pid.i_acc
+    pid.update(6000, 0)
+    assert pid.i_acc == held
+    # Wheel breaks free and overshoots: no wound-up integrator keeps it pinned at full
+    assert pid.update(6000, 6500) < DUTY_MAX
+
+
+def test_integrator_clamped_to_one_duty_range():
+    pid = WheelPid(kp=0.0, ki=50.0, kd=0.0, dt_ms=20)
+    for _ in range(200):
+        pid.update(6000, 5999)  # tiny error never saturates a kp=0 loop quickly
+    assert pid.i_acc <= I_LIMIT
+    for _ in range(200):
+        pid.update(10, 6000)
+    assert pid.i_acc >= -I_LIMIT and pid.duty == 0
+
+
+def test_zero_target_resets():
+    pid = WheelPid(kp=0.1, ki=0.5, kd=0.0, dt_ms=20)
+    for _ in range(20):
+        pid.update(3000, 1000)
+    assert pid.i_acc != 0
+    assert pid.update(0, 1200) == 0
+    assert pid.i_acc == 0 and pid.prev_meas == 1200
+
+
+def test_reverse_command_is_a_magnitude_with_reverse_ff():
+    fwd = linear_feedforward(10, 600)
+    rev = linear_feedforward(30, 600)
+    speed = FakeSpeed()
+    ctl = SpeedController(speed, max_pps=600)
+    ctl.use_feedforward((fwd, rev), (fwd, rev))
+    assert ctl.set_closed(True)
+    mixer = DriveMixer()
+    mixer.mix(-1, 50, 0, 0)
+    assert mixer.left_cmd < 0 and mixer.right_cmd < 0
+    ctl.set_targets(mixer)
+    assert ctl.left_target == 3000 and ctl.right_target == 3000
+    assert ctl.left.ff is rev and ctl.right.ff is rev
+    speed.x10 = [3000, 3000]
+    ctl.update()
+    assert ctl.left_duty == rev(3000) and ctl.right_duty == rev(3000)
+
+
+def test_direction_reversal_restarts_the_loop():
+    speed = FakeSpeed()
+    ctl = SpeedController(speed)
+    ctl.set_closed(True)
+    mixer = DriveMixer()
+    mixer.mix(1, 50, 0, 0)
+    ctl.set_targets(mixer)
+    for _ in range(20):
+        ctl.update()
+    assert ctl.left.i_acc != 0
+    mixer.mix(-1, 50, 0, 0)
+    ctl.set_targets(mixer)
+    assert ctl.left.i_acc == 0 and ctl.right.i_acc == 0
+
+
+def test_stop_resets_both_wheels():
+    speed = FakeSpeed()
+    ctl = SpeedController(speed)
+    ctl.set_closed(True)
+    mixer = DriveMixer()
+    mixer.mix(1, 80, 0, 0)
+    ctl.set_targets(mixer)
+    for _ in range(20):
+        ctl.update()
+    assert ctl.left_duty > 0
+    speed.x10 = [500, 400]
+    ctl.stop()
+    assert (ctl.left_target, ctl.right_target, ctl.left_duty, ctl.right_duty) == (0, 0, 0, 0)
+    assert ctl.left.i_acc == 0 and ctl.right.i_acc == 0
+    assert ctl.left.prev_meas == 500 and ctl.right.prev_meas == 400
@@ -0,0 +1,108 @@
+# tests/test_speed_pulse_reader.py
+# 1/T on PulseIn at low speed, countio count/dt at high speed, zero after a stall, overflow
+import pytest
+
+import speed_pulse_reader
+from speed_pulse_reader import WheelSpeedEstimator, STALL_TIMEOUT_US
+
+TICK_MS = 20  # config 'speed' task period
+
+
+class Wheel:
+    """Virtual clock plus a hall output feeding whichever shim has claimed the pin."""
+
+    def __init__(self, world, pin, monkeypatch):
+        self.world = world
+        self.pin = pin
+        self.now_ns = 0
+        self.phase = 0.0
+        self.level = False
+        monkeypatch.setattr(speed_pulse_reader.time, "monotonic_ns", lambda: self.now_ns)
+
+    def edges(self, n, half_us):
+        sink = self.world.pin_obj(self.pin)
+        for _ in range(n):
+            self.level = not self.level
+            sink._edge(self.level, half_us)
+
+    def run(self, est, pps, ms, tick_ms=TICK_MS):
+        for _ in range(ms // tick_ms):
+            self.now_ns += tick_ms * 1_000_000
+            if pps:
+                self.phase += pps * 2 * tick_ms / 1000
+                n = int(self.phase)
+                self.phase -= n
+                self.edges(n, 500_000 / pps)
+            est.update()
+
+
+@pytest.fixture
+def wheel(shims, monkeypatch):
+    import board
+    w = Wheel(shims, board.D12, monkeypatch)
+    yield w
+    obj = shims.pin_obj(board.D12)
+    if obj is not None:
+        obj.deinit()
+
+
+def _estimator(wheel, **kw):
+    est = WheelSpeedEstimator([wheel.pin], [90], **kw)
+    est.update()  # first call only starts the clock
+    return est
+
+
+def test_low_speed_uses_period_timing(wheel):
+    est = _estimator(wheel)
+    wheel.run(est, 10, 2000)  # 3 edges per window: too few to count
+    assert not est.counting[0] and type(wheel.world.pin_obj(wheel.pin)).__name__ == "PulseIn"
+    assert est.period_us[0] == 100_000
+    assert est.pulses_per_sec(0) == pytest.approx(10)
+    assert est.pps_x10(0) == 100
+    assert est.rpm(0) == pytest.approx(10 * 60 / 90)
+
+
+def test_high_speed_counts_edges_on_countio(wheel):
+    est = _estimator(wheel)
+    wheel.run(est, 300, 1000)
+    assert est.counting[0] and type(wheel.world.pin_obj(wheel.pin)).__name__ == "Counter"
+    assert est.switches[0] == 1
+    assert est.pulses_per_sec(0) == pytest.approx(300, rel=0.01)
+    assert est.pps_x10(0) == pytest.approx(3000, rel=0.01)
+    assert est.edges[0] == pytest.approx(600, abs=2)
+
+
+def test_slowing_down_goes_back_to_period_timing(wheel):
+    est = _estimator(wheel)
+    wheel.run(est, 300, 500)
+    wheel.run(est, 10, 1000)
+    assert not est.counting[0] and est.switches[0] == 2
+    assert est.pulses_per_sec(0) == pytest.approx(10)
+
+
+def test_zero_after_stall_timeout(wheel):
+    est = _estimator(wheel)
+    wheel.run(est, 300, 500)
+    wheel.run(est, 0, STALL_TIMEOUT_US // 1000 - 2 * TICK_MS)
+    assert est.pulses_per_sec(0) > 0  # period still held inside the timeout
+    wheel.run(est, 0, 2 * TICK_MS)
+    assert est.pulses_per_sec(0) == 0.0 and est.pps_x10(0) == 0
+    assert not est.counting[0]  # a restart is slow, so it starts on PulseIn
+
+
+def test_pulsein_overflow_switches_to_counting(wheel):
+    est = _estimator(wheel, maxlen=8)
+    wheel.now_ns += TICK_MS * 1_000_000
+    wheel.edges(30, 500)  # burst: PulseIn keeps the last 8
+    est.update()
+    assert est.overflows[0] == 1 and est.counting[0]
+    wheel.run(est, 1000, 400)
+    assert est.overflows[0] == 1
+    assert est.pulses_per_sec(0) == pytest.approx(1000, rel=0.01)
+
+
+def test_deinit_releases_the_pin(wheel):
+    est = _estimator(wheel)
+    wheel.run(est, 300, 200)
+    est.deinit()
+    assert wheel.world.pin_obj(wheel.pin) is None
@@ -0,0 +1,107 @@
+# tests/test_wheel_rig.py
+# RigRun rates / mean over the settled window; left/right mismatch and drift
+import pytest
+
+TICK_US = 50_000
+
+
+@pytest.fixture(autouse=True)
+def wheel_rig(shims):
+    """wheel_rig imports countio/pwmio at the top, so it needs the shims."""
+    import wheel_rig
+    return wheel_rig
+
+
+def differential(run):
+    from wheel_rig import differential
+    return differential(run)
+
+
+def _run(counts, t_us=None, settle=0):
+    from wheel_rig import RigRun
+    n = len(counts[0])
+    run = RigRun(len(counts), n)
+    for i in range(n):
+        run.t_us[i] = t_us[i] if t_us else i * TICK_US
+        for w, c in enumerate(counts):
+            run.counts[w][i] = c[i]
+    run.n = n
+    run.settle = settle
+    return run
+
+
+def _steady(edges_per_tick, ticks, start=0):
+    return [start + edges_per_tick * i for i in range(ticks)]
+
+
+def test_rates_skip_the_settle_window():
+    # 3 spin-up ticks at 2 edges, then 10 edges per 50 ms tick
+    counts = [0, 2, 4, 6] + [6 + 10 * i for i in range(1, 9)]
+    run = _run([counts], settle=3)
+    assert run.rates(0) == [200.0] * 8
+    assert _run([counts]).rates(0)[:3] == [40.0] * 3  # without settle the spin-up shows
+
+
+def test_rates_skip_ticks_without_time():
+    run = _run([[0, 10, 20, 30]], t_us=[0, 50_000, 50_000, 100_000])
+    assert run.rates(0) == [200.0, 200.0]
+
+
+def test_mean_pps_is_edges_over_the_settled_window():
+    # Uneven ticks: the tick average would weight the short tick's rate too much
+    t_us = [0, 50_000, 100_000, 110_000, 160_000, 210_000]
+    counts = [0, 3, 13, 16, 26, 36]
+    run = _run([counts], t_us=t_us, settle=1)
+    assert run.mean_pps(0) == pytest.approx((36 - 3) * 1_000_000 / (210_000 - 50_000))
+    assert sum(run.rates(0)) / len(run.rates(0)) != pytest.approx(run.mean_pps(0))
+
+
+def test_mean_pps_needs_two_settled_samples():
+    run = _run([[0, 10, 20]], settle=2)
+    assert run.mean_pps(0) == 0.0
+    run.settle = 1
+    assert run.mean_pps(0) == 200.0
+
+
+def test_buffers_are_reused_across_runs():
+    run = _run([_steady(10, 20)])
+    run.n = 5
+    assert run.mean_pps(0) == 200.0 and len(run.rates(0)) == 4
+
+
+def test_mismatch_and_lead():
+    left = _steady(21, 40)   # 420 pps
+    right = _steady(20, 40)  # 400 pps
+    d = differential(_run([left, right], settle=4))
+    assert d["mismatch_pct"] == pytest.approx(100 * (21 - 20) / 20.5)
+    assert d["lead_pulses"] == 35
+    assert d["mismatch_std_pct"] == pytest.approx(0.0)
+    assert d["drift_pct_per_min"] == pytest.approx(0.0)
+    assert differential(_run([right, left], settle=4))["mismatch_pct"] < 0
+
+
+def test_tick_spread_from_quantization():
+    # Same average speed, but B's edges land 9/11 per tick
+    left = _steady(10, 41)
+    right = [0]
+    for i in range(1, 41):
+        right.append(right[-1] + (9 if i % 2 else 11))
+    d = differential(_run([left, right]))
+    assert d["mismatch_pct"] == pytest.approx(0.0)
+    rel = [200 * (10 - 9) / 19, 200 * (10 - 11) / 21]  # per-tick ratios alternate
+    assert d["mismatch_std_pct"] == pytest.approx(abs(rel[0] - rel[1]) / 2)
+
+
+def test_drift_from_a_wheel_sagging():
+    # 2 s settled, the right wheel drops from 10 to 9 edges per tick halfway through
+    left = _steady(10, 41)
+    right = [10 * i if i <= 20 else 200 + 9 * (i - 20) for i in range(41)]
+    d = differential(_run([left, right]))
+    second = 100 * (200 - 180) / 190
+    assert d["drift_pct_per_min"] == pytest.approx((second - 0.0) / 1.0 * 60)
+    assert d["lead_pulses"] == 20
+
+
+def test_too_few_samples():
+    assert differential(_run([_steady(10, 8), _steady(10, 8)], settle=4)) is None
+    assert differential(_run([_steady(10, 9), _steady(10, 9)], settle=4)) is not None
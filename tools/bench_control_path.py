@@ -0,0 +1,394 @@
+# tools/bench_control_path.py
+# Control-path benchmark: iBUS bytes -> IBusDecoder -> IntentMapper -> ArmingGate/DriveMixer -> MotorController
+# Author: savant42
+#
+# Runs on the desktop against the sim shims (wall-clock timing, no virtual time).
+# Each frame goes through the same calls robot-main.py makes for it, in four stages:
+#
+#   decode  IBusDecoder.feed(32 bytes)
+#   intent  IntentMapper.update(channels)
+#   mix     ArmingGate.update(channels): warm-up/arm/brake, then DriveMixer.mix()
+#   pwm     SpeedController.set_targets(mixer), then per wheel MotorController.write()
+#           or crawl() as robot-main's drive() picks (open loop: no speed inputs here)
+#
+# The gate is armed before timing with a CH8-on, throttle-low preamble, so the
+# synthetic stream is driven; a capture whose CH8 is off disarms it, as on the sled.
+#
+# Pass 1 times every stage of every frame with perf_counter_ns. Pass 2 replays
+# the stream under tracemalloc and records, per stage, how far the traced heap
+# rose above its level at stage entry (bytes allocated per frame, not a heap peak).
+#
+# --path legacy runs the baseline code itself: intent_mapper.py and
+# motor_controller.py are loaded from git (--legacy-ref, default the root commit)
+# so map_ibus_to_intent() with its change prints and set_speed()/forward()/
+# backward() are timed as they shipped. The baseline had no frame decoder
+# function and no mixer, so decode is IBusDecoder on both paths and mix is
+# DriveMixer fed from the baseline dict (veer/pivot were left/right/None: +-100).
+#
+#   python3 tools/bench_control_path.py --frames 5000 --out bench.json
+#   python3 tools/bench_control_path.py --recorded capture.bin --compare bench.json
+#
+# Host numbers are not device numbers: an ESP32-S3 at 240 MHz is 20-50x slower
+# than a desktop core, and CPython boxes ints that CircuitPython keeps immediate,
+# so alloc_bytes here is an upper bound. Compare runs against each other.
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import types
+import time
+import tracemalloc
+from array import array
+
+_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _REPO)
+import sim  # noqa: E402
+from sim.ibus_stream import encode_frame  # noqa: E402
+
+FRAME_BUDGET_US = 7000  # one iBUS frame every 7 ms
+STAGES = ("decode", "intent", "mix", "pwm")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+# === Streams ===
+def synthetic_stream(count, seed=1):
+    """Stick sweeps, direction flips, brake/mode switches and some held frames."""
+    rng = random.Random(seed)
+    ch = [1500, 1500, 1000, 1500, 1000, 1000, 1000, 2000, 1500, 1500, 1500, 1500, 1500, 1500]
+    frames = []
+    for i in range(count):
+        phase = i % 400
+        ch[2] = 1000 + (phase * 1000) // 400                   # throttle ramp
+        ch[0] = 1500 + ((i * 7) % 1000) - 500                  # veer sweep
+        ch[3] = 1500 if phase < 300 else rng.randint(1000, 2000)  # pivot bursts
+        ch[1] = 2000 if (i // 400) % 2 == 0 else 1000          # direction flips
+        ch[4] = 2000 if rng.random() < 0.02 else 1000          # brake taps (CH8 stays on: armed)
+        ch[6] = (1000, 1500, 2000)[(i // 1000) % 3]            # mode
+        if rng.random() < 0.3:
+            frames.append(frames[-1] if frames else bytes(encode_frame(ch)))  # unchanged sticks
+        else:
+            frames.append(bytes(encode_frame(ch)))
+    return frames
+
+
+def arm_preamble():
+    """Frames that take ArmingGate through warm-up and arming: CH8 on, throttle held low."""
+    ch = [1500, 1500, 1000, 1500, 1000, 1000, 1000, 2000, 1500, 1500, 1500, 1500, 1500, 1500]
+    return [bytes(encode_frame(ch))] * 40
+
+
+def recorded_stream(path, limit=None):
+    with open(path, "rb") as f:
+        data = f.read()
+    frames = [data[i:i + 32] for i in range(0, len(data) - 31, 32)]
+    return frames[:limit] if limit else frames
+
+
+# === Baseline code ===
+def root_commit():
+    out = subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], cwd=_REPO,
+                         capture_output=True, text=True, check=True)
+    return out.stdout.split()[0]
+
+
+def load_baseline(name, ref):
+    """Module object for <name>.py as it was at git ref, without touching sys.modules."""
+    try:
+        src = subprocess.run(["git", "show", f"{ref}:{name}.py"], cwd=_REPO,
+                             capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise SystemExit(f"❌ cannot load {name}.py at {ref}: {e}")
+    module = types.ModuleType(f"baseline_{name}")
+    module.__file__ = f"{ref}:{name}.py"
+    exec(compile(src, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+class _Null:
+    def write(self, s):
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+class _LegacyIntent:
+    """The baseline dict's fields in the shape DriveMixer.mix() takes."""
+    __slots__ = ("direction", "throttle", "veer_amt", "pivot_amt")
+
+    _SIDE = {"left": -100, "right": 100, None: 0}
+    _DIR = {"forward": 1, "reverse": -1, None: 0}
+
+    def set(self, d):
+        self.direction = self._DIR[d["direction"]]
+        self.throttle = min(100, d["throttle"])
+        self.veer_amt = self._SIDE[d["veer"]]
+        self.pivot_amt = self._SIDE[d["pivot"]]
+
+
+# === Pipeline ===
+class Pipeline:
+    def __init__(self, path="fast", legacy_ref=None):
+        sim.install(virtual_time=False)
+        from config import MOTOR_CONFIG
+        import drive_mixer
+        from ibus_receiver import IBusDecoder
+
+        self.path = path
+        self.decoder = IBusDecoder()
+        self.mixer = drive_mixer.from_config()
+        left, right = MOTOR_CONFIG["LEFT"], MOTOR_CONFIG["RIGHT"]
+        if path == "legacy":
+            ref = legacy_ref or root_commit()
+            self.legacy_ref = ref
+            self.legacy_map = load_baseline("intent_mapper", ref).map_ibus_to_intent
+            MotorController = load_baseline("motor_controller", ref).MotorController
+            self.intent = _LegacyIntent()
+            self.null = _Null()  # the baseline prints every changed intent; the print stays in the timing
+            self.left = MotorController(left["PWM"], left["DIR"], reverse=not left["FWD"])
+            self.right = MotorController(right["PWM"], right["DIR"], reverse=not right["FWD"])
+        else:
+            from config import CRAWL_CONFIG
+            from arming import ArmingGate
+            from intent_mapper import IntentMapper
+            from motor_controller import MotorController
+            import speed_pid
+            self.mapper = IntentMapper()
+            self.intent = self.mapper.intent
+            self.gate = ArmingGate(self.mixer)
+            self.left = MotorController(left["PWM"], left["DIR"], reverse=not left["FWD"], name="LEFT",
+                                        crawl=CRAWL_CONFIG.get("LEFT"))
+            self.right = MotorController(right["PWM"], right["DIR"], reverse=not right["FWD"], name="RIGHT",
+                                         crawl=CRAWL_CONFIG.get("RIGHT"))
+            self.pid = speed_pid.from_config(motors=(self.left, self.right))
+            for frame in arm_preamble():
+                self.decode(frame)
+                self.map()
+                self.mix()
+            if not self.gate.armed:
+                raise SystemExit("❌ arming preamble did not arm the gate")
+
+    def close(self):
+        for m in (self.left, self.right):
+            m.pwm.deinit()
+            m.dir.deinit()
+
+    def decode(self, frame):
+        before = self.decoder.frame_count
+        self.decoder.feed(frame)
+        return self.decoder.frame_count != before
+
+    def map(self):
+        if self.path == "legacy":
+            ch = self.decoder.channels
+            out, sys.stdout = sys.stdout, self.null
+            try:
+                self.intent.set(self.legacy_map({i + 1: ch[i] for i in range(len(ch))}))
+            finally:
+                sys.stdout = out
+        else:
+            self.mapper.update(self.decoder.channels)
+
+    def mix(self):
+        if self.path == "legacy":
+            it = self.intent  # the baseline dict's throttle, as it shipped
+            self.mixer.mix(it.direction, it.throttle, it.veer_amt, it.pivot_amt)
+        else:
+            self.gate.update(self.decoder.channels)
+
+    def pwm(self):
+        m = self.mixer
+        if self.path == "legacy":
+            for motor, cmd in ((self.left, m.left_cmd), (self.right, m.right_cmd)):
+                if cmd < 0:
+                    motor.backward()
+                else:
+                    motor.forward()
+                motor.set_speed(abs(cmd) * 100 // 10000)
+        else:
+            # robot-main motor_task with no speed inputs: open loop, PID tracking the duty
+            pid = self.pid
+            if not self.gate.armed or self.gate.brakes:
+                self.left.stop()
+                self.right.stop()
+                pid.stop()
+                return
+            pid.set_targets(m)
+            self._drive(self.left, pid.left, pid.left_target, m.left_duty, m.left_dir)
+            self._drive(self.right, pid.right, pid.right_target, m.right_duty, m.right_dir)
+            pid.track(m.left_duty, m.right_duty)
+
+    @staticmethod
+    def _drive(motor, wheel_pid, target, duty, dir_level):
+        if motor.crawls(target):
+            motor.crawl(target, dir_level, -1)
+            wheel_pid.reset(0)
+        else:
+            motor.write(duty, dir_level)
+
+
+# === Passes ===
+def time_pass(pipe, frames):
+    clock = time.perf_counter_ns
+    samples = {name: [] for name in STAGES + ("total",)}
+    dropped = 0
+    for frame in frames:
+        t0 = clock()
+        ok = pipe.decode(frame)
+        t1 = clock()
+        if not ok:
+            dropped += 1
+            continue
+        pipe.map()
+        t2 = clock()
+        pipe.mix()
+        t3 = clock()
+        pipe.pwm()
+        t4 = clock()
+        samples["decode"].append(t1 - t0)
+        samples["intent"].append(t2 - t1)
+        samples["mix"].append(t3 - t2)
+        samples["pwm"].append(t4 - t3)
+        samples["total"].append(t4 - t0)
+    return samples, dropped
+
+
+def alloc_pass(pipe, frames):
+    """Bytes allocated inside each stage per frame: traced peak during the stage minus its entry level."""
+    steps = (("decode", None), ("intent", pipe.map), ("mix", pipe.mix), ("pwm", pipe.pwm))
+    # Preallocated so the bench's own bookkeeping does not show up as retained heap
+    alloc = {name: array("q", bytes(8 * len(frames))) for name in STAGES + ("total",)}
+    tracemalloc.start()
+    base_current = tracemalloc.get_traced_memory()[0]
+    for i, frame in enumerate(frames):
+        total = 0
+        for name, fn in steps:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            if fn is None:
+                ok = pipe.decode(frame)
+            else:
+                fn()
+            used = tracemalloc.get_traced_memory()[1] - before
+            alloc[name][i] = used
+            total += used
+            if fn is None and not ok:
+                break
+        alloc["total"][i] = total
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    worst = max(alloc["total"]) if alloc["total"] else 0
+    return alloc, {"retained_bytes": current - base_current, "max_frame_alloc_bytes": worst}
+
+
+# === Reporting ===
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0
+    k = min(len(sorted_vals) - 1, int(round(p / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+
+def summarize_ns(values):
+    vals = sorted(values)
+    out = {f"p{p:g}": round(percentile(vals, p) / 1000, 3) for p in PERCENTILES}
+    out["max"] = round(vals[-1] / 1000, 3) if vals else 0
+    out["mean"] = round(sum(vals) / len(vals) / 1000, 3) if vals else 0
+    return out
+
+
+def summarize_alloc(values):
+    n = len(values) or 1
+    return {
+        "mean_bytes": round(sum(values) / n, 1),
+        "max_bytes": max(values) if values else 0,
+        "frames_allocating": sum(1 for v in values if v),
+    }
+
+
+def run(frames, path="fast", source="synthetic", legacy_ref=None):
+    pipe = Pipeline(path, legacy_ref)
+    try:
+        time_pass(pipe, frames[:200])  # warm caches and lazily built tables
+        samples, dropped = time_pass(pipe, frames)
+        alloc, per_frame = alloc_pass(pipe, frames)
+    finally:
+        pipe.close()
+    total = summarize_ns(samples["total"])
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"python": platform.python_version(), "machine": platform.machine(),
+                 "platform": platform.platform()},
+        "source": source,
+        "path": path,
+        "legacy_ref": getattr(pipe, "legacy_ref", None),
+        "frames": len(frames),
+        "frames_decoded": len(samples["total"]),
+        "frames_dropped": dropped,
+        "time_us": {name: summarize_ns(samples[name]) for name in STAGES + ("total",)},
+        "alloc": {name: summarize_alloc(alloc[name]) for name in STAGES + ("total",)},
+        "alloc_frame": per_frame,
+        "budget_us": FRAME_BUDGET_US,
+        "budget_used_p99_pct": round(100 * total["p99"] / FRAME_BUDGET_US, 3),
+    }
+
+
+def print_report(result, baseline=None):
+    print(f"📊 {result['source']} / {result['path']}: {result['frames_decoded']}/{result['frames']} frames decoded")
+    print(f"{'stage':<8}{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}{'max':>9}  alloc B/frame (mean/max)")
+    for name in STAGES + ("total",):
+        t = result["time_us"][name]
+        a = result["alloc"][name]
+        line = (f"{name:<8}{t['p50']:>9.2f}{t['p90']:>9.2f}{t['p99']:>9.2f}{t['p99.9']:>9.2f}"
+                f"{t['max']:>9.2f}  {a['mean_bytes']:>7.1f}/{a['max_bytes']}")
+        if baseline is not None and name in baseline.get("time_us", {}):
+            old = baseline["time_us"][name]["p99"]
+            if old:
+                line += f"  p99 {100 * (t['p99'] - old) / old:+.1f}%"
+        print(line)
+    a = result["alloc_frame"]
+    print(f"🧠 retained {a['retained_bytes']} B, most allocated in one frame {a['max_frame_alloc_bytes']} B")
+    print(f"⏱️ p99 total uses {result['budget_used_p99_pct']}% of the {result['budget_us']} us frame budget (host)")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the stick-to-PWM control path")
+    ap.add_argument("--frames", type=int, default=5000, help="synthetic frame count")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--recorded", help="raw iBUS capture (32-byte frames back to back)")
+    ap.add_argument("--path", choices=("fast", "legacy"), default="fast")
+    ap.add_argument("--legacy-ref", help="git ref of the baseline code for --path legacy (default: root commit)")
+    ap.add_argument("--out", help="write the JSON result here")
+    ap.add_argument("--compare", help="earlier JSON result to diff p99 against")
+    ap.add_argument("--save-stream", help="write the synthetic stream as a raw capture for later runs")
+    args = ap.parse_args(argv)
+
+    if args.recorded:
+        frames = recorded_stream(args.recorded)
+        source = os.path.basename(args.recorded)
+    else:
+        frames = synthetic_stream(args.frames, args.seed)
+        source = f"synthetic:{args.frames}:{args.seed}"
+        if args.save_stream:
+            with open(args.save_stream, "wb") as f:
+                f.write(b"".join(frames))
+
+    result = run(frames, args.path, source, args.legacy_ref)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 saved {args.out}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
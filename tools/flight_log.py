@@ -0,0 +1,155 @@
+# tools/flight_log.py
+# Host-side decoder for flight_recorder.py logs -> NumPy structured arrays
+# Author: savant42
+#
+#   python3 tools/flight_log.py logs/flight_003.bin
+#   python3 tools/flight_log.py --selftest     # recorder -> file -> decoder round trip
+#
+#   from tools.flight_log import load
+#   log = load("flight_003.bin")
+#   log.control["throttle"] (commanded %), log.control["ch"][:, 2] (stick), log.t (seconds)
+#
+# Layout must match flight_recorder.py (FORMAT_VERSION 1, 64-byte records).
+
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+REC_SIZE = 64
+FORMAT_VERSION = 1
+MAGIC = b"RSFR"
+
+REC_EMPTY = 0
+REC_CONTROL = 1
+REC_MARK = 2
+REC_HEADER = 0xF0
+
+FLAG_BRAKE = 0x01
+FLAG_LEFT_DIR = 0x02
+FLAG_RIGHT_DIR = 0x04
+FLAG_LINK = 0x08
+FLAG_STOPPED = 0x10
+
+RECORD_DTYPE = np.dtype({
+    "names": ["t_ms", "seq", "kind", "mode", "ch", "direction", "throttle", "veer",
+              "veer_amt", "pivot", "pivot_amt", "flags", "left_duty", "right_duty",
+              "left_pps_x10", "right_pps_x10", "changed"],
+    "formats": ["<u4", "<u2", "u1", "u1", ("<u2", (14,)), "i1", "u1", "i1",
+                "i1", "i1", "i1", "u1", "<u2", "<u2",
+                "<u2", "<u2", "u1"],
+    "offsets": [0, 4, 6, 7, 8, 36, 37, 38,
+                39, 40, 41, 42, 43, 45,
+                47, 49, 51],
+    "itemsize": REC_SIZE,
+})
+
+HEADER_DTYPE = np.dtype({
+    "names": ["t_ms", "seq", "kind", "mode", "magic", "version", "rec_size", "capacity"],
+    "formats": ["<u4", "<u2", "u1", "u1", "S4", "<u2", "<u2", "<u4"],
+    "offsets": [0, 4, 6, 7, 8, 12, 14, 16],
+    "itemsize": REC_SIZE,
+})
+
+FlightLog = namedtuple("FlightLog", "header control marks t lost")
+
+
+def _unwrap_ms(t_ms):
+    """u32 millisecond stamps -> int64, carrying across the 49-day wrap."""
+    t = t_ms.astype(np.int64)
+    wraps = np.cumsum(np.diff(t, prepend=t[:1]) < -(1 << 31))
+    return t + (wraps << 32)
+
+
+def _lost_records(seq):
+    """Records missing between consecutive control records (ring overwrites), from the u16 seq."""
+    if len(seq) < 2:
+        return 0
+    gaps = (np.diff(seq.astype(np.int64)) - 1) % 65536
+    return int(gaps.sum())
+
+
+def load(path):
+    raw = np.fromfile(path, dtype=np.uint8)
+    usable = len(raw) - len(raw) % REC_SIZE
+    if usable < REC_SIZE:
+        raise ValueError(f"{path}: too short for a flight log")
+    header = raw[:REC_SIZE].view(HEADER_DTYPE)[0]
+    if header["kind"] != REC_HEADER or header["magic"] != MAGIC:
+        raise ValueError(f"{path}: not a flight recorder log")
+    if header["version"] != FORMAT_VERSION or header["rec_size"] != REC_SIZE:
+        raise ValueError(f"{path}: format v{header['version']} / {header['rec_size']} B not supported")
+    recs = raw[REC_SIZE:usable].view(RECORD_DTYPE)
+    control = recs[recs["kind"] == REC_CONTROL]
+    marks = recs[recs["kind"] == REC_MARK]
+    t = _unwrap_ms(control["t_ms"])
+    t = (t - t[0]) / 1000.0 if len(t) else t.astype(np.float64)
+    return FlightLog(header, control, marks, t, _lost_records(control["seq"]))
+
+
+def wheel_columns(control):
+    """Convenience float columns: duty fraction and pulses/sec per wheel, plus decoded flag bits."""
+    flags = control["flags"]
+    return {
+        "left_duty": control["left_duty"] / 65535.0,
+        "right_duty": control["right_duty"] / 65535.0,
+        "left_pps": control["left_pps_x10"] / 10.0,
+        "right_pps": control["right_pps_x10"] / 10.0,
+        "left_dir": (flags & FLAG_LEFT_DIR) != 0,
+        "right_dir": (flags & FLAG_RIGHT_DIR) != 0,
+        "brake": (flags & FLAG_BRAKE) != 0,
+        "link": (flags & FLAG_LINK) != 0,
+        "stopped": (flags & FLAG_STOPPED) != 0,
+    }
+
+
+def selftest():
+    """Records edge-case intents with flight_recorder.py, saves, decodes and compares."""
+    import os
+    import tempfile
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from flight_recorder import FlightRecorder
+    from intent_mapper import Intent
+
+    cases = [(1, 100, 1, 100, 1, 100), (-1, 0, -1, -100, -1, -100), (0, 37, -1, -5, 1, 42)]
+    rec = FlightRecorder(64, directory=None)
+    for direction, throttle, veer, veer_amt, pivot, pivot_amt in cases:
+        it = Intent()
+        it.direction, it.veer, it.veer_amt = direction, veer, veer_amt
+        it.pivot, it.pivot_amt = pivot, pivot_amt
+        rec.record(list(range(1000, 1014)), it, throttle, 1234, True, 65535, False, 12.3, 0.0)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "selftest.bin")
+        rec.save(path)
+        log = load(path)
+    assert len(log.control) == len(cases), len(log.control)
+    for row, case in zip(log.control, cases):
+        got = tuple(int(row[k]) for k in ("direction", "throttle", "veer", "veer_amt", "pivot", "pivot_amt"))
+        assert got == case, (got, case)
+        assert list(row["ch"]) == list(range(1000, 1014))
+        assert row["left_duty"] == 1234 and row["right_duty"] == 65535 and row["left_pps_x10"] == 123
+    print(f"✅ flight log round trip: {len(cases)} records match")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--selftest"]:
+        selftest()
+        return
+    for path in argv:
+        log = load(path)
+        n = len(log.control)
+        span = float(log.t[-1]) if n else 0.0
+        rate = (n - 1) / span if span > 0 else 0.0
+        cols = wheel_columns(log.control)
+        print(f"📼 {path}: {n} control records over {span:.2f}s ({rate:.1f} Hz), "
+              f"{len(log.marks)} marks, {log.lost} lost, ring capacity {int(log.header['capacity'])}")
+        if n:
+            print(f"   throttle max {int(log.control['throttle'].max())}%  "
+                  f"duty max L {cols['left_duty'].max():.2f} R {cols['right_duty'].max():.2f}  "
+                  f"pps max L {cols['left_pps'].max():.1f} R {cols['right_pps'].max():.1f}  "
+                  f"brake {100 * cols['brake'].mean():.1f}% of frames")
+
+
+if __name__ == "__main__":
+    main()
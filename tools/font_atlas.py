@@ -0,0 +1,177 @@
+# tools/font_atlas.py
+# Converts a BDF font into a binary glyph atlas for glyph_atlas.py
+# Author: savant42
+#
+# Runs on the host. Only the characters the status pages need are kept, each
+# pre-positioned in a fixed cell (baseline and x offset baked in), packed into
+# one 1-bit grid. The board then bulk-reads the grid straight into a
+# displayio.Bitmap instead of parsing BDF text and building glyphs lazily.
+#
+#   python3 tools/font_atlas.py DroidobeshDepot-12.bdf DroidobeshDepot-12.atlas
+#   python3 tools/font_atlas.py font.bdf font.atlas --chars "0123456789 .-%"
+#   python3 tools/font_atlas.py font.bdf font.atlas --scan logger_mode.py profiler.py
+#   python3 tools/font_atlas.py font.bdf font.atlas --preview
+#
+# Atlas layout (little-endian):
+#   header   "<4sBBBbBHHH": b"RSGA", version, cell_w, cell_h, descent,
+#            per_row, count, width, height
+#   codes    count bytes, the character code of each tile in tile order
+#   pixels   height rows of ceil(width / 8) bytes, MSB = leftmost pixel
+
+import argparse
+import ast
+import os
+import struct
+import sys
+
+MAGIC = b"RSGA"
+VERSION = 1
+HEADER_FMT = "<4sBBBbBHHH"
+ATLAS_WIDTH = 128  # px; wide enough for 16 cells of an 8 px font per row
+
+# Everything the pages draw: labels, units, numbers and section names
+DEFAULT_CHARS = ("0123456789 .,:;-+%/()[]<>=_!?'\"#*"
+                 "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+
+
+def parse_bdf(path):
+    """Returns (font_bbox (w, h, xoff, yoff), {code: (dwidth, (w, h, xoff, yoff), rows, row_bits)})."""
+    bbox = None
+    glyphs = {}
+    with open(path, encoding="latin-1") as f:
+        lines = iter(f)
+        for line in lines:
+            parts = line.split()
+            if not parts:
+                continue
+            key = parts[0]
+            if key == "FONTBOUNDINGBOX":
+                bbox = tuple(int(v) for v in parts[1:5])
+            elif key == "STARTCHAR":
+                code = dwidth = gbox = None
+                rows = []
+                for line in lines:
+                    parts = line.split()
+                    if not parts:
+                        continue
+                    key = parts[0]
+                    if key == "ENCODING":
+                        code = int(parts[1])
+                    elif key == "DWIDTH":
+                        dwidth = int(parts[1])
+                    elif key == "BBX":
+                        gbox = tuple(int(v) for v in parts[1:5])
+                    elif key == "BITMAP":
+                        for line in lines:
+                            line = line.strip()
+                            if line == "ENDCHAR":
+                                break
+                            rows.append(int(line, 16) if line else 0)
+                        break
+                if code is not None and code >= 0 and gbox is not None:
+                    # Row hex strings are padded to whole bytes
+                    row_bits = ((gbox[0] + 7) // 8) * 8
+                    glyphs[code] = (dwidth if dwidth is not None else gbox[0], gbox, rows, row_bits)
+    if bbox is None:
+        raise ValueError(f"{path}: no FONTBOUNDINGBOX")
+    return bbox, glyphs
+
+
+def scan_chars(paths):
+    """Characters in the string literals of the given Python files."""
+    found = set()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                found.update(node.value)
+    return "".join(sorted(c for c in found if 32 <= ord(c) < 127))
+
+
+def build(bbox, glyphs, chars, width=ATLAS_WIDTH):
+    """Returns (header fields, codes, pixel rows as lists of 0/1). Missing characters are skipped."""
+    codes = sorted({ord(c) for c in chars if ord(c) in glyphs and ord(c) < 256})
+    if not codes:
+        raise ValueError("none of the requested characters are in the font")
+    cell_w = max(max(glyphs[c][0] for c in codes), 1)
+    cell_h = bbox[1]
+    descent = -bbox[3]
+    baseline = cell_h - descent
+    per_row = max(1, width // cell_w)
+    rows_of_cells = (len(codes) + per_row - 1) // per_row
+    width = per_row * cell_w
+    height = rows_of_cells * cell_h
+    pixels = [[0] * width for _ in range(height)]
+    for tile, code in enumerate(codes):
+        _, (gw, gh, gx, gy), rows, row_bits = glyphs[code]
+        cx = (tile % per_row) * cell_w
+        cy = (tile // per_row) * cell_h
+        ox = max(0, gx)
+        oy = baseline - gh - gy
+        for r, bits in enumerate(rows[:gh]):
+            y = oy + r
+            if not 0 <= y < cell_h:
+                continue
+            for c in range(gw):
+                x = ox + c
+                if x < cell_w and (bits >> (row_bits - 1 - c)) & 1:
+                    pixels[cy + y][cx + x] = 1
+    header = (MAGIC, VERSION, cell_w, cell_h, descent, per_row, len(codes), width, height)
+    return header, codes, pixels
+
+
+def pack(header, codes, pixels):
+    out = bytearray(struct.pack(HEADER_FMT, *header))
+    out += bytes(codes)
+    stride = (header[7] + 7) // 8
+    for row in pixels:
+        packed = bytearray(stride)
+        for x, v in enumerate(row):
+            if v:
+                packed[x >> 3] |= 0x80 >> (x & 7)
+        out += packed
+    return bytes(out)
+
+
+def preview(header, codes, pixels):
+    cell_w, cell_h, per_row = header[2], header[3], header[5]
+    for tile, code in enumerate(codes):
+        cx = (tile % per_row) * cell_w
+        cy = (tile // per_row) * cell_h
+        print(f"{chr(code)!r} ({code})")
+        for y in range(cell_h):
+            print("  " + "".join("#" if pixels[cy + y][cx + x] else "." for x in range(cell_w)))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Convert a BDF font into a glyph atlas for glyph_atlas.py")
+    ap.add_argument("bdf")
+    ap.add_argument("atlas", nargs="?", help="output path (default: BDF name with .atlas)")
+    ap.add_argument("--chars", default=DEFAULT_CHARS, help="characters to keep")
+    ap.add_argument("--scan", nargs="+", metavar="PY", help="also keep every character in these files' string literals")
+    ap.add_argument("--width", type=int, default=ATLAS_WIDTH, help="atlas width in px")
+    ap.add_argument("--preview", action="store_true", help="print each glyph cell as ASCII art")
+    args = ap.parse_args(argv)
+
+    chars = args.chars + (scan_chars(args.scan) if args.scan else "")
+    bbox, glyphs = parse_bdf(args.bdf)
+    header, codes, pixels = build(bbox, glyphs, chars, args.width)
+    missing = sorted({c for c in chars if ord(c) not in glyphs})
+    if missing:
+        print(f"⚠️ not in font, skipped: {''.join(missing)!r}")
+    if args.preview:
+        preview(header, codes, pixels)
+    data = pack(header, codes, pixels)
+    out = args.atlas or os.path.splitext(args.bdf)[0] + ".atlas"
+    with open(out, "wb") as f:
+        f.write(data)
+    _, _, cell_w, cell_h, _, _, count, width, height = header
+    print(f"🔤 {count} glyphs, {cell_w}x{cell_h} cells, {width}x{height} px atlas")
+    print(f"💾 {out}: {len(data)} bytes (BDF {os.path.getsize(args.bdf)} bytes, "
+          f"{len(glyphs)} glyphs); bitmap RAM ~{(width + 31) // 32 * 4 * height} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
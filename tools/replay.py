@@ -0,0 +1,165 @@
+# tools/replay.py
+# Deterministic replay of a raw iBUS UART capture through the control stack
+# Author: savant42
+#
+# Bytes go through the same IBusDecoder, IntentMapper, ArmingGate and
+# DriveMixer objects the sled runs; each decoded frame yields one row of the
+# motor command stream (what would be on the DIR/PWM pins after that frame;
+# outputs hold when the gate does not write, exactly like the pins do).
+#
+#   python3 tools/replay.py capture.bin --out commands.csv
+#   python3 tools/replay.py capture.bin --golden golden.csv          # exit 1 on any diff
+#   python3 tools/replay.py capture.bin --realtime --chunk 17        # 7 ms pacing, odd UART reads
+#
+# Captures are the raw bytes off the receiver line (USB-UART dongle at
+# 115200 8N2, or tools/bench_control_path.py --save-stream).
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sim  # noqa: E402
+
+FRAME_MS = 7
+COLUMNS = ("frame", "t_ms", "events", "armed", "brakes", "failsafe",
+           "direction", "throttle", "intent_brake", "mode", "duty_pct",
+           "left_duty", "left_dir", "right_duty", "right_dir", "wrote")
+
+
+class ReplayStack:
+    def __init__(self):
+        sim.install(virtual_time=False)
+        import drive_mixer
+        from arming import ArmingGate
+        from ibus_receiver import IBusDecoder
+        from intent_mapper import IntentMapper
+
+        self.decoder = IBusDecoder()
+        self.mapper = IntentMapper()
+        self.mixer = drive_mixer.from_config()
+        self.gate = ArmingGate(self.mixer)
+        self.left = (0, False)
+        self.right = (0, False)
+        self.coalesced = 0
+
+    def feed(self, chunk):
+        """Feeds UART bytes; returns a command row if at least one new frame was decoded."""
+        before = self.decoder.frame_count
+        self.decoder.feed(chunk)
+        got = self.decoder.frame_count - before
+        if not got:
+            return None
+        self.coalesced += got - 1  # the sled only ever sees the latest frame of a read
+        ch = self.decoder.channels
+        self.mapper.update(ch)
+        events = self.gate.update(ch)
+        m = self.mixer
+        if self.gate.write:
+            self.left = (m.left_duty, m.left_dir)
+            self.right = (m.right_duty, m.right_dir)
+        it = self.mapper.intent
+        g = self.gate
+        n = self.decoder.frame_count
+        return (n, n * FRAME_MS, events, int(g.armed), int(g.brakes), int(g.failsafe),
+                it.direction, it.throttle, int(it.brake), it.mode, g.duty_pct,
+                self.left[0], int(self.left[1]), self.right[0], int(self.right[1]), int(g.write))
+
+
+def replay(data, chunk=32, realtime=False):
+    stack = ReplayStack()
+    rows = []
+    start = time.perf_counter()
+    for off in range(0, len(data), chunk):
+        row = stack.feed(data[off:off + chunk])
+        if row is None:
+            continue
+        rows.append(row)
+        if realtime:
+            delay = start + row[1] / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    return rows, stack
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(COLUMNS)
+        w.writerows(rows)
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        r = csv.reader(f)
+        header = next(r)
+        if tuple(header) != COLUMNS:
+            raise ValueError(f"{path}: columns {header} do not match this replay version")
+        return [tuple(int(v) for v in row) for row in r]
+
+
+def diff(golden, rows, limit=10):
+    """Rows are matched by decoder frame number. Returns (mismatch count, first `limit`
+    differences as (frame, column, golden, got)); a frame present on one side only
+    shows up with column "frame"."""
+    got = {r[0]: r for r in rows}
+    want = {g[0]: g for g in golden}
+    found = []
+    count = 0
+    for frame in sorted(set(got) | set(want)):
+        g, r = want.get(frame), got.get(frame)
+        if g == r:
+            continue
+        count += 1
+        if len(found) >= limit:
+            continue
+        if g is None or r is None:
+            found.append((frame, "frame", "missing" if g is None else frame, "missing" if r is None else frame))
+            continue
+        for name, a, b in zip(COLUMNS, g, r):
+            if a != b:
+                found.append((frame, name, a, b))
+                break
+    return count, found
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a raw iBUS capture through decoder, intent, arming and mixer")
+    ap.add_argument("capture", help="raw UART bytes")
+    ap.add_argument("--chunk", type=int, default=32, help="bytes per simulated UART read")
+    ap.add_argument("--realtime", action="store_true", help=f"pace frames at {FRAME_MS} ms")
+    ap.add_argument("--out", help="write the command stream as CSV")
+    ap.add_argument("--golden", help="golden command CSV to diff against")
+    args = ap.parse_args(argv)
+
+    with open(args.capture, "rb") as f:
+        data = f.read()
+    t0 = time.perf_counter()
+    rows, stack = replay(data, args.chunk, args.realtime)
+    wall = time.perf_counter() - t0
+    d = stack.decoder
+    print(f"⏯️ {len(rows)} frames from {len(data)} bytes in {wall:.3f}s "
+          f"({len(rows) / wall if wall else 0:.0f} frames/s)")
+    print(f"📶 {d.stats_line()} coalesced={stack.coalesced}")
+    print(f"🔐 armed={stack.gate.armed} baseline={stack.gate.startup_throttle} "
+          f"brakes={stack.gate.brakes} failsafe={stack.gate.failsafe}")
+    if args.out:
+        write_csv(args.out, rows)
+        print(f"💾 saved {args.out}")
+    if args.golden:
+        golden = read_csv(args.golden)
+        count, found = diff(golden, rows)
+        if not count:
+            print(f"✅ matches {args.golden} ({len(golden)} frames)")
+            return 0
+        print(f"❌ {count} differing frames vs {args.golden} ({len(golden)} golden, {len(rows)} replayed)")
+        for frame, name, want, got in found:
+            print(f"   frame {frame}: {name} golden={want} got={got}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
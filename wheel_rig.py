@@ -0,0 +1,186 @@
+# /wheel_rig.py
+# Bench rig that drives several ZS-X11H channels on one shared time base
+# Author: savant42
+#
+# Owns PWM, DIR, STOP, BRAKE and a pulse Counter for every wheel it is given,
+# for its whole lifetime, so nothing is torn down and rebuilt between wheels.
+# Each tick reads the clock once and then every counter back to back, so left
+# and right samples line up and left/right differences are real, not skew.
+#
+#   rig = WheelRig([MOTOR_CONFIG['LEFT'], MOTOR_CONFIG['RIGHT']])
+#   run = rig.run([40, 40], seconds=10)      # % duty per wheel
+#   print_report(rig, run)
+#   rig.deinit()
+
+import time
+from array import array
+
+import countio
+import digitalio
+import pwmio
+
+import boot_sequence
+
+
+class RigRun:
+    """Counter samples of one run: counts[w][i] at t_us[i], plus the duties used."""
+
+    def __init__(self, wheels, capacity):
+        self.t_us = array("L", [0] * capacity)
+        self.counts = [array("L", [0] * capacity) for _ in range(wheels)]
+        self.n = 0
+        self.duties = [0] * wheels
+        self.settle = 0  # samples skipped as spin-up
+
+    def rates(self, w):
+        """Per-tick pulses/sec for wheel w after settling."""
+        t, c = self.t_us, self.counts[w]
+        return [(c[i] - c[i - 1]) * 1_000_000 / (t[i] - t[i - 1])
+                for i in range(max(1, self.settle + 1), self.n) if t[i] > t[i - 1]]
+
+    def mean_pps(self, w):
+        """Edges over the settled window / its duration (not a mean of noisy ticks)."""
+        a = max(0, self.settle)
+        if self.n - a < 2:
+            return 0.0
+        dt = self.t_us[self.n - 1] - self.t_us[a]
+        return (self.counts[w][self.n - 1] - self.counts[w][a]) * 1_000_000 / dt if dt else 0.0
+
+
+class WheelRig:
+    def __init__(self, devices, frequency=2000):
+        self.devices = devices
+        self.pwms = []
+        self.dirs = []
+        self.stops = []
+        self.brakes = []
+        self.counters = []
+        try:
+            for dev in devices:
+                self.pwms.append(pwmio.PWMOut(dev['PWM'], frequency=frequency, duty_cycle=0))
+                d = digitalio.DigitalInOut(dev['DIR'])
+                self.dirs.append(d)
+                d.switch_to_output(value=dev['FWD'])
+                self.stops.append(boot_sequence.take(dev['STOP'], False))
+                self.brakes.append(boot_sequence.take(dev['BRAKE'], True))
+                self.counters.append(countio.Counter(dev['PULSE'], edge=countio.Edge.RISE))
+        except Exception:
+            # A later pin was busy: free what was claimed so the caller can retry
+            self.deinit()
+            raise
+
+    def set_forward(self, forward=True):
+        for dev, d in zip(self.devices, self.dirs):
+            d.value = dev['FWD'] if forward else not dev['FWD']
+
+    def enable(self):
+        for stop, brake in zip(self.stops, self.brakes):
+            brake.value = False
+            stop.value = True
+
+    def safe(self):
+        for pwm in self.pwms:
+            pwm.duty_cycle = 0
+        for stop, brake in zip(self.stops, self.brakes):
+            brake.value = True
+            stop.value = False
+
+    def set_duty(self, w, pct):
+        self.pwms[w].duty_cycle = int(pct * 655.35)
+
+    def run(self, duties, seconds, tick_s=0.05, settle_s=1.0, run=None):
+        """Drives every wheel at its duty % and samples all counters each tick.
+        Leaves the wheels running; call safe() when done. Pass `run` to reuse its buffers."""
+        ticks = int(seconds / tick_s) + 1
+        if run is None or len(run.t_us) < ticks:
+            run = RigRun(len(self.devices), ticks)
+        run.n = 0
+        run.settle = int(settle_s / tick_s)
+        self.enable()
+        for w, pct in enumerate(duties):
+            run.duties[w] = pct
+            self.set_duty(w, pct)
+        t0 = time.monotonic_ns()
+        next_ns = t0
+        counters = self.counters
+        for i in range(ticks):
+            now = time.monotonic_ns()
+            run.t_us[i] = (now - t0) // 1000
+            for w in range(len(counters)):
+                run.counts[w][i] = counters[w].count
+            run.n = i + 1
+            next_ns += int(tick_s * 1_000_000_000)
+            delay = next_ns - time.monotonic_ns()
+            if delay > 0:
+                time.sleep(delay / 1_000_000_000)
+        return run
+
+    def deinit(self):
+        self.safe()
+        for res in self.pwms + self.dirs + self.counters:
+            res.deinit()
+
+
+def _mean_std(xs):
+    if not xs:
+        return 0.0, 0.0
+    m = sum(xs) / len(xs)
+    return m, (sum((x - m) ** 2 for x in xs) / len(xs)) ** 0.5
+
+
+def _mismatch(ca, cb, i, j):
+    na = ca[j] - ca[i]
+    nb = cb[j] - cb[i]
+    mean = (na + nb) / 2
+    return 100 * (na - nb) / mean if mean else 0.0
+
+
+def differential(run, a=0, b=1):
+    """Left/right comparison over the settled window of one run.
+
+    mismatch_pct: (A - B) / mean speed, from total edges (positive = A faster)
+    mismatch_std_pct: tick-to-tick spread of that ratio (hall quantization + ripple)
+    drift_pct_per_min: second-half mismatch minus first-half, per minute (warm-up, sag)
+    lead_pulses: edges A gained on B over the window
+    """
+    s = max(0, run.settle)
+    end = run.n - 1
+    if end - s < 4:
+        return None
+    ca, cb = run.counts[a], run.counts[b]
+    rel = []
+    for i in range(s + 1, run.n):
+        da = ca[i] - ca[i - 1]
+        db = cb[i] - cb[i - 1]
+        if da + db:
+            rel.append(200 * (da - db) / (da + db))
+    mid = (s + end) // 2
+    half_s = (run.t_us[end] - run.t_us[s]) / 2_000_000
+    drift = (_mismatch(ca, cb, mid, end) - _mismatch(ca, cb, s, mid)) / half_s * 60 if half_s else 0.0
+    return {
+        "mismatch_pct": _mismatch(ca, cb, s, end),
+        "mismatch_std_pct": _mean_std(rel)[1],
+        "drift_pct_per_min": drift,
+        "lead_pulses": (ca[end] - ca[s]) - (cb[end] - cb[s]),
+    }
+
+
+def print_report(rig, run):
+    span = (run.t_us[run.n - 1] - run.t_us[max(0, run.settle)]) / 1_000_000 if run.n else 0
+    print(f"\n📊 {run.n} ticks, {span:.1f}s measured after {run.settle} settle ticks")
+    for w, dev in enumerate(rig.devices):
+        mean = run.mean_pps(w)
+        _, std = _mean_std(run.rates(w))
+        ppr = dev.get('PULSES_PER_REV', 90)
+        print(f" {dev['name']:<12} duty={run.duties[w]}%  {mean:7.1f}pps ±{std:5.1f}  "
+              f"{mean * 60 / ppr:6.1f}RPM")
+    if len(rig.devices) >= 2:
+        d = differential(run)
+        if d is None:
+            print(" (too few samples for left/right comparison)")
+            return d
+        print(f" ↔️ mismatch {d['mismatch_pct']:+.2f}% (±{d['mismatch_std_pct']:.1f}% per tick), "
+              f"drift {d['drift_pct_per_min']:+.2f}%/min, {rig.devices[0]['name']} "
+              f"{'ahead' if d['lead_pulses'] >= 0 else 'behind'} by {abs(d['lead_pulses'])} pulses")
+        return d
+    return None
@@ -8,8 +8,12 @@ import pwmio
 import time
 import countio
 
-from config import MOTOR_CONFIG, RAMP_MIN_DUTY, RAMP_STEP, RAMP_DELAY
-from PID_CPY import PID
+import boot_sequence
+
+from config import MOTOR_CONFIG, RAMP_MIN_DUTY, RAMP_STEP, RAMP_DELAY, SPEED_FF_MIN_DUTY, SPEED_MAX_PPS
+import duty_speed
+import relay_tune
+import speed_pulse_reader
 
 # Load devices from configuration
 DEVICES = list(MOTOR_CONFIG.values())
@@ -31,6 +35,9 @@ LAST_STATS = {}  # name -> (avg_pps, std_pps, avg_rpm)
 # === PID Parameters ===
 PID_PARAMS = {'Kp': 1.0, 'Ki': 0.0, 'Kd': 0.0}
 SETPOINT = None   # target pulses/sec for closed-loop tests
+TUNED = {}        # name -> gains from the last relay auto-tune
+RELAY_AMP_PCT = 10    # relay swing around the operating duty
+RELAY_TIMEOUT_S = 10
 
 # === Setup IO ===
 def setup_device(device):
@@ -47,10 +54,8 @@ def setup_device(device):
     dir_pin.direction = digitalio.Direction.OUTPUT
     dir_pin.value = device['FWD'] if device['DESIRED_DIR']=='FWD' else not device['FWD']
     last_dir = dir_pin
-    stop = digitalio.DigitalInOut(device['STOP'])
-    stop.direction = digitalio.Direction.OUTPUT; stop.value = False; last_stop = stop
-    brake = digitalio.DigitalInOut(device['BRAKE'])
-    brake.direction = digitalio.Direction.OUTPUT; brake.value = True; last_brake = brake
+    stop = boot_sequence.take(device['STOP'], False); last_stop = stop
+    brake = boot_sequence.take(device['BRAKE'], True); last_brake = brake
     init_dir = 'FORWARD' if dir_pin.value==device['FWD'] else 'REVERSE'
     init_brake='ENGAGED' if brake.value else 'RELEASED'
     init_stop='ENABLED' if stop.value else 'DISABLED'
@@ -98,69 +103,85 @@ def sniff_pulse_scan(device):
         pps=[d/SCAN_INTERVAL for d in samples]
         avg_pps=sum(pps)/len(pps)
         std_pps=(sum((x-avg_pps)**2 for x in pps)/len(pps))**0.5
-        # simple RPM: assume device['PULSES_PER_REV'] or default 20
-        ppr=device.get('PULSES_PER_REV',20)
+        # PULSES_PER_REV from robot_config.txt, the same figure the auto-tune estimator uses
+        ppr=device['PULSES_PER_REV']
         avg_rpm=avg_pps/ppr*60
         LAST_STATS[device['name']]=(avg_pps,std_pps,avg_rpm)
         print(f"[DONE] Avg={avg_pps:.1f}pps ({avg_rpm:.1f}RPM), Std={std_pps:.1f}pps over {len(pps)} samples")
     else:
         print("[DONE] No edges detected.")
 
-# === Capture for Auto-Tune ===
-def run_pid_capture(device,pwm,dir_pin,stop,brake):
-    """
-    Run a short closed-loop test (P-only) to capture error crossings for oscillation detection.
-    Returns timestamped error list.
-    """
-    if SETPOINT is None:
-        print("❌ Set SETPOINT first."); return []
-    # Zero I and D
-    Ki, Kd = PID_PARAMS['Ki'], PID_PARAMS['Kd']
-    PID_PARAMS['Ki'], PID_PARAMS['Kd'] = 0, 0
-    pid = PID(Kp=PID_PARAMS['Kp'], Ki=0, Kd=0, setpoint=SETPOINT, sample_time=SCAN_INTERVAL, output_limits=(0,100))
-    # Prep motor
-    brake.value=False; stop.value=True; pwm.duty_cycle=0; time.sleep(0.2)
-    counter=countio.Counter(device['PULSE'],edge=countio.Edge.RISE)
-    errs=[]; last_count=counter.count; start=time.monotonic()
-    while time.monotonic()-start < SCAN_DURATION:
-        now=counter.count; delta=now-last_count; meas=delta/SCAN_INTERVAL
-        err=SETPOINT - meas; errs.append((time.monotonic()-start,err))
-        out=pid(meas); pwm.duty_cycle=int(out*655.35)
-        last_count=now; time.sleep(SCAN_INTERVAL)
-    pwm.duty_cycle=0; brake.value=True; stop.value=False; counter.deinit()
-    PID_PARAMS['Ki'], PID_PARAMS['Kd'] = Ki, Kd
-    return errs
+# === Relay Auto-Tune ===
+def _relay_bias(setpoint):
+    # Duty near the setpoint speed from the drive loop's feedforward model
+    return SPEED_FF_MIN_DUTY + (100 - SPEED_FF_MIN_DUTY) * min(setpoint, SPEED_MAX_PPS) / SPEED_MAX_PPS
+
+def _pick_rule():
+    names = list(relay_tune.RULES)
+    for i, name in enumerate(names, 1):
+        print(f" [{i}] {name}{' (default)' if name == relay_tune.DEFAULT_RULE else ''}")
+    sel = input("Tuning rule > ").strip()
+    try: return names[int(sel) - 1]
+    except (ValueError, IndexError): return relay_tune.DEFAULT_RULE
 
-# === Auto-Tune ===
-def auto_tune_pid(device,pwm,dir_pin,stop,brake):
-    global PID_PARAMS, SETPOINT
-    print("\n🤖 Starting PID auto-tuner...")
+def auto_tune_pid(devices, pwms, stops, brakes):
+    """Relay-feedback tune of one or more wheels in a single short run (all at once)."""
+    global PID_PARAMS
+    print(f"\n🤖 Relay auto-tune: {', '.join(d['name'] for d in devices)}")
     if SETPOINT is None:
         print("❌ Define SETPOINT in main menu first."); return
-    # Sweep Kp until oscillation detected
-    Ku, Pu = None, None
-    for kp in range(1, 101, 5):
-        PID_PARAMS['Kp']=kp; print(f" Testing Kp={kp}")
-        errs = run_pid_capture(device,pwm,dir_pin,stop,brake)
-        # detect zero crossings
-        crossings=[]
-        for i in range(1,len(errs)):
-            if errs[i-1][1]*errs[i][1] < 0:
-                crossings.append(errs[i][0])
-        if len(crossings)>=6:
-            # measure last period
-            Pu = crossings[-1] - crossings[-3]
-            Ku = kp
-            print(f" Oscillation at Kp={Ku}, Pu={Pu:.2f}s")
-            break
-    if not Ku:
-        print("❌ Could not find Ku; try larger sweep range."); return
-    # Ziegler-Nichols tuning
-    newKp = 0.6*Ku
-    newKi = 2*newKp/Pu
-    newKd = newKp*Pu/8
-    PID_PARAMS.update({'Kp':newKp,'Ki':newKi,'Kd':newKd})
-    print(f"🎯 Auto-tuned PID -> Kp={newKp:.3f}, Ki={newKi:.3f}, Kd={newKd:.3f}")
+    bias = _relay_bias(SETPOINT)
+    amp = min(RELAY_AMP_PCT, bias - 1, 100 - bias)
+    rule = _pick_rule()
+    print(f" Relay around {SETPOINT}pps: {bias:.1f}% ± {amp:.1f}%")
+    estimator = speed_pulse_reader.WheelSpeedEstimator(
+        [d['PULSE'] for d in devices], [d['PULSES_PER_REV'] for d in devices])
+    for stop, brake in zip(stops, brakes):
+        brake.value = False; stop.value = True
+    try:
+        tuner = relay_tune.run(estimator, pwms, SETPOINT, bias, amp, timeout_s=RELAY_TIMEOUT_S, rule=rule)
+    finally:
+        for stop, brake in zip(stops, brakes):
+            brake.value = True; stop.value = False
+        estimator.deinit()
+    for dev, res in zip(devices, tuner.results):
+        if res is None:
+            continue
+        kp, ki, kd = res.gains(rule)
+        TUNED[dev['name']] = {'Kp': kp, 'Ki': ki, 'Kd': kd}
+        PID_PARAMS.update(TUNED[dev['name']])
+    if TUNED:
+        print("🎯 Tuned:", TUNED)
+        print(" For config.SPEED_PID use the slower wheel's gains (or per-wheel values).")
+
+def auto_tune_both():
+    """Claims both wheels on one time base (single-wheel resources are released first)."""
+    global last_pwm, last_dir, last_stop, last_brake
+    for res in (last_pwm, last_dir):
+        if res: res.deinit()
+    last_pwm = last_dir = None
+    pwms = []; dirs = []; stops = []; brakes = []
+    try:
+        for dev in DEVICES:
+            pwms.append(pwmio.PWMOut(dev['PWM'], frequency=2000, duty_cycle=0))
+            d = digitalio.DigitalInOut(dev['DIR']); d.direction = digitalio.Direction.OUTPUT
+            d.value = dev['FWD'] if dev['DESIRED_DIR'] == 'FWD' else not dev['FWD']; dirs.append(d)
+            stops.append(boot_sequence.take(dev['STOP'], False))
+            brakes.append(boot_sequence.take(dev['BRAKE'], True))
+        auto_tune_pid(DEVICES, pwms, stops, brakes)
+    finally:
+        for res in pwms + dirs: res.deinit()
+
+# === Duty->Speed Sweep ===
+def duty_sweep_both():
+    """Full-range sweep of both wheels, both directions; saves the feedforward table."""
+    global last_pwm, last_dir
+    for res in (last_pwm, last_dir):
+        if res: res.deinit()
+    last_pwm = last_dir = None
+    try: step = int(input("Duty step % [5]: ").strip() or 5)
+    except ValueError: step = 5
+    duty_speed.main(max(1, min(25, step)))
 
 # === Wheel Test Menu ===
 def wheel_test_menu(device,pwm,dir_pin,stop,brake,pulse):
@@ -174,7 +195,7 @@ def wheel_test_menu(device,pwm,dir_pin,stop,brake,pulse):
         print(" [6] Config scan params")
         print(" [7] Configure PID constants")
         print(" [8] Suggest PID constants")
-        print(" [9] Auto-tune PID")
+        print(" [9] Auto-tune PID (relay)")
         print(" [10] Back to main menu")
         c=input("> ").strip()
         if c=='1': brake.value=not brake.value; print(f"[BRAKE] {'ENGAGED' if brake.value else 'RELEASED'}")
@@ -195,19 +216,22 @@ def wheel_test_menu(device,pwm,dir_pin,stop,brake,pulse):
                 avg=LAST_STATS[device['name']][0]; Kp=1/(avg/SCAN_DUTY); Ki=Kp/SCAN_DURATION; Kd=Kp*(SCAN_INTERVAL/2)
                 print(f"Suggested PID: Kp={Kp:.3f}, Ki={Ki:.3f}, Kd={Kd:.3f}")
             else: print("❌ Run pulse scan first.")
-        elif c=='9': auto_tune_pid(device,pwm,dir_pin,stop,brake)
+        elif c=='9': auto_tune_pid([device],[pwm],[stop],[brake])
         elif c=='10': break
         else: print("❌ Invalid selection.")
 
 # === Main Menu ===
-if __name__=='__main__':
+def main():
+    global SETPOINT
     while True:
         print("\nMain Menu — Select device:")
         for i,dev in enumerate(DEVICES,1): print(f" [{i}] {dev['name']}")
-        comp=len(DEVICES)+1; stats=comp+1; setp=stats+1; exit_idx=setp+1
+        comp=len(DEVICES)+1; stats=comp+1; setp=stats+1; tune=setp+1; sweep=tune+1; exit_idx=sweep+1
         print(f" [{comp}] Compare last stats")
         print(f" [{stats}] Configure global SETPOINT")
         print(f" [{setp}] Clear SETPOINT")
+        print(f" [{tune}] Auto-tune both wheels (relay)")
+        print(f" [{sweep}] Duty->speed sweep both wheels (saves feedforward table)")
         print(f" [{exit_idx}] Exit")
         sel=input("> ").strip();
         try: idx=int(sel)
@@ -224,6 +248,14 @@ if __name__=='__main__':
             except: print("❌ Invalid setpoint")
         elif idx==setp:
             SETPOINT=None; print("SETPOINT cleared")
+        elif idx==tune:
+            auto_tune_both()
+        elif idx==sweep:
+            duty_sweep_both()
         elif idx==exit_idx:
             break
         else: print("❌ Invalid selection.")
+
+
+if __name__ == "__main__":
+    main()
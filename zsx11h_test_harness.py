@@ -2,7 +2,6 @@
 # Manual ZS-X11H motor tester for Left/Right/Both wheels with feedback logging and enhanced menu flow
 # Author: savant42
 
-import board
 import digitalio
 import pwmio
 import time
@@ -11,28 +10,16 @@ import rtc
 import supervisor
 import countio
 
+import boot_sequence
+
 # === Pin Map with Forward Logic, Speed Pulse, and Desired Start State ===
-LEFT = {
-    'name': 'Left Wheel',
-    'PWM': board.D13,
-    'DIR': board.D9,
-    'STOP': board.D10,
-    'BRAKE': board.D6,
-    'PULSE': board.D12,
-    'FWD': True,
-    'DESIRED_DIR': 'FWD'
-}
-
-RIGHT = {
-    'name': 'Right Wheel',
-    'PWM': board.D19,
-    'DIR': board.D16,
-    'STOP': board.D17,
-    'BRAKE': board.D15,
-    'PULSE': board.D14,
-    'FWD': False,
-    'DESIRED_DIR': 'FWD'
-}
+# Pins come from robot_config.txt through config.py, same as the sled
+from config import MOTOR_CONFIG
+
+from wheel_rig import WheelRig, print_report
+
+LEFT = MOTOR_CONFIG['LEFT']
+RIGHT = MOTOR_CONFIG['RIGHT']
 
 # Track existing resources to avoid reinitialization errors
 last_pwm = None
@@ -69,14 +56,11 @@ def setup_device(device):
     else:
         dir_pin.value = not device['FWD']
 
-    stop = digitalio.DigitalInOut(device['STOP'])
-    stop.direction = digitalio.Direction.OUTPUT
-    stop.value = False
+    # STOP/BRAKE are held safe by code.py from reset; take them over
+    stop = boot_sequence.take(device['STOP'], False)
     last_stop = stop
 
-    brake = digitalio.DigitalInOut(device['BRAKE'])
-    brake.direction = digitalio.Direction.OUTPUT
-    brake.value = False
+    brake = boot_sequence.take(device['BRAKE'], False)
     last_brake = brake
 
     pulse = device['PULSE']
@@ -96,7 +80,7 @@ def print_device_status(device, dir_pin, stop, brake, pulse):
 def sniff_pulse_pin_active(device):
     print(f"\n🔍 Starting single-pin pulse scan for {device['name']}...")
 
-    candidate_pins = [board.IO6]    # IO6 Right Wheel, IO10 Left
+    candidate_pins = [device['PULSE']]
     duration = 10
 
     brake = last_brake
@@ -181,8 +165,58 @@ def wheel_test_menu(device, pwm, dir_pin, stop, brake, pulse):
         else:
             print("❌ Invalid selection. Try again.")
 
+# === Both Wheels ===
+def release_single_device():
+    """Frees the single-wheel PWM/DIR so the rig can claim both wheels (STOP/BRAKE stay held)."""
+    global last_pwm, last_dir, last_stop, last_brake
+    for res in (last_pwm, last_dir):
+        if res:
+            res.deinit()
+    last_pwm = last_dir = last_stop = last_brake = None
+
+def both_wheels_menu():
+    release_single_device()
+    rig = WheelRig([LEFT, RIGHT])
+    print("\n🛞🛞 Both wheels on one time base (STOP/BRAKE/PWM per wheel, shared sample tick)")
+    try:
+        while True:
+            print("\nBoth Wheels Menu:")
+            print(" [1] Run both at the same duty")
+            print(" [2] Run with separate duties")
+            print(" [3] Toggle direction (both)")
+            print(" [4] Back to device selection")
+            choice = input("> ").strip()
+            if choice in ("1", "2"):
+                try:
+                    if choice == "1":
+                        duty = float(input("Duty %: "))
+                        duties = [duty, duty]
+                    else:
+                        duties = [float(input("Left duty %: ")), float(input("Right duty %: "))]
+                    seconds = float(input("Seconds: ") or "10")
+                except ValueError:
+                    print("❌ Invalid input")
+                    continue
+                print(f"[RUN] L={duties[0]}% R={duties[1]}% for {seconds}s...")
+                try:
+                    run = rig.run(duties, seconds)
+                finally:
+                    rig.safe()
+                print_report(rig, run)
+            elif choice == "3":
+                forward = rig.dirs[0].value != LEFT['FWD']
+                rig.set_forward(forward)
+                print(f"[DIR] Both {'FORWARD' if forward else 'REVERSE'}")
+            elif choice == "4":
+                print("🔙 Returning to main menu.")
+                break
+            else:
+                print("❌ Invalid selection. Try again.")
+    finally:
+        rig.deinit()
+
 # === Entry Point ===
-if __name__ == "__main__":
+def main():
     while True:
         print("\nMain Menu — Select device to test:")
         print(" [1] Left Wheel")
@@ -200,9 +234,13 @@ if __name__ == "__main__":
             print_device_status(RIGHT, dir_pin, stop, brake, pulse)
             wheel_test_menu(RIGHT, pwm, dir_pin, stop, brake, pulse)
         elif choice == "3":
-            print("🚧 Both Wheel testing not implemented yet.")
+            both_wheels_menu()
         elif choice == "4" or choice.lower() == "q":
             print("👋 Exiting test harness.")
             break
         else:
             print("❌ Invalid selection. Try again.")
+
+
+if __name__ == "__main__":
+    main()